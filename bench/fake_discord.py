@@ -0,0 +1,313 @@
+"""In-process stand-ins for the parts of discord.py the review cogs touch.
+
+Every object that would normally hit Discord's REST API goes through a
+FakeTransport instead, which records the call per route and optionally sleeps
+for a simulated round trip. Gateway-side state (channels, users, roles) lives
+in plain dicts on FakeClient, the way discord.py's connection state caches it.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter
+from datetime import datetime, UTC
+
+from cogs.review_dispatch import DMChannelCache, RateLimitScheduler
+from cogs.review_metrics import Metrics
+from cogs.review_reconcile import Reconciler
+from cogs.review_roles import RoleIndex
+
+DISCORD_EPOCH = 1420070400000
+
+_increment = itertools.count()
+
+
+def make_snowflake(at=None):
+    ms = int((at if at is not None else time.time()) * 1000)
+    return ((ms - DISCORD_EPOCH) << 22) | (next(_increment) & 0x3FFFFF)
+
+
+def snowflake_time(snowflake):
+    return datetime.fromtimestamp(((snowflake >> 22) + DISCORD_EPOCH) / 1000, UTC)
+
+
+class FakeTransport:
+    """Counts REST calls per route and simulates their latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+
+    async def request(self, method, path):
+        self.calls[f"{method} {path}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+
+
+class FakeAsset:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class FakeRole:
+    def __init__(self, guild, role_id, name, position, color=0):
+        self.guild = guild
+        self.id = role_id
+        self.name = name
+        self.position = position
+        self.color = self.colour = FakeColour(color)
+        self.mention = f"<@&{role_id}>"
+
+    def is_default(self):
+        return self.id == self.guild.id
+
+
+class FakeColour:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeUser:
+    def __init__(self, client, user_id, name, roles=()):
+        self._client = client
+        self.id = user_id
+        self.name = self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.avatar = FakeAsset()
+        self.roles = list(roles)
+        self.guild_permissions = FakePermissions()
+        self.dm_channel = None
+        self.bot = False
+
+    async def create_dm(self):
+        if self.dm_channel is None:
+            await self._client.transport.request("POST", "/users/@me/channels")
+            self.dm_channel = FakeChannel(self._client, make_snowflake(), f"dm-{self.id}", guild=None)
+            self._client.channels[self.dm_channel.id] = self.dm_channel
+        return self.dm_channel
+
+    async def send(self, content=None, **kwargs):
+        channel = self.dm_channel or await self.create_dm()
+        return await channel.send(content, **kwargs)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeUser) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakePermissions:
+    administrator = True
+
+
+class FakeMessage:
+    def __init__(self, channel, content=None, embed=None, embeds=None, view=None, author=None):
+        self.channel = channel
+        self.id = make_snowflake()
+        self.content = content
+        self.embeds = list(embeds or ([embed] if embed else []))
+        self.view = view
+        self.author = author
+        self.guild = channel.guild
+        self.created_at = snowflake_time(self.id)
+        self.components = [view] if view else []
+
+    @property
+    def jump_url(self):
+        guild = self.guild.id if self.guild else "@me"
+        return f"https://discord.com/channels/{guild}/{self.channel.id}/{self.id}"
+
+    async def delete(self, delay=None):
+        await self.channel._client.transport.request("DELETE", "/channels/{channel_id}/messages/{message_id}")
+        self.channel.messages.pop(self.id, None)
+
+    async def edit(self, **kwargs):
+        await self.channel._client.transport.request("PATCH", "/channels/{channel_id}/messages/{message_id}")
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+        return self
+
+    async def pin(self):
+        await self.channel._client.transport.request("PUT", "/channels/{channel_id}/pins/{message_id}")
+
+
+class FakePartialMessage:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def delete(self, delay=None):
+        await self.channel._client.transport.request("DELETE", "/channels/{channel_id}/messages/{message_id}")
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeChannel:
+    def __init__(self, client, channel_id, name, guild):
+        self._client = client
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.messages = {}
+
+    async def send(self, content=None, *, embed=None, embeds=None, view=None, delete_after=None, **kwargs):
+        await self._client.transport.request("POST", "/channels/{channel_id}/messages")
+        message = FakeMessage(self, content, embed=embed, embeds=embeds, view=view, author=self._client.user)
+        if delete_after is None:
+            self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        await self._client.transport.request("GET", "/channels/{channel_id}/messages/{message_id}")
+        return self.messages.get(message_id) or FakePartialMessage(self, message_id)
+
+    def get_partial_message(self, message_id):
+        return FakePartialMessage(self, message_id)
+
+    async def delete_messages(self, messages, *, reason=None):
+        messages = list(messages)
+        if len(messages) == 1:
+            await messages[0].delete()
+            return
+        await self._client.transport.request("POST", "/channels/{channel_id}/messages/bulk-delete")
+        for message in messages:
+            self.messages.pop(message.id, None)
+
+    async def history(self, limit=100, after=None, before=None, oldest_first=None):
+        await self._client.transport.request("GET", "/channels/{channel_id}/messages")
+        for message_id in sorted(self.messages, reverse=not oldest_first):
+            if after is not None and message_id <= after.id:
+                continue
+            if before is not None and message_id >= before.id:
+                continue
+            yield self.messages[message_id]
+
+    async def edit(self, **kwargs):
+        await self._client.transport.request("PATCH", "/channels/{channel_id}")
+
+    async def delete(self):
+        await self._client.transport.request("DELETE", "/channels/{channel_id}")
+        self._client.channels.pop(self.id, None)
+
+
+class FakeGuild:
+    def __init__(self, client, guild_id, role_count):
+        self._client = client
+        self.id = guild_id
+        self.default_role = FakeRole(self, guild_id, "@everyone", 0)
+        self.roles = [self.default_role] + [
+            FakeRole(self, make_snowflake(), f"role-{i}", i + 1, color=(i * 0x1F3A5B) & 0xFFFFFF)
+            for i in range(role_count)
+        ]
+        self._roles = {role.id: role for role in self.roles}
+        self.me = client.user
+        self.members = {}
+
+    def get_role(self, role_id):
+        return self._roles.get(int(role_id))
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    async def create_text_channel(self, name, **kwargs):
+        await self._client.transport.request("POST", "/guilds/{guild_id}/channels")
+        channel = FakeChannel(self._client, make_snowflake(), name, self)
+        self._client.channels[channel.id] = channel
+        return channel
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def _respond(self):
+        if self._done:
+            raise RuntimeError("This interaction has already been responded to before")
+        self._done = True
+        await self._interaction.client.transport.request("POST", "/interactions/{interaction_id}/{token}/callback")
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond()
+
+    async def edit_message(self, **kwargs):
+        await self._respond()
+
+    async def send_modal(self, modal):
+        await self._respond()
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        await self._interaction.client.transport.request("POST", "/webhooks/{application_id}/{token}")
+
+
+class FakeInteraction:
+    def __init__(self, client, guild, user, message=None, channel_id=None):
+        self.id = make_snowflake()
+        self.client = client
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.user = user
+        self.message = message
+        self.channel_id = channel_id
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+    async def delete_original_response(self):
+        await self.client.transport.request("DELETE", "/webhooks/{application_id}/{token}/messages/@original")
+
+
+class FakeClient:
+    """Plays the part of `commands.Bot` for the cogs: caches plus the attributes they read."""
+
+    def __init__(self, store, transport, rest_scheduler=None):
+        self.store = store
+        self.transport = transport
+        self.rest_scheduler = rest_scheduler or RateLimitScheduler()
+        self.role_index = RoleIndex()
+        self.dm_channels = DMChannelCache()
+        self.reconciler = Reconciler(self)
+        self.metrics = Metrics()
+        self.metrics.instrument_store(store)
+        self.user = FakeUser(self, make_snowflake(), "reviewer-bot")
+        self.start_time = datetime.now(UTC)
+        self.channels = {}
+        self.users = {self.user.id: self.user}
+        self.guilds = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_partial_messageable(self, channel_id, **kwargs):
+        return self.channels.get(channel_id) or FakeChannel(self, channel_id, "partial", guild=None)
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(guild_id)
+
+    def add_guild(self, role_count):
+        guild = FakeGuild(self, make_snowflake(), role_count)
+        self.guilds[guild.id] = guild
+        return guild
+
+    def add_member(self, guild, roles=()):
+        user = FakeUser(self, make_snowflake(), f"user-{len(self.users)}", roles)
+        self.users[user.id] = user
+        guild.members[user.id] = user
+        return user
+
+    def message_in(self, channel, author, content="hello"):
+        message = FakeMessage(channel, content, author=author)
+        return message
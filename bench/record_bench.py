@@ -0,0 +1,160 @@
+"""Memory and parse-time benchmark for review_record.Review against plain dicts.
+
+Generates a legacy reviews.json-shaped document of N guilds x M reviews, then
+measures, for each in-memory form, how long it takes to build from the JSON
+text and how much memory the result holds (tracemalloc):
+
+- dict:   json.loads output, one dict per review under a `str(message_id)` key
+          (what the bot used to keep in memory)
+- record: the same data converted by review_record.load_reviews, one Review
+          per review under an integer key
+
+It also checks that every record round-trips through `to_dict()`.
+
+Usage (from the repository root):
+    python -m bench.record_bench --guilds 20 --reviews 10000
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, UTC
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.review_record import Review, load_reviews, timestamp_to_micros  # noqa: E402
+
+
+DISCORD_EPOCH = 1420070400000
+_increment = itertools.count()
+
+
+def make_snowflake(at=None):
+    ms = int((at if at is not None else time.time()) * 1000)
+    return ((ms - DISCORD_EPOCH) << 22) | (next(_increment) & 0x3FFFFF)
+
+
+def build_document(guild_count, review_count, role_count, rng):
+    now = time.time()
+    data = {}
+    for _ in range(guild_count):
+        roles = [make_snowflake() for _ in range(role_count)]
+        members = [make_snowflake() for _ in range(50)]
+        reviews = {}
+        for i in range(review_count):
+            created = now - rng.uniform(0, 365 * 86400)
+            reviewed = rng.random() < 0.5
+            review = {
+                'title': f"Review task {i}",
+                'link': f"https://example.com/pr/{i}" if rng.random() < 0.7 else None,
+                'author_id': rng.choice(members),
+                'timestamp': datetime.fromtimestamp(created, UTC).isoformat(),
+                'status': 'reviewed' if reviewed else 'active',
+                'role_ids': rng.sample(roles, rng.randint(0, min(3, role_count))),
+            }
+            if rng.random() < 0.1:
+                # Written by old /review calls.
+                review['role_id'] = review['role_ids'][0] if review['role_ids'] else None
+            if reviewed:
+                review['reviewed_by'] = rng.choice(members)
+                review['dm_message_id'] = make_snowflake()
+            reviews[str(make_snowflake(created))] = review
+        data[str(make_snowflake())] = {
+            'active_channel_id': make_snowflake(),
+            'reviewed_channel_id': make_snowflake(),
+            'reviews': reviews,
+        }
+    return json.dumps(data)
+
+
+def measure(build):
+    """(result, seconds, bytes held by the result) for `build()`.
+
+    Timed without tracemalloc (which slows allocation down), then built again
+    under it to count what the result keeps alive.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    held = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return result, seconds, size
+
+
+def check_round_trip(data, records):
+    mismatches = 0
+    for guild_id, guild_data in data.items():
+        for message_id, review in guild_data['reviews'].items():
+            record = records[int(guild_id)][int(message_id)]
+            restored = record.to_dict()
+            expected_roles = review.get('role_ids') or ([review['role_id']] if review.get('role_id') else [])
+            if (Review.from_dict(restored) != record
+                    or restored['role_ids'] != expected_roles
+                    or timestamp_to_micros(restored['timestamp']) != timestamp_to_micros(review['timestamp'])
+                    or any(restored[key] != review.get(key) for key in
+                           ('title', 'link', 'author_id', 'status', 'reviewed_by', 'dm_message_id'))):
+                mismatches += 1
+    return mismatches
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    text = build_document(args.guilds, args.reviews, args.roles, rng)
+    total = args.guilds * args.reviews
+
+    dicts, dict_seconds, dict_bytes = measure(lambda: json.loads(text))
+    records, record_seconds, record_bytes = measure(lambda: load_reviews(json.loads(text)))
+    mismatches = check_round_trip(dicts, records)
+    return {
+        'config': {
+            'guilds': args.guilds,
+            'reviews_per_guild': args.reviews,
+            'roles_per_guild': args.roles,
+            'seed': args.seed,
+            'python': sys.version.split()[0],
+        },
+        'json_bytes': len(text),
+        'dict': {
+            'parse_s': round(dict_seconds, 3),
+            'memory_mib': round(dict_bytes / 2**20, 1),
+            'bytes_per_review': round(dict_bytes / total),
+        },
+        'record': {
+            'parse_s': round(record_seconds, 3),
+            'memory_mib': round(record_bytes / 2**20, 1),
+            'bytes_per_review': round(record_bytes / total),
+        },
+        'memory_saved_pct': round((1 - record_bytes / dict_bytes) * 100, 1) if dict_bytes else 0.0,
+        'round_trip_mismatches': mismatches,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the memory and parse time of review records and dicts.")
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--reviews', type=int, default=10000, help="reviews per guild")
+    parser.add_argument('--roles', type=int, default=25, help="roles per guild")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help="write the JSON report here as well as to stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    report = main(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
@@ -0,0 +1,255 @@
+"""Offline benchmark for the review cogs.
+
+Runs the real ReviewCommands, ActiveReviewView, ReviewedTaskView and
+ReviewEvents handlers against bench.fake_discord on a synthetic dataset of
+N guilds x M reviews x R roles, and prints per-scenario latency percentiles,
+throughput and REST call counts as JSON.
+
+Usage (from the repository root):
+    python -m bench.run_bench --guilds 10 --reviews 1000 --roles 50 --ops 500
+    python -m bench.run_bench --latency 0.05 --output before.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fake_discord import FakeClient, FakeInteraction, FakeMessage, FakeTransport, make_snowflake  # noqa: E402
+from cogs.review_commands import ReviewCommands  # noqa: E402
+from cogs.review_dispatch import ROUTE_LIMITS, RateLimitScheduler  # noqa: E402
+from cogs.review_events import ReviewEvents  # noqa: E402
+from cogs.review_store import ReviewStore  # noqa: E402
+from cogs.review_views import ActiveReviewView, ReviewedTaskView  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples, wall, calls):
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+        'throughput_per_s': round(len(samples) / wall, 1) if wall else 0.0,
+        'http_calls': dict(calls),
+    }
+
+
+class Dataset:
+    """Synthetic guilds with their review channels, members and stored reviews."""
+
+    def __init__(self, client, guild_count, review_count, role_count, rng):
+        self.client = client
+        self.rng = rng
+        self.guilds = []
+        self.active = []
+        self.reviewed = []
+        self.guild_count = guild_count
+        self.review_count = review_count
+        self.role_count = role_count
+
+    async def build(self):
+        store = self.client.store
+        for _ in range(self.guild_count):
+            guild = self.client.add_guild(self.role_count)
+            active_channel = await guild.create_text_channel('active-reviews')
+            reviewed_channel = await guild.create_text_channel('reviewed-tasks')
+            store.set_guild(guild.id, active_channel.id, reviewed_channel.id)
+            roles = guild.roles[1:]
+            members = [
+                self.client.add_member(guild, self.rng.sample(roles, min(len(roles), 3)))
+                for _ in range(max(1, self.review_count // 20))
+            ]
+            self.guilds.append((guild, active_channel, reviewed_channel, members))
+            for i in range(self.review_count):
+                author = self.rng.choice(members)
+                review_roles = self.rng.sample(roles, min(len(roles), self.rng.randint(0, 3)))
+                status = 'active' if i % 2 == 0 else 'reviewed'
+                channel = active_channel if status == 'active' else reviewed_channel
+                embed = discord.Embed(title=f"📝 **Task {i}**", color=discord.Color.orange())
+                if review_roles:
+                    embed.add_field(name="**Roles**", value=" ".join(role.mention for role in review_roles), inline=False)
+                message = FakeMessage(channel, embed=embed, author=self.client.user)
+                channel.messages[message.id] = message
+                dm = await author.send("Your task has been reviewed.") if status == 'reviewed' else None
+                store.add_review(guild.id, message.id, {
+                    'title': f"Task {i}",
+                    'role_ids': [role.id for role in review_roles],
+                    'link': None,
+                    'author_id': author.id,
+                    'timestamp': message.created_at.isoformat(),
+                    'status': status,
+                    'reviewed_by': author.id if status == 'reviewed' else None,
+                    'dm_message_id': dm.id if dm else None,
+                    'dm_channel_id': dm.channel.id if dm else None
+                })
+                (self.active if status == 'active' else self.reviewed).append((guild, message, author))
+        await store.flush()
+        self.client.transport.calls.clear()
+
+    def take(self, pool):
+        return pool.pop(self.rng.randrange(len(pool)))
+
+
+async def run_scenario(name, client, ops, concurrency, make_call):
+    client.transport.calls.clear()
+    samples = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            call = make_call(i)
+            if call is None:
+                return
+            start = time.perf_counter()
+            await call
+            samples.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(ops)))
+    wall = time.perf_counter() - wall_start
+    return name, summarize(samples, wall, client.transport.calls)
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='reviewer-bench-')
+    store = ReviewStore(os.path.join(workdir, 'reviews.db'))
+    store.start()
+    transport = FakeTransport(latency=0.0)
+    if args.pacing:
+        rest_scheduler = RateLimitScheduler()
+    else:
+        # Real bucket sizes would make the run take minutes; by default only
+        # the scheduler's own overhead is measured.
+        unlimited = (10 ** 9, 1.0)
+        rest_scheduler = RateLimitScheduler({route: unlimited for route in ROUTE_LIMITS}, unlimited)
+    client = FakeClient(store, transport, rest_scheduler)
+    dataset = Dataset(client, args.guilds, args.reviews, args.roles, rng)
+    build_start = time.perf_counter()
+    await dataset.build()
+    build_seconds = time.perf_counter() - build_start
+    transport.latency = args.latency
+
+    commands_cog = ReviewCommands(client)
+    events_cog = ReviewEvents(client)
+    results = {}
+
+    def create(i):
+        guild, _, _, members = rng.choice(dataset.guilds)
+        author = rng.choice(members)
+        interaction = FakeInteraction(client, guild, author, channel_id=make_snowflake())
+        role = rng.choice(guild.roles[1:]) if guild.roles[1:] else None
+        return commands_cog.review_task.callback(commands_cog, interaction, f"Bench task {i}", role, "https://example.com/pr/1")
+
+    def mark_reviewed(i):
+        if not dataset.active:
+            return None
+        guild, message, author = dataset.take(dataset.active)
+        view = ActiveReviewView()
+        return view.mark_reviewed.callback(FakeInteraction(client, guild, author, message=message))
+
+    def move_back(i):
+        if not dataset.reviewed:
+            return None
+        guild, message, author = dataset.take(dataset.reviewed)
+        view = ReviewedTaskView()
+        return view.move_back.callback(FakeInteraction(client, guild, author, message=message))
+
+    def delete(i):
+        pool = dataset.active if i % 2 == 0 and dataset.active else dataset.reviewed
+        if not pool:
+            return None
+        guild, message, author = dataset.take(pool)
+        interaction = FakeInteraction(client, guild, author, message=message)
+        if message.channel.name == 'active-reviews':
+            return ActiveReviewView().delete_active_task.callback(interaction)
+        return ReviewedTaskView().delete_task.callback(interaction)
+
+    def on_message(i):
+        guild, active_channel, reviewed_channel, members = rng.choice(dataset.guilds)
+        if rng.random() < args.watched_ratio:
+            channel = rng.choice((active_channel, reviewed_channel))
+        else:
+            channel = client.get_partial_messageable(make_snowflake())
+            channel.guild = guild
+        return events_cog.on_message(client.message_in(channel, rng.choice(members)))
+
+    scenarios = {
+        'create': create,
+        'mark_reviewed': mark_reviewed,
+        'move_back': move_back,
+        'delete': delete,
+        'on_message': on_message,
+    }
+    selected = args.scenarios or list(scenarios)
+    for name in selected:
+        ops = args.ops * args.message_multiplier if name == 'on_message' else args.ops
+        scenario, summary = await run_scenario(name, client, ops, args.concurrency, scenarios[name])
+        results[scenario] = summary
+
+    await store.flush()
+    await asyncio.gather(*rest_scheduler._tasks)
+    output = {
+        'config': {
+            'guilds': args.guilds,
+            'reviews_per_guild': args.reviews,
+            'roles_per_guild': args.roles,
+            'ops': args.ops,
+            'concurrency': args.concurrency,
+            'latency_s': args.latency,
+            'pacing': args.pacing,
+            'seed': args.seed,
+            'python': sys.version.split()[0],
+            'discord_py': discord.__version__,
+        },
+        'dataset_build_s': round(build_seconds, 3),
+        'store': dict(store.stats, queue_depth=store.queue_depth, journal_bytes=store.journal_bytes),
+        'results': results,
+    }
+    await store.close()
+    return output
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the review cogs against a fake Discord transport.")
+    parser.add_argument('--guilds', type=int, default=5)
+    parser.add_argument('--reviews', type=int, default=200, help="reviews per guild")
+    parser.add_argument('--roles', type=int, default=25, help="roles per guild")
+    parser.add_argument('--ops', type=int, default=200, help="operations per scenario")
+    parser.add_argument('--message-multiplier', type=int, default=10,
+                        help="on_message runs ops x this many messages")
+    parser.add_argument('--watched-ratio', type=float, default=0.05,
+                        help="fraction of on_message events posted in review channels")
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated REST round trip in seconds")
+    parser.add_argument('--pacing', action='store_true', help="apply Discord's real per-route rate limits")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--scenarios', nargs='*', choices=['create', 'mark_reviewed', 'move_back', 'delete', 'on_message'])
+    parser.add_argument('--output', help="write the JSON report here as well as to stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from .review_utils import is_valid_url
+
+# Limits for /review-batch attachments.
+MAX_BATCH_ROWS = 100
+MAX_BATCH_BYTES = 256 * 1024
+# Embed titles hold 256 characters, including the "📝 **...**" decoration.
+MAX_TITLE_LENGTH = 240
+# Separator for several role names in one CSV cell.
+ROLE_SEPARATOR = ';'
+
+
+class BatchError(Exception):
+    """Raised when an attachment can't be read as a batch at all."""
+
+
+class BatchRow:
+    """One row of a batch: the parsed task, or why it was rejected."""
+    __slots__ = ('number', 'title', 'link', 'role_names', 'roles', 'error', 'message_id')
+
+    def __init__(self, number, title, link, role_names, error=None):
+        self.number = number
+        self.title = title
+        self.link = link
+        self.role_names = role_names
+        self.roles = []
+        self.error = error
+        self.message_id = None
+
+
+def _role_names(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(ROLE_SEPARATOR)
+    return [str(name).strip() for name in value if str(name).strip()]
+
+
+def _row(number, data):
+    if not isinstance(data, dict):
+        return BatchRow(number, None, None, [], "not an object")
+    data = {str(key).strip().lower(): value for key, value in data.items() if key is not None}
+    title = str(data.get('title') or '').strip()
+    link = str(data.get('link') or '').strip() or None
+    role_names = _role_names(data.get('roles', data.get('role')))
+    row = BatchRow(number, title, link, role_names)
+    if not title:
+        row.error = "missing title"
+    elif len(title) > MAX_TITLE_LENGTH:
+        row.error = f"title longer than {MAX_TITLE_LENGTH} characters"
+    elif link and not is_valid_url(link):
+        row.error = "link is not a valid http(s) URL"
+    return row
+
+
+def parse_batch(filename, data):
+    """BatchRows from a CSV (with a title,link,roles header) or NDJSON attachment.
+
+    Rows are numbered from 1 in file order, blank lines skipped. Role names
+    are only split here; `resolve_roles()` looks them up.
+    """
+    if len(data) > MAX_BATCH_BYTES:
+        raise BatchError(f"The file is larger than {MAX_BATCH_BYTES // 1024} KiB.")
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise BatchError("The file is not UTF-8 text.") from None
+    rows = []
+    if filename.lower().endswith(('.ndjson', '.jsonl', '.json')):
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(_row(len(rows) + 1, json.loads(line)))
+            except json.JSONDecodeError:
+                rows.append(BatchRow(len(rows) + 1, None, None, [], "not valid JSON"))
+    elif filename.lower().endswith('.csv'):
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or 'title' not in (name.strip().lower() for name in reader.fieldnames):
+            raise BatchError("The CSV file needs a header row with a `title` column (and optionally `link` and `roles`).")
+        for record in reader:
+            if any((value or '').strip() for value in record.values() if isinstance(value, str)):
+                rows.append(_row(len(rows) + 1, record))
+    else:
+        raise BatchError("Attach a `.csv` or `.ndjson` file.")
+    if not rows:
+        raise BatchError("The file has no rows.")
+    if len(rows) > MAX_BATCH_ROWS:
+        raise BatchError(f"The file has {len(rows)} rows; at most {MAX_BATCH_ROWS} can be submitted at once.")
+    return rows
+
+
+def resolve_roles(rows, role_index, guild):
+    """Look up each valid row's role names with the guild's RoleIndex, rejecting rows naming unknown roles."""
+    for row in rows:
+        if row.error:
+            continue
+        missing = []
+        for name in row.role_names:
+            entry = role_index.find(guild, name)
+            role = guild.get_role(entry.id) if entry else None
+            if role is None:
+                missing.append(name)
+            elif role not in row.roles:
+                row.roles.append(role)
+        if missing:
+            row.error = "unknown role " + ", ".join(f"`{name}`" for name in missing)
+
+
+async def setup(bot):
+    pass
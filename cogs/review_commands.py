@@ -1,13 +1,24 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from .review_utils import is_valid_url, load_data, save_data
-from .review_views import RoleSelectView, CreateReviewButtonView, ActiveReviewView
+from .review_utils import is_valid_url, send_conflict_notice
+from .review_store import TransactionConflict
+from .review_dispatch import ROUTE_SEND_MESSAGE
+from .review_sync import sync_commands
+from .review_shards import STATUS_STALE_AFTER, read_statuses
+from .review_metrics import metrics_port, timed
+from .review_profiler import MAX_PROFILE_SECONDS
+from .review_reminders import MAX_REMINDER_HOURS
+from .review_batch import MAX_BATCH_BYTES, MAX_BATCH_ROWS, BatchError, parse_batch, resolve_roles
+from .review_maintenance import BulkRemoval, select_reviews
+from .review_views import RoleSelectView, CreateReviewButtonView, ActiveReviewView, ReviewListView, ConfirmView, discard_message
 from .review_modals import DeleteConfirmationModal, CreateReviewModal
 from datetime import datetime, UTC, timedelta
 import asyncio
+import io
 import json
 import os
+import time
 
 def format_timedelta(td):
     days = td.days
@@ -24,6 +35,10 @@ class ReviewCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        if isinstance(getattr(error, 'original', None), TransactionConflict):
+            await send_conflict_notice(interaction)
+
     @app_commands.command(name="help", description="Shows help for bot commands")
     async def help_command(self, interaction: discord.Interaction):
         is_admin = False
@@ -56,7 +71,46 @@ class ReviewCommands(commands.Cog):
             ),
             inline=False
         )
+        embed.add_field(
+            name=":inbox_tray: `/review-batch`",
+            value=(
+                f"Submit up to {MAX_BATCH_ROWS} tasks at once from an attached file.\n"
+                "**Usage:** `/review-batch file: tasks.csv`\n"
+                "- CSV with a `title,link,roles` header (several roles separated by `;`), "
+                "or NDJSON with one `{\"title\": ..., \"link\": ..., \"roles\": [...]}` per line.\n"
+                "- Roles are matched by name; you get a report of which rows were posted."
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name=":mag: `/reviews`",
+            value=(
+                "List reviews, oldest first.\n"
+                "**Usage:** `/reviews status: Active author: @User role: @Role older_than_days: 3`\n"
+                "- Every filter is optional; `status` defaults to active reviews."
+            ),
+            inline=False
+        )
         if is_admin:
+            embed.add_field(
+                name=":bell: `/reminders`",
+                value=(
+                    "Ping a review's roles, then its author, when it has waited too long in active-reviews.\n"
+                    "**Usage:** `/reminders roles_after_hours: 24 author_after_hours: 72` *(Admin only)*\n"
+                    "- `0` turns a reminder off; no options shows the current settings."
+                ),
+                inline=False
+            )
+            embed.add_field(
+                name=":file_cabinet: `/archive` and `/purge`",
+                value=(
+                    "Clean out old reviews in bulk: `/archive` removes their messages but keeps the records, "
+                    "`/purge` deletes both.\n"
+                    "**Usage:** `/archive older_than_days: 30 include_active: False author: @User role: @Role` *(Admin only)*\n"
+                    "- Reviewed tasks only unless `include_active` is set; you confirm before anything is removed."
+                ),
+                inline=False
+            )
             embed.add_field(
                 name=":wastebasket: `/delete`",
                 value="Delete the review channels after confirmation. *(Admin only)*",
@@ -71,37 +125,33 @@ class ReviewCommands(commands.Cog):
 
     @app_commands.command(name="create", description="Create two new channels for active and reviewed tasks")
     @app_commands.default_permissions(administrator=True)
+    @timed('create')
     async def create_channels(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         guild_id = str(interaction.guild_id)
-        data = load_data()
-        if guild_id in data:
-            await interaction.followup.send(embed=discord.Embed(
-                description=":warning: **Review channels already exist for this server.**\nUse `/delete` to remove them first.",
-                color=discord.Color.red()), ephemeral=True)
-            return
-        active_overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(send_messages=True, use_application_commands=True),
-            interaction.guild.me: discord.PermissionOverwrite(send_messages=True, manage_messages=True)
-        }
-        reviewed_overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(send_messages=False, use_application_commands=False),
-            interaction.guild.me: discord.PermissionOverwrite(send_messages=True, manage_messages=True)
-        }
-        try:
-            active_channel = await interaction.guild.create_text_channel('active-reviews', overwrites=active_overwrites)
-            reviewed_channel = await interaction.guild.create_text_channel('reviewed-tasks', overwrites=reviewed_overwrites)
-        except discord.Forbidden:
-            await interaction.followup.send(embed=discord.Embed(
-                description="⚠️ Failed to create channels. Please check bot permissions.",
-                color=discord.Color.red()), ephemeral=True)
-            return
-        data[guild_id] = {
-            "active_channel_id": active_channel.id,
-            "reviewed_channel_id": reviewed_channel.id,
-            "reviews": {}
-        }
-        save_data(data)
+        async with self.bot.store.guild(guild_id) as g:
+            if g.config:
+                await interaction.followup.send(embed=discord.Embed(
+                    description=":warning: **Review channels already exist for this server.**\nUse `/delete` to remove them first.",
+                    color=discord.Color.red()), ephemeral=True)
+                return
+            active_overwrites = {
+                interaction.guild.default_role: discord.PermissionOverwrite(send_messages=True, use_application_commands=True),
+                interaction.guild.me: discord.PermissionOverwrite(send_messages=True, manage_messages=True)
+            }
+            reviewed_overwrites = {
+                interaction.guild.default_role: discord.PermissionOverwrite(send_messages=False, use_application_commands=False),
+                interaction.guild.me: discord.PermissionOverwrite(send_messages=True, manage_messages=True)
+            }
+            try:
+                active_channel = await interaction.guild.create_text_channel('active-reviews', overwrites=active_overwrites)
+                reviewed_channel = await interaction.guild.create_text_channel('reviewed-tasks', overwrites=reviewed_overwrites)
+            except discord.Forbidden:
+                await interaction.followup.send(embed=discord.Embed(
+                    description="⚠️ Failed to create channels. Please check bot permissions.",
+                    color=discord.Color.red()), ephemeral=True)
+                return
+            g.set(active_channel.id, reviewed_channel.id)
         try:
             await active_channel.edit(topic="Post review requests here. Use the 'Mark as Reviewed' button to move tasks.")
             await reviewed_channel.edit(topic="Reviewed tasks are moved here. Use 'Move Back' or 'Delete' buttons to manage.")
@@ -155,10 +205,10 @@ class ReviewCommands(commands.Cog):
         role="The role to assign to the task (optional)",
         link="A URL related to the task (optional)"
     )
+    @timed('review_task')
     async def review_task(self, interaction: discord.Interaction, title: str, role: discord.Role = None, link: str = None):
         guild_id = str(interaction.guild_id)
-        data = load_data()
-        guild_data = data.get(guild_id, {})
+        guild_data = self.bot.store.get_guild(guild_id) or {}
         active_channel_id = guild_data.get('active_channel_id')
         if link and not is_valid_url(link):
             await interaction.response.send_message(embed=discord.Embed(
@@ -186,18 +236,23 @@ class ReviewCommands(commands.Cog):
             embed.add_field(name="**Role**", value=role.mention, inline=False)
         if link:
             embed.add_field(name="**Link**", value=f"[Click here]({link})", inline=False)
-        review_msg = await active_channel.send(embed=embed, view=ActiveReviewView())
-        guild_data.setdefault('reviews', {})[str(review_msg.id)] = {
-            'title': title,
-            'role_id': role.id if role else None,
-            'link': link,
-            'author_id': interaction.user.id,
-            'timestamp': review_msg.created_at.isoformat(),
-            'status': 'active'
-        }
-        data[guild_id] = guild_data
-        save_data(data)
-        await interaction.response.send_message(":white_check_mark: **Task submitted for review in the active-reviews channel.**", ephemeral=True)
+        # The send below is paced per channel and can outlast the 3 second
+        # acknowledgement window during a burst, so acknowledge first.
+        await interaction.response.defer(ephemeral=True)
+        async with self.bot.store.review(guild_id) as tx:
+            review_msg = await self.bot.rest_scheduler.run(
+                ROUTE_SEND_MESSAGE, active_channel.id,
+                lambda: active_channel.send(embed=embed, view=ActiveReviewView())
+            )
+            tx.put(review_msg.id, {
+                'title': title,
+                'role_ids': [role.id] if role else [],
+                'link': link,
+                'author_id': interaction.user.id,
+                'timestamp': review_msg.created_at.isoformat(),
+                'status': 'active'
+            })
+        await interaction.followup.send(":white_check_mark: **Task submitted for review in the active-reviews channel.**", ephemeral=True)
         if active_channel_id == interaction.channel_id:
             await asyncio.sleep(10)
             try:
@@ -205,12 +260,261 @@ class ReviewCommands(commands.Cog):
             except discord.HTTPException:
                 pass
 
+    @app_commands.command(name="review-batch", description="Submit several tasks for review from a CSV or NDJSON file")
+    @app_commands.describe(file="CSV with a title,link,roles header, or NDJSON with one {\"title\", \"link\", \"roles\"} per line")
+    @timed('review_batch')
+    async def review_batch(self, interaction: discord.Interaction, file: discord.Attachment):
+        guild_id = str(interaction.guild_id)
+        guild_data = self.bot.store.get_guild(guild_id) or {}
+        active_channel = self.bot.get_channel(guild_data.get('active_channel_id'))
+        if not active_channel:
+            await interaction.response.send_message(embed=discord.Embed(
+                description=":warning: **No active review channel found.**\nPlease create one using `/create`.",
+                color=discord.Color.red()), ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            if file.size > MAX_BATCH_BYTES:
+                raise BatchError(f"The file is larger than {MAX_BATCH_BYTES // 1024} KiB.")
+            rows = parse_batch(file.filename, await file.read())
+        except (BatchError, discord.HTTPException) as e:
+            await interaction.followup.send(embed=discord.Embed(
+                description=f":warning: **Could not read `{file.filename}`.** {e}",
+                color=discord.Color.red()), ephemeral=True)
+            return
+        resolve_roles(rows, self.bot.role_index, interaction.guild)
+        valid = [row for row in rows if not row.error]
+
+        async def post(row):
+            embed = review_embed(interaction.user, row.title, row.roles, row.link)
+            return await self.bot.rest_scheduler.run(
+                ROUTE_SEND_MESSAGE, active_channel.id,
+                lambda: active_channel.send(embed=embed, view=ActiveReviewView())
+            )
+
+        # All sends are queued at once so the scheduler keeps the channel's
+        # bucket busy, and every new review goes into one store write.
+        posted_messages = []
+        try:
+            async with self.bot.store.review(guild_id) as tx:
+                results = await asyncio.gather(*(post(row) for row in valid), return_exceptions=True)
+                for row, result in zip(valid, results):
+                    if isinstance(result, discord.HTTPException):
+                        row.error = f"could not post ({result.status})"
+                        continue
+                    if isinstance(result, Exception):
+                        print(f"Error: Could not post batch row {row.number} in guild {guild_id}: {result!r}")
+                        row.error = "could not post"
+                        continue
+                    if isinstance(result, BaseException):
+                        raise result
+                    posted_messages.append(result)
+                    row.message_id = result.id
+                    tx.put(result.id, {
+                        'title': row.title,
+                        'role_ids': [role.id for role in row.roles],
+                        'link': row.link,
+                        'author_id': interaction.user.id,
+                        'timestamp': result.created_at.isoformat(),
+                        'status': 'active'
+                    })
+        except BaseException:
+            # Nothing was saved (e.g. the guild was reconfigured mid-batch), so
+            # take down the posted messages rather than leave dead buttons.
+            for message in posted_messages:
+                self.bot.rest_scheduler.spawn(discard_message(self.bot.rest_scheduler, message))
+            raise
+
+        posted = sum(1 for row in rows if row.message_id)
+        lines = [
+            f"`{row.number}` :white_check_mark: [{row.title}]({active_channel.get_partial_message(row.message_id).jump_url})"
+            if row.message_id else f"`{row.number}` :x: {row.title or '(no title)'}: {row.error}"
+            for row in rows
+        ]
+        embed = discord.Embed(
+            title=f":inbox_tray: Submitted {posted} of {len(rows)} tasks",
+            color=discord.Color.green() if posted == len(rows) else discord.Color.orange()
+        )
+        report = "\n".join(lines)
+        if len(report) <= 4000:
+            embed.description = report
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            embed.description = "The per-row report is attached."
+            await interaction.followup.send(embed=embed, ephemeral=True,
+                                            file=discord.File(io.BytesIO(report.encode()), filename="review-batch-report.txt"))
+
+    @app_commands.command(name="reviews", description="List reviews by status, author, role and age")
+    @app_commands.describe(
+        status="Which reviews to list (default: active)",
+        author="Only reviews submitted by this member",
+        role="Only reviews assigned to this role",
+        older_than_days="Only reviews at least this many days old"
+    )
+    @app_commands.choices(status=[
+        app_commands.Choice(name="Active", value="active"),
+        app_commands.Choice(name="Reviewed", value="reviewed"),
+        app_commands.Choice(name="Archived", value="archived"),
+        app_commands.Choice(name="All", value="all")
+    ])
+    @timed('list_reviews')
+    async def list_reviews(self, interaction: discord.Interaction, status: app_commands.Choice[str] = None,
+                           author: discord.Member = None, role: discord.Role = None,
+                           older_than_days: app_commands.Range[int, 0, 3650] = None):
+        guild_id = str(interaction.guild_id)
+        if not self.bot.store.get_guild(guild_id):
+            await interaction.response.send_message(embed=discord.Embed(
+                description=":warning: **No active review channel found.**\nPlease create one using `/create`.",
+                color=discord.Color.red()), ephemeral=True)
+            return
+        status_value = status.value if status else 'active'
+        before = None
+        if older_than_days is not None:
+            before = (datetime.now(UTC) - timedelta(days=older_than_days)).timestamp()
+        message_ids = self.bot.store.query_reviews(
+            guild_id,
+            status=None if status_value == 'all' else status_value,
+            author_id=author.id if author else None,
+            role_id=role.id if role else None,
+            before=before
+        )
+        heading = {"active": "Active Reviews", "reviewed": "Reviewed Tasks", "archived": "Archived Reviews",
+                   "all": "All Reviews"}[status_value]
+        if author:
+            heading += f" by {author.display_name}"
+        if role:
+            heading += f" for @{role.name}"
+        if older_than_days:
+            heading += f" older than {older_than_days}d"
+        view = ReviewListView(guild_id, message_ids, heading)
+        await interaction.response.send_message(embed=view.build_embed(self.bot), view=view, ephemeral=True)
+
+    @app_commands.command(name="reminders", description="Configure reminders for reviews left waiting in active-reviews")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        roles_after_hours="Ping the review's roles after this many hours (0 = off)",
+        author_after_hours="Ping the review's author after this many hours (0 = off)"
+    )
+    @timed('reminders')
+    async def configure_reminders(self, interaction: discord.Interaction,
+                                  roles_after_hours: app_commands.Range[int, 0, MAX_REMINDER_HOURS] = None,
+                                  author_after_hours: app_commands.Range[int, 0, MAX_REMINDER_HOURS] = None):
+        guild_id = str(interaction.guild_id)
+        if not self.bot.store.get_guild(guild_id):
+            await interaction.response.send_message(embed=discord.Embed(
+                description=":warning: **No active review channel found.**\nPlease create one using `/create`.",
+                color=discord.Color.red()), ephemeral=True)
+            return
+        reminders = self.bot.reminders
+        config = reminders.config(guild_id)
+        changed = roles_after_hours is not None or author_after_hours is not None
+        if changed:
+            if roles_after_hours is None:
+                roles_after_hours = config.get('roles_after_hours') or 0
+            if author_after_hours is None:
+                author_after_hours = config.get('author_after_hours') or 0
+            await reminders.set_config(guild_id, roles_after_hours, author_after_hours)
+            config = reminders.config(guild_id)
+
+        def describe(hours, who):
+            return f"Ping {who} after **{hours}h**" if hours else f"No reminder to {who}"
+
+        await interaction.response.send_message(embed=discord.Embed(
+            title=":bell: Reminders updated" if changed else ":bell: Reminders",
+            description=(
+                f"{describe(config.get('roles_after_hours'), 'the assigned roles')}\n"
+                f"{describe(config.get('author_after_hours'), 'the author')}"
+            ),
+            color=discord.Color.green() if changed else discord.Color.blurple()), ephemeral=True)
+
+    @app_commands.command(name="archive", description="Archive old reviews: remove their messages but keep their records")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        older_than_days="Only reviews at least this many days old",
+        include_active="Also archive active reviews this old (default: reviewed tasks only)",
+        author="Only reviews submitted by this member",
+        role="Only reviews assigned to this role"
+    )
+    @timed('archive')
+    async def archive_reviews(self, interaction: discord.Interaction, older_than_days: app_commands.Range[int, 0, 3650],
+                              include_active: bool = False, author: discord.Member = None, role: discord.Role = None):
+        await self.bulk_maintenance(interaction, True, older_than_days, include_active, author, role)
+
+    @app_commands.command(name="purge", description="Permanently delete old reviews and their messages")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        older_than_days="Only reviews at least this many days old",
+        include_active="Also purge active reviews this old (default: reviewed tasks only)",
+        author="Only reviews submitted by this member",
+        role="Only reviews assigned to this role"
+    )
+    @timed('purge')
+    async def purge_reviews(self, interaction: discord.Interaction, older_than_days: app_commands.Range[int, 0, 3650],
+                            include_active: bool = False, author: discord.Member = None, role: discord.Role = None):
+        await self.bulk_maintenance(interaction, False, older_than_days, include_active, author, role)
+
+    async def bulk_maintenance(self, interaction, archive, older_than_days, include_active, author, role):
+        guild_id = str(interaction.guild_id)
+        store = self.bot.store
+        if not store.get_guild(guild_id):
+            await interaction.response.send_message(embed=discord.Embed(
+                description=":warning: **No active review channel found.**\nPlease create one using `/create`.",
+                color=discord.Color.red()), ephemeral=True)
+            return
+        statuses = ('reviewed', 'active') if include_active else ('reviewed',)
+        filters = dict(older_than_days=older_than_days, author_id=author.id if author else None,
+                       role_id=role.id if role else None)
+        verb = "Archive" if archive else "Purge"
+        message_ids = select_reviews(store, guild_id, statuses, **filters)
+        if not message_ids:
+            await interaction.response.send_message(embed=discord.Embed(
+                description=f"No {' or '.join(statuses)} reviews older than {older_than_days} days match these filters.",
+                color=discord.Color.blurple()), ephemeral=True)
+            return
+        counts = {status: len(select_reviews(store, guild_id, (status,), **filters)) for status in statuses}
+        effect = ("Their messages are removed from the review channels; the records stay listed under `/reviews status: Archived`."
+                  if archive else "Their messages and records are **permanently deleted**.")
+        view = ConfirmView(interaction.user.id, f"{verb} {len(message_ids)}")
+        await interaction.response.send_message(embed=discord.Embed(
+            title=f":warning: {verb} {len(message_ids)} reviews?",
+            description=" · ".join(f"{count} {status}" for status, count in counts.items()) + f"\n{effect}",
+            color=discord.Color.orange()), view=view, ephemeral=True)
+        await view.wait()
+        if not view.confirmed:
+            await interaction.edit_original_response(embed=discord.Embed(
+                description="Cancelled; nothing was changed.", color=discord.Color.light_grey()), view=None)
+            return
+
+        async def report(done, total, finished=False):
+            embed = discord.Embed(
+                title=f":white_check_mark: {verb}d {total} reviews" if finished else f":hourglass: {verb[:-1]}ing {total} reviews…",
+                description=f"Messages removed: {done}/{total}",
+                color=discord.Color.green() if finished else discord.Color.orange())
+            if finished:
+                stats = removal.stats
+                embed.description += (f"\nBulk deleted: {stats['bulk_deleted']} · One by one: {stats['single_deleted']}"
+                                      f" · Already gone: {stats['missing']} · Failed: {stats['failed']}")
+                if stats['busy']:
+                    embed.description += f"\nSkipped {stats['busy']} reviews being worked on; run the command again to include them."
+            try:
+                await interaction.edit_original_response(embed=embed, view=None)
+            except discord.HTTPException:
+                # The interaction token expires after 15 minutes; the work goes on.
+                pass
+
+        # Selected again: reviews may have changed while the confirmation was open.
+        removal = BulkRemoval(self.bot, guild_id, archive)
+        channels = await removal.commit(select_reviews(store, guild_id, statuses, **filters))
+        await report(0, removal.total)
+        await removal.delete_messages(channels, report)
+        await report(removal.done, removal.total, finished=True)
+
     @app_commands.command(name="delete", description="Delete the active-reviews and reviewed-tasks channels after confirmation")
     @app_commands.default_permissions(administrator=True)
+    @timed('delete')
     async def delete_channels(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild_id)
-        data = load_data()
-        guild_data = data.get(guild_id, {})
+        guild_data = self.bot.store.get_guild(guild_id) or {}
         active_channel_id = guild_data.get('active_channel_id')
         reviewed_channel_id = guild_data.get('reviewed_channel_id')
         if not guild_data or (active_channel_id is None and reviewed_channel_id is None):
@@ -221,6 +525,51 @@ class ReviewCommands(commands.Cog):
         modal = DeleteConfirmationModal()
         await interaction.response.send_modal(modal)
 
+    @commands.command(name="sync")
+    @commands.is_owner()
+    async def sync(self, ctx):
+        """Force a global slash command sync (owner only)."""
+        try:
+            _, digest = await sync_commands(self.bot, force=True)
+        except discord.HTTPException as e:
+            await ctx.send(embed=discord.Embed(
+                description=f":warning: **Sync failed:** {e}",
+                color=discord.Color.red()))
+            return
+        await ctx.send(embed=discord.Embed(
+            description=f":white_check_mark: **Synced {len(self.bot.tree.get_commands())} commands.** `{digest[:12]}`",
+            color=discord.Color.green()))
+
+    @commands.command(name="profile")
+    @commands.is_owner()
+    async def profile(self, ctx, mode: str = "cpu", seconds: int = 30, top: int = 25):
+        """Profile CPU (`cpu`) or allocations (`mem`) for N seconds and DM the report (owner only)."""
+        mode = mode.lower()
+        if mode not in ("cpu", "mem"):
+            await ctx.send(embed=discord.Embed(
+                description=":warning: **Usage:** `profile cpu|mem [seconds] [top]`",
+                color=discord.Color.red()))
+            return
+        profiler = self.bot.profiler
+        if profiler.running:
+            await ctx.send(embed=discord.Embed(
+                description=":hourglass: **A profile is already running.**",
+                color=discord.Color.orange()))
+            return
+        seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+        top = max(1, min(top, 200))
+        await ctx.send(embed=discord.Embed(
+            description=f":stopwatch: **Profiling {mode} for {seconds}s.** The report will be sent by DM.",
+            color=discord.Color.blurple()))
+        report = await profiler.profile(mode, seconds, top)
+        filename = f"profile-{mode}-{datetime.now(UTC).strftime('%Y%m%d-%H%M%S')}.txt"
+        try:
+            await ctx.author.send(file=discord.File(io.BytesIO(report.encode()), filename=filename))
+        except discord.Forbidden:
+            await ctx.send(embed=discord.Embed(
+                description=":warning: **Could not DM you the report.** Please allow DMs from this server.",
+                color=discord.Color.red()))
+
     @commands.command(name="status")
     @commands.is_owner()
     async def status(self, ctx):
@@ -232,6 +581,130 @@ class ReviewCommands(commands.Cog):
             color=discord.Color.blurple()
         )
         embed.add_field(name="Uptime", value=format_timedelta(uptime), inline=False)
+        store_stats = self.bot.store.stats
+        avg_flush = store_stats['total_flush_ms'] / store_stats['flushes'] if store_stats['flushes'] else 0.0
+        embed.add_field(
+            name="Storage",
+            value=(
+                f"Writer: {'running' if self.bot.store.writer_running else '**stopped**'}, "
+                f"{store_stats['write_errors']} write errors\n"
+                f"Queue depth: {self.bot.store.queue_depth}\n"
+                f"Flushes: {store_stats['flushes']} ({store_stats['flushed_ops']} writes)\n"
+                f"Flush latency: last {store_stats['last_flush_ms']:.1f} ms, "
+                f"avg {avg_flush:.1f} ms, max {store_stats['max_flush_ms']:.1f} ms\n"
+                f"Journal: {self.bot.store.journal_bytes / 1024:.1f} KiB, "
+                f"{store_stats['compactions']} compactions (last {store_stats['last_compaction_ms']:.1f} ms)"
+            ),
+            inline=False
+        )
+        rest_stats = self.bot.rest_scheduler.stats
+        embed.add_field(
+            name="Discord REST",
+            value=(
+                f"Paced calls: {rest_stats['calls']} ({rest_stats['delayed']} delayed, "
+                f"{rest_stats['wait_seconds']:.1f} s total wait)\n"
+                f"Background tasks: {self.bot.rest_scheduler.pending}"
+            ),
+            inline=False
+        )
+
+        events_cog = self.bot.get_cog('ReviewEvents')
+        if events_cog:
+            moderation = events_cog.stats
+            embed.add_field(
+                name="Channel Moderation",
+                value=(
+                    f"Messages removed: {moderation['dropped']} "
+                    f"({moderation['bulk_deletes']} bulk, {moderation['single_deletes']} single deletes)\n"
+                    f"Warnings posted: {moderation['warnings']}"
+                ),
+                inline=False
+            )
+
+        if self.bot.shard_config:
+            lines = []
+            for group in read_statuses():
+                age = time.time() - group['updated_at']
+                started = datetime.fromisoformat(group['started_at']) if group.get('started_at') else None
+                group_uptime = format_timedelta(now - started) if started else "starting"
+                latency = ", ".join(f"#{shard}: {ms:.0f} ms" for shard, ms in group['latency_ms'].items())
+                line = (f"**Group {group['group']}** (pid {group['pid']}): up {group_uptime}, "
+                        f"{group['guilds']} guilds, {latency}")
+                if age > STATUS_STALE_AFTER:
+                    line += f" :warning: *no update for {format_timedelta(timedelta(seconds=int(age)))}*"
+                lines.append(line)
+            embed.add_field(name="Shards", value="\n".join(lines)[:1024] or "No shard status reported yet.", inline=False)
+
+        reconcile_stats = self.bot.reconciler.stats
+        embed.add_field(
+            name="Reconciliation",
+            value=(
+                f"Passes: {reconcile_stats['passes']} ({reconcile_stats['full_scans']} full channel scans"
+                f"{', running' if self.bot.reconciler.running else ''})\n"
+                f"Messages read: {reconcile_stats['scanned']}, last pass {reconcile_stats['last_pass_s']:.1f} s\n"
+                f"Orphans pruned: {reconcile_stats['pruned']}, buttons re-attached: {reconcile_stats['reattached']}"
+            ),
+            inline=False
+        )
+
+        metrics = self.bot.metrics
+        handler_lines = []
+        for handler in metrics.handler_seconds.label_values('handler'):
+            p50 = metrics.handler_seconds.quantile(0.5, handler=handler)
+            p95 = metrics.handler_seconds.quantile(0.95, handler=handler)
+            handler_lines.append(f"`{handler}` {metrics.handler_seconds.count(handler=handler)}: "
+                                 f"p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms")
+        http_p95 = metrics.http_seconds.quantile(0.95)
+        embed.add_field(
+            name="Metrics",
+            value=(
+                "\n".join(handler_lines[:8] or ["No interactions handled yet."]) + "\n"
+                f"Discord HTTP: {metrics.http_seconds.count()} requests"
+                f"{f', p95 {http_p95 * 1000:.0f} ms' if http_p95 is not None else ''}, "
+                f"{metrics.rate_limited.total()} rate limited (429), {metrics.http_errors.total()} failed\n"
+                f"Gateway latency: {self.bot.latency * 1000:.0f} ms\n"
+                f"on_message: {metrics.messages.total(result='acted')} acted on, "
+                f"{metrics.messages.total(result='filtered')} filtered\n"
+                f"Scrape: `http://127.0.0.1:{metrics_port(self.bot.shard_config)}/metrics`"
+            )[:1024],
+            inline=False
+        )
+
+        reminder_stats = self.bot.reminders.stats
+        embed.add_field(
+            name="Reminders",
+            value=(
+                f"Pending: {self.bot.reminders.pending}, sent: {reminder_stats['sent']}, "
+                f"failed: {reminder_stats['failed']}, stale entries dropped: {reminder_stats['dropped']}"
+            ),
+            inline=False
+        )
+
+        job_lines = []
+        for job in self.bot.scheduler.jobs.values():
+            line = f"`{job.name}`: {job.runs} runs, last {job.last_duration * 1000:.0f} ms"
+            if job.failures:
+                line += f", {job.failures} failed"
+            if job.skipped:
+                line += f", {job.skipped} ticks skipped"
+            if job.running:
+                line += ", running"
+            elif job.next_run:
+                line += f", next in {format_timedelta(timedelta(seconds=max(0, int(job.next_run - time.time()))))}"
+            job_lines.append(line)
+        embed.add_field(name="Scheduled Jobs", value="\n".join(job_lines)[:1024] or "None", inline=False)
+
+        if self.bot.control:
+            reload_stats = self.bot.control.stats
+            last_reload = reload_stats['last']
+            value = f"Reloads: {reload_stats['reloads']} ({reload_stats['failures']} failed, fell back to restart)"
+            if last_reload:
+                ago = format_timedelta(timedelta(seconds=int(time.time() - last_reload['at'])))
+                modules = ", ".join(f"{name.split('.')[-1]} {ms:.0f} ms" for name, ms in last_reload['modules'].items())
+                value += f"\nLast: {ago} ago, {last_reload['total_ms']:.0f} ms total ({modules})"
+                if last_reload['synced']:
+                    value += ", commands re-synced"
+            embed.add_field(name="Hot Reload", value=value[:1024], inline=False)
 
         # Read last GitHub update info from file
         update_file = os.path.join(os.path.dirname(__file__), "..", "last_github_update.json")
@@ -242,11 +715,19 @@ class ReviewCommands(commands.Cog):
             commit_msg = update_info.get("commit_message", "Unknown")
             commit_hash = update_info.get("commit_hash", "Unknown")
             commit_author = update_info.get("commit_author", "Unknown")
+            stages = update_info.get("stages", {})
+            coalesced = update_info.get("coalesced_pushes", 0)
         except Exception:
             last_pull = "Unknown"
             commit_msg = "Unknown"
             commit_hash = "Unknown"
             commit_author = "Unknown"
+            stages = {}
+            coalesced = 0
+        if stages:
+            last_pull += "\n" + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stages.items())
+        if coalesced:
+            last_pull += f" ({coalesced} pushes coalesced)"
 
         embed.add_field(
             name="Last Git Pull",
@@ -261,10 +742,24 @@ class ReviewCommands(commands.Cog):
         embed.set_footer(text="Only visible to the bot owner.")
         await ctx.send(embed=embed)
 
+def review_embed(user, title, roles, link):
+    embed = discord.Embed(
+        title=f"📝 **{title}**",
+        color=discord.Color.orange(),
+        timestamp=datetime.now(UTC)
+    )
+    embed.set_author(name=user.display_name, icon_url=user.avatar.url)
+    if roles and len(roles) > 0:
+        embed.add_field(name="**Roles**", value=" ".join(role.mention for role in roles if role), inline=False)
+    if link:
+        embed.add_field(name="**Link**", value=f"[Click here]({link})", inline=False)
+    return embed
+
 async def create_review_from_modal(interaction, title, roles, link):
+    """Post and store a review from the picker; the interaction must already be acknowledged."""
     guild_id = str(interaction.guild_id)
-    data = load_data()
-    guild_data = data.get(guild_id, {})
+    store = interaction.client.store
+    guild_data = store.get_guild(guild_id) or {}
     active_channel_id = guild_data.get('active_channel_id')
     if not active_channel_id:
         await interaction.followup.send(
@@ -285,27 +780,20 @@ async def create_review_from_modal(interaction, title, roles, link):
             ephemeral=True
         )
         return
-    embed = discord.Embed(
-        title=f"📝 **{title}**",
-        color=discord.Color.orange(),
-        timestamp=datetime.now(UTC)
-    )
-    embed.set_author(name=interaction.user.display_name, icon_url=interaction.user.avatar.url)
-    if roles and len(roles) > 0:
-        embed.add_field(name="**Roles**", value=" ".join(role.mention for role in roles if role), inline=False)
-    if link:
-        embed.add_field(name="**Link**", value=f"[Click here]({link})", inline=False)
-    review_msg = await active_channel.send(embed=embed, view=ActiveReviewView())
-    guild_data.setdefault('reviews', {})[str(review_msg.id)] = {
-        'title': title,
-        'role_ids': [role.id for role in roles] if roles else [],
-        'link': link,
-        'author_id': interaction.user.id,
-        'timestamp': review_msg.created_at.isoformat(),
-        'status': 'active'
-    }
-    data[guild_id] = guild_data
-    save_data(data)
+    embed = review_embed(interaction.user, title, roles, link)
+    async with store.review(guild_id) as tx:
+        review_msg = await interaction.client.rest_scheduler.run(
+            ROUTE_SEND_MESSAGE, active_channel.id,
+            lambda: active_channel.send(embed=embed, view=ActiveReviewView())
+        )
+        tx.put(review_msg.id, {
+            'title': title,
+            'role_ids': [role.id for role in roles if role] if roles else [],
+            'link': link,
+            'author_id': interaction.user.id,
+            'timestamp': review_msg.created_at.isoformat(),
+            'status': 'active'
+        })
 
 async def setup(bot):
     await bot.add_cog(ReviewCommands(bot))
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+# Discord REST routes the review handlers call, with the bucket each one is
+# limited by. The major parameter (channel or user ID) is part of the bucket
+# key, matching how Discord scopes these limits.
+ROUTE_SEND_MESSAGE = 'POST /channels/{channel_id}/messages'
+ROUTE_DELETE_MESSAGE = 'DELETE /channels/{channel_id}/messages/{message_id}'
+ROUTE_EDIT_MESSAGE = 'PATCH /channels/{channel_id}/messages/{message_id}'
+ROUTE_BULK_DELETE = 'POST /channels/{channel_id}/messages/bulk-delete'
+ROUTE_SEND_DM = 'POST /channels/{dm_channel_id}/messages'
+ROUTE_CREATE_DM = 'POST /users/@me/channels'
+ROUTE_FETCH_MESSAGE = 'GET /channels/{channel_id}/messages/{message_id}'
+
+# (requests, per seconds), taken from the limits Discord reports for these
+# routes. Calls beyond this are queued and spread out instead of sent into a 429.
+ROUTE_LIMITS = {
+    ROUTE_SEND_MESSAGE: (5, 5.0),
+    ROUTE_DELETE_MESSAGE: (5, 1.0),
+    ROUTE_EDIT_MESSAGE: (5, 5.0),
+    ROUTE_BULK_DELETE: (1, 1.0),
+    ROUTE_SEND_DM: (5, 5.0),
+    ROUTE_CREATE_DM: (5, 5.0),
+    ROUTE_FETCH_MESSAGE: (5, 1.0),
+}
+# Discord's global limit across all routes.
+GLOBAL_LIMIT = (50, 1.0)
+# How many users' DM channel IDs DMChannelCache remembers.
+DM_CACHE_SIZE = 4096
+
+
+class TokenBucket:
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Take one token, waiting in FIFO order if the bucket is empty. Returns seconds waited."""
+        waited = 0.0
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= 1
+        return waited
+
+    def idle(self):
+        self._refill()
+        return self.tokens >= self.capacity and not self.lock.locked()
+
+
+class RateLimitScheduler:
+    """Paces Discord REST calls per route bucket and runs independent calls concurrently.
+
+    `run()` waits for a token in the route's bucket (and the global bucket)
+    before starting the call, so a burst of clicks in one channel is spread
+    over the bucket's window rather than tripping 429s. `spawn()` runs
+    follow-up work such as DMs in the background, off the interaction's
+    critical path.
+    """
+
+    def __init__(self, limits=None, global_limit=GLOBAL_LIMIT):
+        self.limits = dict(ROUTE_LIMITS, **(limits or {}))
+        self._global = TokenBucket(*global_limit)
+        self._buckets = {}
+        self._tasks = set()
+        self.stats = {'calls': 0, 'delayed': 0, 'wait_seconds': 0.0}
+
+    def _bucket(self, route, major_id):
+        key = (route, major_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) > 1024:
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.idle()}
+            bucket = self._buckets[key] = TokenBucket(*self.limits[route])
+        return bucket
+
+    async def run(self, route, major_id, call):
+        """Await `call()` once the (route, major_id) bucket allows it."""
+        waited = await self._global.acquire()
+        if route in self.limits:
+            waited += await self._bucket(route, major_id).acquire()
+        self.stats['calls'] += 1
+        if waited:
+            self.stats['delayed'] += 1
+            self.stats['wait_seconds'] += waited
+        return await call()
+
+    def spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Background Discord call failed: {task.exception()!r}")
+
+    @property
+    def pending(self):
+        return len(self._tasks)
+
+
+class DMChannelCache:
+    """LRU map of user ID to DM channel ID.
+
+    A DM channel's ID never changes, so once known, sending or deleting a
+    DM needs no `create_dm` round trip. discord.py's own private channel
+    cache only holds the 128 most recent channels.
+    """
+
+    def __init__(self, size=DM_CACHE_SIZE):
+        self.size = size
+        self._channels = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, user_id):
+        channel_id = self._channels.get(user_id)
+        if channel_id is None:
+            self.stats['misses'] += 1
+            return None
+        self._channels.move_to_end(user_id)
+        self.stats['hits'] += 1
+        return channel_id
+
+    def put(self, user_id, channel_id):
+        self._channels[user_id] = channel_id
+        self._channels.move_to_end(user_id)
+        if len(self._channels) > self.size:
+            self._channels.popitem(last=False)
+
+
+async def setup(bot):
+    pass
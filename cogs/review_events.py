@@ -1,30 +1,105 @@
 from discord.ext import commands
-from .review_utils import load_data
+from .review_dispatch import ROUTE_BULK_DELETE, ROUTE_DELETE_MESSAGE, ROUTE_SEND_MESSAGE
+import asyncio
 import discord
 
+# Messages posted in a review channel are collected for this many seconds and
+# then removed together, with at most one warning per channel per window.
+SPAM_WINDOW = 2.0
+# Discord's bulk delete endpoint accepts at most this many messages per call.
+BULK_DELETE_LIMIT = 100
+
 class ReviewEvents(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._spam_buffers = {}
+        self.stats = {
+            'dropped': 0,
+            'bulk_deletes': 0,
+            'single_deletes': 0,
+            'warnings': 0,
+        }
 
     @commands.Cog.listener()
     async def on_message(self, message):
+        # Only the two review channels of each guild are moderated; everything
+        # else, DMs included, is dropped here without touching storage.
+        if message.channel.id not in self.bot.store.watched_channel_ids:
+            self.bot.metrics.messages_filtered.inc()
+            return
         if message.author == self.bot.user:
+            self.bot.metrics.messages_filtered.inc()
             return
-        data = load_data()
-        guild_id = str(message.guild.id)
-        guild_data = data.get(guild_id, {})
+        guild_data = self.bot.store.get_guild(message.guild.id) or {}
         active_channel_id = guild_data.get('active_channel_id')
         reviewed_channel_id = guild_data.get('reviewed_channel_id')
         if message.channel.id == active_channel_id:
-            await message.delete()
-            await message.channel.send(embed=discord.Embed(
-                description=":warning: **Please use the `/review` slash command to create a review.**",
-                color=discord.Color.red()), delete_after=10)
+            warning = ":warning: **Please use the `/review` slash command to create a review.**"
         elif message.channel.id == reviewed_channel_id:
-            await message.delete()
-            await message.channel.send(embed=discord.Embed(
-                description=":no_entry: **No messages are allowed in this channel.**",
-                color=discord.Color.red()), delete_after=10)
+            warning = ":no_entry: **No messages are allowed in this channel.**"
+        else:
+            self.bot.metrics.messages_filtered.inc()
+            return
+        self.bot.metrics.messages_acted.inc()
+        buffer = self._spam_buffers.get(message.channel.id)
+        if buffer is None:
+            buffer = self._spam_buffers[message.channel.id] = []
+            self.bot.rest_scheduler.spawn(self._purge_after_window(message.channel, warning))
+        buffer.append(message)
+
+    async def _purge_after_window(self, channel, warning):
+        await asyncio.sleep(SPAM_WINDOW)
+        messages = self._spam_buffers.pop(channel.id, [])
+        rest = self.bot.rest_scheduler
+        for start in range(0, len(messages), BULK_DELETE_LIMIT):
+            chunk = messages[start:start + BULK_DELETE_LIMIT]
+            try:
+                if len(chunk) == 1:
+                    await rest.run(ROUTE_DELETE_MESSAGE, channel.id, chunk[0].delete)
+                    self.stats['single_deletes'] += 1
+                else:
+                    await rest.run(ROUTE_BULK_DELETE, channel.id, lambda chunk=chunk: channel.delete_messages(chunk))
+                    self.stats['bulk_deletes'] += 1
+                self.stats['dropped'] += len(chunk)
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                print(f"Failed to remove {len(chunk)} messages in channel {channel.id}: {e}")
+        description = warning
+        if len(messages) > 1:
+            description += f"\n*Removed {len(messages)} messages.*"
+        await rest.run(ROUTE_SEND_MESSAGE, channel.id, lambda: channel.send(embed=discord.Embed(
+            description=description,
+            color=discord.Color.red()), delete_after=10))
+        self.stats['warnings'] += 1
+
+    # Review messages deleted by hand are pruned as it happens; deletions
+    # while the bot was down are left to the Reconciler.
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        if payload.guild_id is None or payload.channel_id not in self.bot.store.watched_channel_ids:
+            return
+        await self.bot.reconciler.prune(payload.guild_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload):
+        if payload.guild_id is None or payload.channel_id not in self.bot.store.watched_channel_ids:
+            return
+        for message_id in payload.message_ids:
+            await self.bot.reconciler.prune(payload.guild_id, message_id)
+
+    # The role picker's per-guild index is only rebuilt after one of these.
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        self.bot.role_index.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        self.bot.role_index.invalidate(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.bot.role_index.invalidate(role.guild.id)
 
 async def setup(bot):
     await bot.add_cog(ReviewEvents(bot))
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+
+def review_epoch(review):
+    """Creation time of a review as a POSIX timestamp, from its ISO `timestamp` field."""
+    try:
+        return datetime.fromisoformat(review['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+class GuildReviewIndex:
+    """Secondary indexes over one guild's reviews: status, author and role to message IDs.
+
+    Kept in step with the store by `put()` and `remove()`, which the store
+    calls for every review it writes, so a query intersects a few sets
+    instead of scanning the guild's reviews.
+    """
+
+    def __init__(self):
+        self.by_status = {}
+        self.by_author = {}
+        self.by_role = {}
+        # message_id -> (status, author_id, role_ids, created epoch)
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, message_id, review):
+        """Index or re-index a review, given as a review_record.Review."""
+        self.remove(message_id)
+        self.add(message_id, review.status, review.author_id, review.role_ids, review.epoch)
+
+    def add(self, message_id, status, author_id, role_ids, created):
+        """Index a review not already in the index."""
+        self.entries[message_id] = (status, author_id, role_ids, created)
+        self.by_status.setdefault(status, set()).add(message_id)
+        self.by_author.setdefault(author_id, set()).add(message_id)
+        for role_id in role_ids:
+            self.by_role.setdefault(role_id, set()).add(message_id)
+
+    def remove(self, message_id):
+        entry = self.entries.pop(message_id, None)
+        if entry is None:
+            return
+        _discard(self.by_status, entry[0], message_id)
+        _discard(self.by_author, entry[1], message_id)
+        for role_id in entry[2]:
+            _discard(self.by_role, role_id, message_id)
+
+    def query(self, status=None, author_id=None, role_id=None, before=None, after=None):
+        """Message IDs matching every given filter, oldest review first.
+
+        `before` and `after` bound the review's creation time (POSIX seconds).
+        """
+        candidates = []
+        if status is not None:
+            candidates.append(self.by_status.get(status, ()))
+        if author_id is not None:
+            candidates.append(self.by_author.get(author_id, ()))
+        if role_id is not None:
+            candidates.append(self.by_role.get(role_id, ()))
+        if candidates:
+            candidates.sort(key=len)
+            matches = set(candidates[0])
+            for other in candidates[1:]:
+                matches.intersection_update(other)
+        else:
+            matches = self.entries.keys()
+        entries = self.entries
+        if before is not None or after is not None:
+            low = after if after is not None else float('-inf')
+            high = before if before is not None else float('inf')
+            matches = [mid for mid in matches if low <= entries[mid][3] < high]
+        return sorted(matches, key=lambda mid: (entries[mid][3], mid))
+
+
+def _discard(index, key, message_id):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(message_id)
+        if not ids:
+            del index[key]
+
+
+async def setup(bot):
+    pass
@@ -0,0 +1,163 @@
+import asyncio
+import importlib
+import json
+import os
+import re
+import sys
+import time
+
+# Local control socket the webhook listener uses to ask for a hot reload.
+IPC_SOCKET = 'reviewer.sock'
+COGS_PACKAGE = 'cogs'
+COGS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Modules whose objects live on the bot for its whole lifetime (the store,
+# the REST scheduler, caches, the control server itself). Reloading them
+# would leave the bot holding instances of the old classes, so a change to
+# any of them needs a restart.
+STATEFUL_MODULES = frozenset({
+    'cogs.review_store', 'cogs.review_index', 'cogs.review_dispatch', 'cogs.review_roles',
+    'cogs.review_reconcile', 'cogs.review_shards', 'cogs.review_ipc', 'cogs.review_metrics',
+    'cogs.review_profiler', 'cogs.review_scheduler', 'cogs.review_reminders',
+})
+
+# Only module-level imports bind names at import time; imports inside
+# functions are looked up in sys.modules when they run, so they pick up the
+# reloaded module by themselves.
+_RELATIVE_IMPORT = re.compile(r'^from \.(\w+) import', re.MULTILINE)
+
+
+def socket_path(shard_config=None):
+    if shard_config:
+        return f"reviewer.g{shard_config.group}.sock"
+    return IPC_SOCKET
+
+
+def module_dependencies(cogs_dir=COGS_DIR):
+    """module -> set of cog modules it imports, read from the source on disk (so it reflects the new code)."""
+    graph = {}
+    for name in os.listdir(cogs_dir):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(cogs_dir, name), 'r') as f:
+            source = f.read()
+        module = f"{COGS_PACKAGE}.{name[:-3]}"
+        graph[module] = {f"{COGS_PACKAGE}.{dep}" for dep in _RELATIVE_IMPORT.findall(source)} - {module}
+    return graph
+
+
+def reload_order(changed, graph):
+    """The changed modules plus everything that imports them, dependencies before dependents."""
+    dependents = {}
+    for module, deps in graph.items():
+        for dep in deps:
+            dependents.setdefault(dep, set()).add(module)
+    affected, stack = set(), list(changed)
+    while stack:
+        module = stack.pop()
+        if module not in affected:
+            affected.add(module)
+            stack.extend(dependents.get(module, ()))
+    order, visiting = [], set()
+
+    def visit(module):
+        if module in visiting or module in order:
+            return
+        visiting.add(module)
+        for dep in sorted(graph.get(module, ())):
+            if dep in affected:
+                visit(dep)
+        visiting.discard(module)
+        order.append(module)
+
+    for module in sorted(affected):
+        visit(module)
+    return order
+
+
+class ControlServer:
+    """Line-delimited JSON requests over a Unix socket, answered by the running bot.
+
+    `{"op": "reload", "modules": ["cogs.review_views"]}` reloads the given
+    cog modules and everything importing them, re-registers the persistent
+    views and re-syncs slash commands if their hash changed. The reply says
+    `"restart": true` when a module can't be reloaded in place.
+    """
+
+    def __init__(self, bot, path=IPC_SOCKET):
+        self.bot = bot
+        self.path = path
+        self._server = None
+        self._lock = asyncio.Lock()
+        self.stats = {'reloads': 0, 'failures': 0, 'last': None}
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o600)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline())
+            if request.get('op') == 'reload':
+                reply = await self.reload(request.get('modules', []))
+            elif request.get('op') == 'ping':
+                reply = {'ok': True}
+            else:
+                reply = {'ok': False, 'error': f"unknown op {request.get('op')!r}"}
+        except ValueError as e:
+            reply = {'ok': False, 'error': f"bad request: {e}"}
+        writer.write(json.dumps(reply).encode() + b'\n')
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def reload(self, modules):
+        async with self._lock:
+            changed = [m for m in modules if m.startswith(f"{COGS_PACKAGE}.")]
+            stateful = sorted(set(changed) & STATEFUL_MODULES)
+            if stateful:
+                return {'ok': False, 'restart': True, 'error': f"cannot hot reload {', '.join(stateful)}"}
+            order = reload_order(changed, module_dependencies())
+            stateful = sorted(set(order) & STATEFUL_MODULES)
+            if stateful:
+                return {'ok': False, 'restart': True, 'error': f"cannot hot reload {', '.join(stateful)}"}
+            start = time.perf_counter()
+            timings = {}
+            try:
+                for module in order:
+                    module_start = time.perf_counter()
+                    if module in self.bot.extensions:
+                        await self.bot.reload_extension(module)
+                    elif module in sys.modules:
+                        importlib.reload(sys.modules[module])
+                    else:
+                        continue
+                    timings[module] = round((time.perf_counter() - module_start) * 1000, 1)
+                sys.modules[f"{COGS_PACKAGE}.review_views"].register_persistent_views(self.bot)
+                synced = False
+                shard_config = getattr(self.bot, 'shard_config', None)
+                if not shard_config or shard_config.group == 0:
+                    from .review_sync import sync_commands
+                    synced, _ = await sync_commands(self.bot)
+            except Exception as e:
+                self.stats['failures'] += 1
+                print(f"Hot reload of {', '.join(order)} failed: {e!r}")
+                return {'ok': False, 'restart': True, 'error': repr(e)}
+            total_ms = round((time.perf_counter() - start) * 1000, 1)
+            self.stats['reloads'] += 1
+            self.stats['last'] = {'at': time.time(), 'modules': timings, 'total_ms': total_ms, 'synced': synced}
+            return {'ok': True, 'modules': timings, 'total_ms': total_ms, 'synced': synced}
+
+
+async def setup(bot):
+    pass
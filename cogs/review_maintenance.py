@@ -0,0 +1,113 @@
+import time
+from datetime import timedelta
+import discord
+from .review_dispatch import ROUTE_BULK_DELETE, ROUTE_DELETE_MESSAGE
+from .review_events import BULK_DELETE_LIMIT
+from .review_record import ACTIVE, ARCHIVED, REVIEWED
+
+# Discord only bulk-deletes messages younger than 14 days; the hour of margin
+# keeps a chunk from being rejected while it is being sent.
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(hours=1)
+# Progress callbacks are made at most this often (plus once at the end).
+PROGRESS_INTERVAL = 3.0
+
+
+def select_reviews(store, guild_id, statuses, older_than_days, author_id=None, role_id=None):
+    """Message IDs of a guild's reviews in `statuses` created more than `older_than_days` ago, oldest first."""
+    before = time.time() - older_than_days * 86400
+    message_ids = []
+    for status in statuses:
+        message_ids += store.query_reviews(guild_id, status=status, author_id=author_id, role_id=role_id, before=before)
+    return message_ids
+
+
+class BulkRemoval:
+    """Archives or purges many reviews of one guild at once.
+
+    `commit()` applies every storage change as one store transaction,
+    holding the lock of each selected review. Reviews a handler is working
+    on at that moment (being marked reviewed, moved back, ...) are skipped
+    and counted as busy rather than waited on. Archived reviews keep their
+    record under the `archived` status; purged ones are deleted. Only then
+    are the review messages removed: messages younger than
+    BULK_DELETE_MAX_AGE through the bulk delete endpoint, up to
+    BULK_DELETE_LIMIT per call, and older ones one by one through the REST
+    scheduler, which paces them to the route's limit. The delete events that follow find nothing left to prune.
+    """
+
+    def __init__(self, bot, guild_id, archive):
+        self.bot = bot
+        self.guild_id = int(guild_id)
+        self.archive = archive
+        self.total = 0
+        self._last_progress = 0.0
+        self.stats = {'reviews': 0, 'busy': 0, 'bulk_deleted': 0, 'single_deleted': 0, 'missing': 0, 'failed': 0}
+
+    @property
+    def done(self):
+        return sum(self.stats[key] for key in ('bulk_deleted', 'single_deleted', 'missing', 'failed'))
+
+    async def commit(self, message_ids):
+        """Archive or delete the reviews; returns {channel_id: [message_id, ...]} of their messages."""
+        store = self.bot.store
+        channels = {}
+        async with store.reviews(self.guild_id, message_ids) as tx:
+            guild_data = tx.guild or {}
+            self.stats['busy'] = len(tx.busy)
+            for message_id in tx.message_ids:
+                review = store.get_review(self.guild_id, message_id)
+                if review is None or review['status'] not in (ACTIVE, REVIEWED):
+                    continue
+                channel_id = guild_data.get('active_channel_id' if review['status'] == ACTIVE else 'reviewed_channel_id')
+                channels.setdefault(channel_id, []).append(message_id)
+                if self.archive:
+                    tx.put(message_id, dict(review, status=ARCHIVED))
+                else:
+                    tx.delete(message_id)
+        self.stats['reviews'] = self.total = sum(len(ids) for ids in channels.values())
+        return channels
+
+    async def delete_messages(self, channels, progress=None):
+        """Remove the messages returned by `commit()`, awaiting `progress(done, total)` along the way."""
+        rest = self.bot.rest_scheduler
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        for channel_id, message_ids in channels.items():
+            channel = self.bot.get_channel(channel_id) if channel_id else None
+            if channel is None:
+                self.stats['missing'] += len(message_ids)
+                continue
+            young = [message_id for message_id in message_ids if discord.utils.snowflake_time(message_id) > cutoff]
+            old = [message_id for message_id in message_ids if discord.utils.snowflake_time(message_id) <= cutoff]
+            for start in range(0, len(young), BULK_DELETE_LIMIT):
+                chunk = young[start:start + BULK_DELETE_LIMIT]
+                try:
+                    await rest.run(ROUTE_BULK_DELETE, channel.id, lambda chunk=chunk: channel.delete_messages(
+                        [discord.Object(id=message_id) for message_id in chunk]))
+                    self.stats['bulk_deleted'] += len(chunk)
+                except discord.HTTPException as e:
+                    # E.g. a message deleted meanwhile; retry the chunk one by one.
+                    print(f"Bulk delete of {len(chunk)} messages in channel {channel.id} failed, deleting singly: {e}")
+                    old.extend(chunk)
+                await self._progress(progress)
+            for message_id in old:
+                try:
+                    await rest.run(ROUTE_DELETE_MESSAGE, channel.id, channel.get_partial_message(message_id).delete)
+                    self.stats['single_deleted'] += 1
+                except discord.NotFound:
+                    self.stats['missing'] += 1
+                except discord.HTTPException as e:
+                    self.stats['failed'] += 1
+                    print(f"Failed to delete review message {message_id} in channel {channel.id}: {e}")
+                await self._progress(progress)
+        if progress is not None:
+            await progress(self.done, self.total)
+
+    async def _progress(self, progress):
+        now = time.monotonic()
+        if progress is not None and now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            await progress(self.done, self.total)
+
+
+async def setup(bot):
+    pass
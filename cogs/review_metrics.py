@@ -0,0 +1,318 @@
+import asyncio
+import functools
+import logging
+import math
+import os
+import threading
+import time
+
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9108
+
+# Seconds; spans a fast in-memory handler up to a rate-limited REST call.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def metrics_port(shard_config=None):
+    """Each shard-group process serves its own metrics, on consecutive ports."""
+    return METRICS_PORT + (shard_config.group if shard_config else 0)
+
+
+class _Child:
+    """One label combination of a metric, so hot paths skip the label lookup."""
+    __slots__ = ('metric', 'key')
+
+    def __init__(self, metric, key):
+        self.metric = metric
+        self.key = key
+
+    def inc(self, amount=1):
+        self.metric._inc(self.key, amount)
+
+    def observe(self, value):
+        self.metric._observe(self.key, value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        return _Child(self, tuple(str(labels[name]) for name in self.labelnames))
+
+    def inc(self, amount=1, **labels):
+        self._inc(tuple(str(labels[name]) for name in self.labelnames), amount)
+
+    def _inc(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def total(self, **labels):
+        return sum(value for key, value in self._values.items() if _matches(self.labelnames, key, labels))
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        return _Child(self, tuple(str(labels[name]) for name in self.labelnames))
+
+    def observe(self, value, **labels):
+        self._observe(tuple(str(labels[name]) for name in self.labelnames), value)
+
+    def _observe(self, key, value):
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def label_values(self, labelname):
+        index = self.labelnames.index(labelname)
+        return sorted({key[index] for key in self._values})
+
+    def count(self, **labels):
+        return sum(sum(series[:-1]) for key, series in self._values.items()
+                   if _matches(self.labelnames, key, labels))
+
+    def quantile(self, q, **labels):
+        """Estimate a quantile from the buckets, interpolating linearly inside the bucket it falls in."""
+        counts = [0] * (len(self.buckets) + 1)
+        for key, series in self._values.items():
+            if _matches(self.labelnames, key, labels):
+                for i in range(len(counts)):
+                    counts[i] += series[i]
+        total = sum(counts)
+        if not total:
+            return None
+        rank, seen, lower = q * total, 0, 0.0
+        for i, bound in enumerate(self.buckets):
+            if seen + counts[i] >= rank:
+                return lower + (bound - lower) * ((rank - seen) / counts[i] if counts[i] else 0)
+            seen += counts[i]
+            lower = bound
+        return self.buckets[-1]
+
+    def samples(self):
+        for key, series in sorted(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative
+            cumulative += series[len(self.buckets)]
+            yield f"{self.name}_bucket", dict(labels, le='+Inf'), cumulative
+            yield f"{self.name}_sum", labels, series[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Gauge:
+    """A value read when scraped: `fn()` returns a number, or a list of (labels, value) pairs."""
+    kind = 'gauge'
+
+    def __init__(self, name, help, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+    def samples(self):
+        value = self.fn()
+        if isinstance(value, list):
+            for labels, v in value:
+                yield self.name, labels, v
+        elif value is not None:
+            yield self.name, {}, value
+
+
+def _matches(labelnames, key, labels):
+    return all(key[labelnames.index(name)] == str(value) for name, value in labels.items())
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class RateLimitLogHandler(logging.Handler):
+    """Counts the 429 warnings discord.py's HTTP client logs before it retries a request."""
+
+    def __init__(self, counter):
+        super().__init__(logging.WARNING)
+        self.counter = counter
+
+    def emit(self, record):
+        message = record.msg if isinstance(record.msg, str) else ''
+        if 'responded with 429' in message:
+            method = record.args[0] if record.args else 'unknown'
+            self.counter.inc(scope='route', method=method)
+        elif 'Global rate limit' in message:
+            self.counter.inc(scope='global', method='any')
+
+
+class Metrics:
+    """The bot's metrics, rendered in the Prometheus text format by `render()`."""
+
+    def __init__(self):
+        self.handler_seconds = Histogram(
+            'reviewer_interaction_handler_seconds', "Time spent handling an interaction.", ('handler',))
+        self.store_seconds = Histogram(
+            'reviewer_store_write_seconds',
+            "Duration of review store writes (journal flush with fsync, compaction into SQLite).", ('operation',))
+        self.http_seconds = Histogram(
+            'reviewer_discord_http_seconds',
+            "Discord REST request latency, including discord.py's own rate limit waits.", ('route',))
+        self.http_errors = Counter(
+            'reviewer_discord_http_errors_total', "Discord REST requests that raised, by route.", ('route',))
+        self.rate_limited = Counter(
+            'reviewer_discord_ratelimited_total', "429 responses from Discord.", ('scope', 'method'))
+        self.messages = Counter(
+            'reviewer_on_message_total', "Messages seen by on_message, by outcome.", ('result',))
+        self.messages_filtered = self.messages.labels(result='filtered')
+        self.messages_acted = self.messages.labels(result='acted')
+        self.gauges = []
+        self.started = time.time()
+
+    @property
+    def metrics(self):
+        return [self.handler_seconds, self.store_seconds, self.http_seconds, self.http_errors,
+                self.rate_limited, self.messages, *self.gauges]
+
+    # --- Wiring ---
+
+    def instrument(self, bot):
+        """Hook the metrics into a bot's store, HTTP client, gateway and loggers."""
+        self.instrument_store(bot.store)
+        self.instrument_http(bot.http)
+        logging.getLogger('discord.http').addHandler(RateLimitLogHandler(self.rate_limited))
+
+        def gateway_latency():
+            latencies = getattr(bot, 'latencies', None) or [(0, bot.latency)]
+            return [({'shard': str(shard_id)}, latency) for shard_id, latency in latencies]
+
+        self.gauges.append(Gauge('reviewer_gateway_latency_seconds', "Gateway heartbeat latency per shard.",
+                                 gateway_latency))
+
+    def instrument_store(self, store):
+        store.on_timing = lambda operation, seconds: self.store_seconds.observe(seconds, operation=operation)
+
+        def file_sizes():
+            sizes = []
+            for kind, path in (('database', store.path), ('wal', f"{store.path}-wal"), ('journal', store.journal_path)):
+                try:
+                    sizes.append(({'file': kind}, os.path.getsize(path)))
+                except OSError:
+                    pass
+            return sizes
+
+        self.gauges.append(Gauge('reviewer_store_file_bytes', "Size of the review store files.", file_sizes))
+        self.gauges.append(Gauge('reviewer_store_queue_depth', "Journal entries waiting to be flushed.",
+                                 lambda: store.queue_depth))
+
+    def instrument_http(self, http):
+        request = http.request
+
+        @functools.wraps(request)
+        async def timed_request(route, **kwargs):
+            name = f"{route.method} {route.path}"
+            start = time.perf_counter()
+            try:
+                return await request(route, **kwargs)
+            except Exception:
+                self.http_errors.inc(route=name)
+                raise
+            finally:
+                self.http_seconds.observe(time.perf_counter() - start, route=name)
+
+        http.request = timed_request
+
+    # --- Exposition ---
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_text = ",".join(f'{key}="{_escape(v)}"' for key, v in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host=METRICS_HOST, port=METRICS_PORT):
+        """Serve GET /metrics on a local port; returns the asyncio server."""
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', self.render().encode()
+            else:
+                status, body = '404 Not Found', b'Not found\n'
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def timed(handler):
+    """Record an interaction handler's duration under `handler`. Use as the innermost decorator."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(self, interaction, *args, **kwargs)
+            finally:
+                metrics = getattr(interaction.client, 'metrics', None)
+                if metrics is not None:
+                    metrics.handler_seconds.observe(time.perf_counter() - start, handler=handler)
+        return wrapper
+    return decorator
+
+
+async def setup(bot):
+    pass
@@ -0,0 +1,231 @@
+"""Streaming migration of reviews.json to the current schema.
+
+Version 1 (unversioned) files are a bare `{guild_id: guild}` mapping whose
+reviews mix `role_id` and `role_ids` and omit optional keys. Version 2 wraps
+the mapping as `{"schema_version": 2, "guilds": {...}}` and every review has
+exactly the keys of `review_record.Review.to_dict()`.
+
+The file is read and written one guild at a time, so memory stays bounded
+by the largest guild rather than the whole file.
+
+Usage:
+    python -m cogs.review_migrate reviews.json [--output migrated.json] [--check]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+from .review_record import ACTIVE, ARCHIVED, REVIEWED, Review
+
+JSON_SCHEMA_VERSION = 2
+CHUNK_SIZE = 1024 * 1024
+
+
+class MigrationError(Exception):
+    """Raised when the input is malformed or the migrated output doesn't match it."""
+
+
+class JSONObjectStream:
+    """Reads the members of a JSON object from a file one at a time.
+
+    Each value is decoded with `JSONDecoder.raw_decode` once the buffer holds
+    all of it; the buffer only grows to the size of the largest value.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        # Read at least as much as is buffered, so a value spanning many
+        # chunks is retried O(log n) times rather than once per chunk.
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """The next non-whitespace character, or '' at the end of the input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise MigrationError(f"Expected {char!r} but found {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise MigrationError(f"Malformed JSON: {e}") from None
+            # A number could continue in the next chunk.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """Yield (key, value) for each member of the object starting at the current position."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+
+def iter_guilds(f):
+    """Yield (schema_version, guild_id, guild_data) for each guild in a reviews.json file object."""
+    stream = JSONObjectStream(f)
+    if stream.peek() != '{':
+        raise MigrationError("reviews.json must contain a JSON object")
+    first = True
+    version = 1
+    for key in stream.members():
+        if first and key == 'schema_version':
+            version = stream.value()
+            if version > JSON_SCHEMA_VERSION:
+                raise MigrationError(f"Schema version {version} is newer than this tool ({JSON_SCHEMA_VERSION})")
+            continue
+        first = False
+        if version > 1 and key == 'guilds':
+            for guild_id in stream.members():
+                yield version, guild_id, stream.value()
+        elif version > 1:
+            stream.value()
+        else:
+            yield version, key, stream.value()
+
+
+def normalize_guild(guild_data):
+    """A guild in the current schema, plus the message IDs of reviews that could not be read."""
+    reviews, invalid = {}, []
+    for message_id, review in (guild_data.get('reviews') or {}).items():
+        try:
+            record = Review.from_dict(review)
+            if record.status not in (ACTIVE, REVIEWED, ARCHIVED):
+                raise ValueError(f"unknown status {record.status!r}")
+            reviews[str(int(message_id))] = record.to_dict()
+        except (KeyError, TypeError, ValueError):
+            invalid.append(message_id)
+    return {
+        'active_channel_id': _optional_int(guild_data.get('active_channel_id')),
+        'reviewed_channel_id': _optional_int(guild_data.get('reviewed_channel_id')),
+        'reviews': reviews,
+    }, invalid
+
+
+def _optional_int(value):
+    return int(value) if value is not None else None
+
+
+def iter_normalized(path):
+    """Yield (guild_id, guild_data, invalid_message_ids) for each guild of a file, normalized."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for _, guild_id, guild_data in iter_guilds(f):
+            guild, invalid = normalize_guild(guild_data)
+            yield str(int(guild_id)), guild, invalid
+
+
+def count_file(path):
+    """(schema_version, guilds, reviews) of a file, streamed."""
+    version, guilds, reviews = 1, 0, 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for version, _, guild_data in iter_guilds(f):
+            guilds += 1
+            reviews += len(guild_data.get('reviews') or {})
+    return version, guilds, reviews
+
+
+def migrate_file(path, output=None, backup=True):
+    """Rewrite `path` (or write `output`) in the current schema. Returns a stats dict.
+
+    The result is written to a temporary file, re-read to verify its guild
+    and review counts, and only then moved into place with os.replace.
+    """
+    output = output or path
+    tmp_path = f"{output}.tmp"
+    stats = {'guilds': 0, 'reviews': 0, 'invalid': []}
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write(f'{{"schema_version": {JSON_SCHEMA_VERSION}, "guilds": {{')
+            for guild_id, guild, invalid in iter_normalized(path):
+                if stats['guilds']:
+                    out.write(',')
+                out.write(f"\n{json.dumps(guild_id)}: {json.dumps(guild, separators=(',', ':'))}")
+                stats['guilds'] += 1
+                stats['reviews'] += len(guild['reviews'])
+                stats['invalid'].extend((guild_id, message_id) for message_id in invalid)
+            out.write('\n}}\n')
+            out.flush()
+            os.fsync(out.fileno())
+        version, guilds, reviews = count_file(tmp_path)
+        _, source_guilds, source_reviews = count_file(path)
+        if (version, guilds, reviews) != (JSON_SCHEMA_VERSION, stats['guilds'], stats['reviews']) \
+                or guilds != source_guilds or reviews + len(stats['invalid']) != source_reviews:
+            raise MigrationError(
+                f"Verification failed: read {source_guilds} guilds / {source_reviews} reviews, "
+                f"wrote {guilds} / {reviews} (+{len(stats['invalid'])} invalid)"
+            )
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    if backup and output == path:
+        shutil.copy2(path, f"{path}.bak")
+    os.replace(tmp_path, output)
+    return stats
+
+
+async def setup(bot):
+    pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate reviews.json to the current schema, streaming.")
+    parser.add_argument('path', nargs='?', default='reviews.json')
+    parser.add_argument('--output', help="write here instead of replacing the input")
+    parser.add_argument('--no-backup', action='store_true', help="don't keep <path>.bak when replacing the input")
+    parser.add_argument('--check', action='store_true', help="only report the file's version and counts")
+    args = parser.parse_args(argv)
+    if args.check:
+        version, guilds, reviews = count_file(args.path)
+        print(f"{args.path}: schema version {version}, {guilds} guilds, {reviews} reviews")
+        return
+    stats = migrate_file(args.path, args.output, backup=not args.no_backup)
+    print(f"Migrated {stats['reviews']} reviews across {stats['guilds']} guilds "
+          f"to schema version {JSON_SCHEMA_VERSION} ({args.output or args.path})")
+    for guild_id, message_id in stats['invalid']:
+        print(f"Skipped unreadable review {message_id} in guild {guild_id}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import discord
 from discord.ui import Modal, TextInput
-from .review_utils import is_valid_url, load_data, save_data
+from .review_utils import is_valid_url
+from .review_metrics import timed
 
 class DeleteConfirmationModal(Modal):
     def __init__(self):
@@ -12,32 +13,32 @@ class DeleteConfirmationModal(Modal):
             style=discord.TextStyle.short
         ))
 
+    @timed('delete_confirmation_modal')
     async def on_submit(self, interaction: discord.Interaction):
         user_input = self.children[0].value.strip().lower()
         if user_input == "confirm":
             guild_id = str(interaction.guild_id)
-            data = load_data()
-            guild_data = data.get(guild_id, {})
-            active_channel_id = guild_data.get('active_channel_id')
-            reviewed_channel_id = guild_data.get('reviewed_channel_id')
-            active_channel = interaction.client.get_channel(active_channel_id)
-            reviewed_channel = interaction.client.get_channel(reviewed_channel_id)
-            try:
-                if active_channel:
-                    await active_channel.delete()
-                if reviewed_channel:
-                    await reviewed_channel.delete()
-                if guild_id in data:
-                    del data[guild_id]
-                save_data(data)
-                await interaction.response.defer()
-            except discord.Forbidden:
-                error_embed = discord.Embed(
-                    title="Permission Error",
-                    description="⚠️ I don't have permission to delete channels.",
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(embed=error_embed, ephemeral=True)
+            store = interaction.client.store
+            async with store.guild(guild_id) as g:
+                guild_data = g.config or {}
+                active_channel_id = guild_data.get('active_channel_id')
+                reviewed_channel_id = guild_data.get('reviewed_channel_id')
+                active_channel = interaction.client.get_channel(active_channel_id)
+                reviewed_channel = interaction.client.get_channel(reviewed_channel_id)
+                try:
+                    if active_channel:
+                        await active_channel.delete()
+                    if reviewed_channel:
+                        await reviewed_channel.delete()
+                    g.delete()
+                    await interaction.response.defer()
+                except discord.Forbidden:
+                    error_embed = discord.Embed(
+                        title="Permission Error",
+                        description="⚠️ I don't have permission to delete channels.",
+                        color=discord.Color.red()
+                    )
+                    await interaction.response.send_message(embed=error_embed, ephemeral=True)
         else:
             cancel_embed = discord.Embed(
                 title="Deletion Cancelled",
@@ -66,6 +67,7 @@ class CreateReviewModal(Modal):
         self.add_item(self.title_input)
         self.add_item(self.link_input)
 
+    @timed('create_review_modal')
     async def on_submit(self, interaction: discord.Interaction):
         from .review_views import RoleSelectView
         title = self.title_input.value.strip()
@@ -79,15 +81,30 @@ class CreateReviewModal(Modal):
                 ephemeral=True
             )
             return
-        roles = [
-            role for role in interaction.guild.roles
-            if not role.is_default()
-        ]
         await interaction.response.send_message(
-            "Select roles for this review (optional):",
-            view=RoleSelectView(title, link, roles),
+            "Select roles for this review (optional). Use **Filter** to search by name:",
+            view=RoleSelectView.start(interaction, title, link),
             ephemeral=True
         )
 
+class RoleFilterModal(Modal):
+    def __init__(self, view):
+        super().__init__(title="Filter Roles")
+        self.picker = view
+        self.query_input = TextInput(
+            label="Role name contains",
+            placeholder="Leave blank to show all roles",
+            required=False,
+            style=discord.TextStyle.short,
+            max_length=100,
+            default=view.session.query or None
+        )
+        self.add_item(self.query_input)
+
+    @timed('role_filter_modal')
+    async def on_submit(self, interaction: discord.Interaction):
+        self.picker.session.set_query(self.query_input.value)
+        await self.picker.show(interaction)
+
 async def setup(bot):
     pass
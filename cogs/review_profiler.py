@@ -0,0 +1,223 @@
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Sampling period of the CPU profiler; the sampler thread only runs while a
+# profile is being taken, so nothing is paid for it otherwise.
+SAMPLE_INTERVAL = 0.005
+# How often the event loop is checked for lag while profiling.
+LAG_INTERVAL = 0.1
+# Callbacks holding the event loop longer than this are reported (asyncio debug mode).
+SLOW_CALLBACK_SECONDS = 0.1
+TRACEMALLOC_FRAMES = 25
+MAX_PROFILE_SECONDS = 300
+MAX_STACK_DEPTH = 64
+
+# Frames where a sampled event loop thread is waiting for I/O rather than running code.
+_IDLE_FUNCTIONS = frozenset({('selectors.py', 'select'), ('selectors.py', 'poll')})
+
+
+def _frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval until stopped.
+
+    `own` counts samples by the innermost function, `cumulative` by every
+    function on the stack (once per sample).
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(name='review-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.own = collections.Counter()
+        self.cumulative = collections.Counter()
+        self.samples = 0
+        self.idle = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            code = frame.f_code
+            self.samples += 1
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FUNCTIONS:
+                self.idle += 1
+                continue
+            self.own[f"{_frame_label(code)}:{frame.f_lineno}"] += 1
+            seen = set()
+            depth = 0
+            while frame is not None and depth < MAX_STACK_DEPTH:
+                label = _frame_label(frame.f_code)
+                if label not in seen:
+                    seen.add(label)
+                    self.cumulative[label] += 1
+                frame = frame.f_back
+                depth += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class SlowCallbackHandler(logging.Handler):
+    """Collects the "Executing <Handle> took N seconds" warnings asyncio logs in debug mode."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.callbacks = []
+
+    def emit(self, record):
+        if isinstance(record.msg, str) and record.msg.startswith('Executing') and len(record.args or ()) == 2:
+            self.callbacks.append((record.args[1], str(record.args[0])))
+
+
+class Profiler:
+    """On-demand profiling of the running bot, one profile at a time.
+
+    `profile('cpu', seconds)` samples the event loop thread's stack;
+    `profile('mem', seconds)` diffs tracemalloc snapshots taken at the start
+    and end. Both also measure event loop lag and turn on asyncio debug mode
+    to catch slow callbacks, and restore everything afterwards.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.last = None
+
+    @property
+    def running(self):
+        return self._lock.locked()
+
+    async def profile(self, mode, seconds, top=25):
+        """Profile for `seconds` and return the report as text."""
+        if mode not in ('cpu', 'mem'):
+            raise ValueError(f"unknown profile mode {mode!r}")
+        seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            lags = []
+            slow = SlowCallbackHandler()
+            asyncio_logger = logging.getLogger('asyncio')
+            debug, slow_duration = loop.get_debug(), loop.slow_callback_duration
+            asyncio_logger.addHandler(slow)
+            loop.slow_callback_duration = SLOW_CALLBACK_SECONDS
+            loop.set_debug(True)
+            lag_task = loop.create_task(self._watch_lag(lags))
+            started = time.perf_counter()
+            try:
+                if mode == 'cpu':
+                    body = await self._profile_cpu(seconds, top)
+                else:
+                    body = await self._profile_memory(seconds, top)
+            finally:
+                lag_task.cancel()
+                loop.set_debug(debug)
+                loop.slow_callback_duration = slow_duration
+                asyncio_logger.removeHandler(slow)
+            elapsed = time.perf_counter() - started
+            self.last = {'at': time.time(), 'mode': mode, 'seconds': round(elapsed, 1)}
+            return "\n".join([
+                f"{mode.upper()} profile of pid {os.getpid()}, {elapsed:.1f} s, "
+                f"Python {sys.version.split()[0]}",
+                "",
+                *self._format_lag(lags),
+                "",
+                *self._format_slow_callbacks(slow.callbacks, top),
+                "",
+                *body,
+            ]) + "\n"
+
+    async def _watch_lag(self, lags):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            lags.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+    async def _profile_cpu(self, seconds, top):
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+        busy = sampler.samples - sampler.idle
+        lines = [
+            f"Samples: {sampler.samples} every {SAMPLE_INTERVAL * 1000:.0f} ms, "
+            f"{sampler.idle} idle in the selector, {busy} running code"
+            f" ({busy / sampler.samples:.1%} busy)" if sampler.samples else "Samples: 0",
+            "",
+            f"Top {top} lines by own samples:",
+        ]
+        lines += [f"{count:8d} {count / busy:6.1%}  {label}" for label, count in sampler.own.most_common(top)]
+        lines += ["", f"Top {top} functions by cumulative samples:"]
+        lines += [f"{count:8d} {count / busy:6.1%}  {label}" for label, count in sampler.cumulative.most_common(top)]
+        return lines
+
+    async def _profile_memory(self, seconds, top):
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        try:
+            before = tracemalloc.take_snapshot()
+            await asyncio.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        # Debug mode records a creation traceback for every handle and task;
+        # those allocations are the profiler's own, not the bot's.
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+                  tracemalloc.Filter(False, '*/traceback.py'), tracemalloc.Filter(False, '*/reprlib.py'))
+        before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+        lines = [
+            f"Traced memory: {current / 1024:.0f} KiB now, {peak / 1024:.0f} KiB peak"
+            + (" (since tracing started)" if was_tracing else " (while profiling)"),
+            "",
+            f"Top {top} lines by growth during the profile:",
+        ]
+        for stat in after.compare_to(before, 'lineno')[:top]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+        lines += ["", f"Top {top} lines by size at the end:"]
+        for stat in after.statistics('lineno')[:top]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+        return lines
+
+    @staticmethod
+    def _format_lag(lags):
+        if not lags:
+            return ["Event loop lag: no samples"]
+        ordered = sorted(lags)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return [f"Event loop lag over {len(lags)} checks: mean {sum(lags) / len(lags) * 1000:.1f} ms, "
+                f"p95 {p95 * 1000:.1f} ms, max {ordered[-1] * 1000:.1f} ms"]
+
+    @staticmethod
+    def _format_slow_callbacks(callbacks, top):
+        lines = [f"Slow callbacks (> {SLOW_CALLBACK_SECONDS * 1000:.0f} ms): {len(callbacks)}"]
+        by_handle = {}
+        for duration, handle in callbacks:
+            count, total, longest = by_handle.get(handle, (0, 0.0, 0.0))
+            by_handle[handle] = (count + 1, total + duration, max(longest, duration))
+        ranked = sorted(by_handle.items(), key=lambda item: item[1][1], reverse=True)
+        for handle, (count, total, longest) in ranked[:top]:
+            lines.append(f"{count:5d}x {total * 1000:8.0f} ms total, {longest * 1000:6.0f} ms max  {handle}")
+        return lines
+
+
+async def setup(bot):
+    pass
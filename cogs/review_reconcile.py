@@ -0,0 +1,134 @@
+import asyncio
+import time
+import discord
+from .review_dispatch import ROUTE_EDIT_MESSAGE
+from .review_store import TransactionConflict
+
+# How many guilds are reconciled at once.
+RECONCILE_CONCURRENCY = 4
+# Incremental passes only read history newer than a channel's high-water
+# mark, so reviews whose older message was deleted while the bot was down
+# are caught by a full pass at least this often.
+FULL_RECONCILE_INTERVAL = 7 * 24 * 3600
+# Besides the pass run on every (re)connect, a pass is scheduled this often.
+RECONCILE_INTERVAL = 6 * 3600
+HWM_KEY = 'reconcile:{channel_id}'
+
+
+class Reconciler:
+    """Brings stored reviews back in line with the messages in the review channels.
+
+    For each guild, both review channels are read in bulk through their
+    history. A stored review whose message is gone is pruned, and a review
+    message that has lost its buttons gets its view re-attached. The newest
+    message ID read in each channel is kept in the store's `meta` table, so
+    later passes only read history after it. While the bot is running,
+    deletions are pruned as they happen by ReviewEvents.
+    """
+
+    def __init__(self, bot, concurrency=RECONCILE_CONCURRENCY):
+        self.bot = bot
+        self.concurrency = concurrency
+        self._task = None
+        self.stats = {
+            'passes': 0,
+            'full_scans': 0,
+            'scanned': 0,
+            'pruned': 0,
+            'reattached': 0,
+            'last_pass_s': 0.0,
+        }
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start a pass in the background unless one is already running."""
+        if not self.running:
+            self._task = self.bot.rest_scheduler.spawn(self.run())
+        return self._task
+
+    async def reconcile(self):
+        """Run a pass, or wait for the one already running."""
+        await self.start()
+
+    async def run(self):
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def reconcile(guild_id):
+            async with semaphore:
+                try:
+                    await self.reconcile_guild(guild_id)
+                except discord.HTTPException as e:
+                    print(f"Reconciliation failed for guild {guild_id}: {e}")
+
+        await asyncio.gather(*(reconcile(guild_id) for guild_id in self.bot.store.guild_ids()))
+        self.stats['passes'] += 1
+        self.stats['last_pass_s'] = time.perf_counter() - start
+
+    async def reconcile_guild(self, guild_id):
+        from .review_views import ActiveReviewView, ReviewedTaskView
+        guild_data = self.bot.store.get_guild(guild_id)
+        if not guild_data:
+            return
+        await self.reconcile_channel(guild_id, guild_data['active_channel_id'], 'active', ActiveReviewView)
+        await self.reconcile_channel(guild_id, guild_data['reviewed_channel_id'], 'reviewed', ReviewedTaskView)
+
+    async def reconcile_channel(self, guild_id, channel_id, status, view_class):
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if channel is None:
+            return
+        store = self.bot.store
+        rest = self.bot.rest_scheduler
+        key = HWM_KEY.format(channel_id=channel_id)
+        state = store.get_meta(key) or {}
+        now = time.time()
+        hwm = state.get('hwm') or 0
+        full = not hwm or now - state.get('full_at', 0) >= FULL_RECONCILE_INTERVAL
+        # Taken before reading history, so reviews created during the scan
+        # are never mistaken for orphans.
+        expected = set(store.query_reviews(guild_id, status=status))
+        if full:
+            self.stats['full_scans'] += 1
+        else:
+            expected = {message_id for message_id in expected if message_id > hwm}
+        seen = set()
+        after = None if full else discord.Object(id=hwm)
+        async for message in channel.history(limit=None, after=after, oldest_first=True):
+            self.stats['scanned'] += 1
+            hwm = max(hwm, message.id)
+            if message.id not in expected:
+                continue
+            seen.add(message.id)
+            if not message.components:
+                try:
+                    await rest.run(ROUTE_EDIT_MESSAGE, channel.id, lambda message=message: message.edit(view=view_class()))
+                    self.stats['reattached'] += 1
+                except discord.HTTPException as e:
+                    print(f"Failed to re-attach buttons to message {message.id} in channel {channel.id}: {e}")
+        # Only reached once the whole range was read: a failed history call
+        # must not make every unread review look orphaned.
+        for message_id in expected - seen:
+            await self.prune(guild_id, message_id, status)
+        await store.set_meta(key, {'hwm': hwm or None, 'full_at': now if full else state.get('full_at', 0)})
+
+    async def prune(self, guild_id, message_id, status=None):
+        """Delete a stored review whose message no longer exists. Returns True if it was removed."""
+        try:
+            async with self.bot.store.review(guild_id, message_id) as tx:
+                # A handler that moved or deleted the review itself has
+                # already committed by the time the lock is ours. Archived
+                # reviews have no message to lose.
+                if tx.review is None or tx.review['status'] not in ((status,) if status else ('active', 'reviewed')):
+                    return False
+                tx.delete()
+        except TransactionConflict:
+            return False
+        self.stats['pruned'] += 1
+        return True
+
+
+async def setup(bot):
+    pass
@@ -0,0 +1,119 @@
+import sys
+from datetime import datetime, UTC
+
+# Review statuses. Decoded JSON creates a new string per review; interning
+# makes every record share these objects.
+ACTIVE = sys.intern('active')
+REVIEWED = sys.intern('reviewed')
+# Removed from the review channels by /archive; the record is kept.
+ARCHIVED = sys.intern('archived')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def timestamp_to_micros(timestamp):
+    """ISO 8601 timestamp to integer microseconds since the epoch (naive times are taken as UTC)."""
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def micros_to_timestamp(micros):
+    seconds, micro = divmod(micros, 1_000_000)
+    return datetime.fromtimestamp(seconds, UTC).replace(microsecond=micro).isoformat()
+
+
+class Review:
+    """One review, as held in memory.
+
+    A fraction of the size of the dict form: fixed slots instead of a
+    per-review key table, the creation time as integer microseconds rather
+    than an ISO string, role IDs as a tuple and the status interned.
+    `from_dict()` and `to_dict()` convert from and to the stored/JSON
+    schema; `to_dict()` always writes `role_ids`, never the legacy `role_id`.
+    """
+
+    __slots__ = ('title', 'link', 'author_id', 'created', 'status', 'reviewed_by',
+                 'dm_message_id', 'dm_channel_id', 'reminded', 'role_ids')
+
+    def __init__(self, title, author_id, created, status, role_ids=(), link=None, reviewed_by=None,
+                 dm_message_id=None, dm_channel_id=None, reminded=None):
+        self.title = title
+        self.link = link
+        self.author_id = author_id
+        self.created = created
+        self.status = sys.intern(status)
+        self.reviewed_by = reviewed_by
+        self.dm_message_id = dm_message_id
+        self.dm_channel_id = dm_channel_id
+        self.reminded = reminded
+        self.role_ids = role_ids
+
+    @classmethod
+    def from_dict(cls, data):
+        role_ids = data.get('role_ids')
+        if not role_ids and data.get('role_id'):
+            role_ids = (data['role_id'],)
+        return cls(
+            data['title'],
+            int(data['author_id']),
+            timestamp_to_micros(data.get('timestamp')),
+            data['status'],
+            tuple(map(int, role_ids)) if role_ids else (),
+            data.get('link'),
+            _optional_int(data.get('reviewed_by')),
+            _optional_int(data.get('dm_message_id')),
+            _optional_int(data.get('dm_channel_id')),
+            data.get('reminded'),
+        )
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'link': self.link,
+            'author_id': self.author_id,
+            'timestamp': micros_to_timestamp(self.created),
+            'status': self.status,
+            'reviewed_by': self.reviewed_by,
+            'dm_message_id': self.dm_message_id,
+            'dm_channel_id': self.dm_channel_id,
+            'reminded': self.reminded,
+            'role_ids': list(self.role_ids),
+        }
+
+    @property
+    def epoch(self):
+        """Creation time in POSIX seconds."""
+        return self.created / 1_000_000
+
+    def __eq__(self, other):
+        if not isinstance(other, Review):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"<Review {self.title!r} {self.status} by {self.author_id}>"
+
+
+def _optional_int(value):
+    return int(value) if value is not None else None
+
+
+def load_reviews(data):
+    """Legacy reviews.json mapping -> {guild_id: {message_id: Review}}, with integer snowflake keys."""
+    return {
+        int(guild_id): {
+            int(message_id): Review.from_dict(review)
+            for message_id, review in guild_data.get('reviews', {}).items()
+        }
+        for guild_id, guild_data in data.items()
+    }
+
+
+async def setup(bot):
+    pass
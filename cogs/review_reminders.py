@@ -0,0 +1,177 @@
+import asyncio
+import heapq
+import time
+import discord
+from .review_dispatch import ROUTE_SEND_MESSAGE
+from .review_store import TransactionConflict
+
+# Reminder stages, recorded as bit flags in a review's `reminded` field once sent.
+STAGE_ROLES = 1
+STAGE_AUTHOR = 2
+STAGE_HOURS_KEYS = {STAGE_ROLES: 'roles_after_hours', STAGE_AUTHOR: 'author_after_hours'}
+CONFIG_KEY = 'reminders:{guild_id}'
+MAX_REMINDER_HOURS = 720
+DISCORD_EPOCH_MS = 1420070400000
+
+
+def snowflake_epoch(snowflake):
+    """POSIX time a Discord ID was created at."""
+    return ((int(snowflake) >> 22) + DISCORD_EPOCH_MS) / 1000
+
+
+class Reminders:
+    """Pings the assigned roles, then the author, about reviews left in active-reviews too long.
+
+    Due reminders sit in a min-heap of (due, guild_id, message_id, stage),
+    so only the earliest one is ever waited on and each is pushed and popped
+    in O(log n). A review is timed from its active message, i.e. from when it
+    was created or last moved back. The store calls `schedule()` for every
+    review it writes, so the heap follows creations and moves as they
+    happen. Entries made obsolete by a move, a deletion, a config change or
+    the guild's removal are not removed from the heap; `_due` holds the
+    current due time of each pending reminder, and a popped entry that
+    doesn't match it is dropped.
+    Sent stages are stored on the review, and the heap is rebuilt from the
+    store at startup.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._heap = []
+        # (guild_id, message_id, stage) -> due time of the reminder's live heap entry.
+        self._due = {}
+        self._configs = {}
+        self._wakeup = asyncio.Event()
+        self.stats = {'sent': 0, 'dropped': 0, 'failed': 0}
+
+    @property
+    def pending(self):
+        return len(self._due)
+
+    # --- Configuration ---
+
+    def config(self, guild_id):
+        """{'roles_after_hours': h, 'author_after_hours': h} for a guild; 0 or missing means off."""
+        guild_id = int(guild_id)
+        if guild_id not in self._configs:
+            self._configs[guild_id] = self.bot.store.get_meta(CONFIG_KEY.format(guild_id=guild_id)) or {}
+        return self._configs[guild_id]
+
+    async def set_config(self, guild_id, roles_after_hours, author_after_hours):
+        guild_id = int(guild_id)
+        config = {'roles_after_hours': roles_after_hours, 'author_after_hours': author_after_hours}
+        await self.bot.store.set_meta(CONFIG_KEY.format(guild_id=guild_id), config)
+        self._configs[guild_id] = config
+        self._schedule_guild(guild_id)
+
+    # --- Scheduling ---
+
+    def schedule(self, guild_id, message_id, review):
+        """(Re)schedule a review's outstanding reminders; `review` None means it was deleted."""
+        guild_id, message_id = int(guild_id), int(message_id)
+        config = self.config(guild_id)
+        for stage, hours_key in STAGE_HOURS_KEYS.items():
+            key = (guild_id, message_id, stage)
+            hours = config.get(hours_key)
+            if (not review or review['status'] != 'active' or not hours
+                    or (review.get('reminded') or 0) & stage
+                    or (stage == STAGE_ROLES and not review.get('role_ids'))):
+                self._due.pop(key, None)
+                continue
+            due = snowflake_epoch(message_id) + hours * 3600
+            if self._due.get(key) == due:
+                continue
+            self._due[key] = due
+            if not self._heap or due < self._heap[0][0]:
+                self._wakeup.set()
+            heapq.heappush(self._heap, (due, guild_id, message_id, stage))
+
+    def forget_guild(self, guild_id):
+        """Drop a deleted guild's pending reminders; its heap entries are discarded when popped."""
+        guild_id = int(guild_id)
+        for key in [key for key in self._due if key[0] == guild_id]:
+            del self._due[key]
+
+    def rebuild(self):
+        """Schedule every active review of every configured guild from the store (startup)."""
+        self._heap.clear()
+        self._due.clear()
+        for guild_id in self.bot.store.guild_ids():
+            self._schedule_guild(guild_id)
+
+    def _schedule_guild(self, guild_id):
+        for key in [key for key in self._due if key[0] == guild_id]:
+            del self._due[key]
+        if not any(self.config(guild_id).values()):
+            return
+        store = self.bot.store
+        for message_id in store.query_reviews(guild_id, status='active'):
+            self.schedule(guild_id, message_id, store.get_review(guild_id, message_id))
+        self._wakeup.set()
+
+    # --- Firing ---
+
+    async def run(self):
+        """Send reminders as they fall due; runs for the bot's lifetime."""
+        await self.bot.wait_until_ready()
+        while True:
+            self._wakeup.clear()
+            timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            await self.fire_due()
+
+    async def fire_due(self, now=None):
+        now = time.time() if now is None else now
+        while self._heap and self._heap[0][0] <= now:
+            due, guild_id, message_id, stage = heapq.heappop(self._heap)
+            key = (guild_id, message_id, stage)
+            if self._due.get(key) != due:
+                self.stats['dropped'] += 1
+                continue
+            del self._due[key]
+            await self.send(guild_id, message_id, stage)
+
+    async def send(self, guild_id, message_id, stage):
+        store = self.bot.store
+        review = store.get_review(guild_id, message_id)
+        if not review or review['status'] != 'active' or (review.get('reminded') or 0) & stage:
+            return
+        channel = self.bot.get_channel((store.get_guild(guild_id) or {}).get('active_channel_id'))
+        if channel is None:
+            return
+        hours = self.config(guild_id).get(STAGE_HOURS_KEYS[stage])
+        if stage == STAGE_ROLES:
+            mentions = " ".join(f"<@&{role_id}>" for role_id in review['role_ids'])
+            allowed = discord.AllowedMentions(roles=[discord.Object(id=role_id) for role_id in review['role_ids']],
+                                              users=False, everyone=False)
+        else:
+            mentions = f"<@{review['author_id']}>"
+            allowed = discord.AllowedMentions(users=[discord.Object(id=review['author_id'])],
+                                              roles=False, everyone=False)
+        content = f":bell: **{review['title']}** has been waiting for review for over {hours}h. {mentions}"
+        try:
+            await self.bot.rest_scheduler.run(
+                ROUTE_SEND_MESSAGE, channel.id,
+                lambda: channel.send(content, reference=channel.get_partial_message(message_id),
+                                     allowed_mentions=allowed, mention_author=False)
+            )
+        except discord.HTTPException as e:
+            # A deleted review message is left to the reconciler to prune.
+            self.stats['failed'] += 1
+            print(f"Failed to send reminder for review {message_id} in guild {guild_id}: {e}")
+            return
+        self.stats['sent'] += 1
+        try:
+            async with store.review(guild_id, message_id) as tx:
+                if tx.review is not None and tx.review['status'] == 'active':
+                    tx.put(message_id, dict(tx.review, reminded=(tx.review.get('reminded') or 0) | stage))
+        except TransactionConflict:
+            # Moved or deleted meanwhile; the new message starts a fresh clock anyway.
+            pass
+
+
+async def setup(bot):
+    pass
@@ -0,0 +1,155 @@
+import time
+
+# Select menus hold at most 25 options.
+PAGE_SIZE = 25
+# Picker sessions are dropped after this many seconds without a click.
+SESSION_TIMEOUT = 300
+
+
+def colour_emoji(value):
+    if value == 0:
+        return "⚪"
+    elif value < 0x555555:
+        return "⚫"
+    elif value < 0xAA0000:
+        return "🔴"
+    elif value < 0x00AA00:
+        return "🟢"
+    elif value < 0x0000AA:
+        return "🔵"
+    elif value < 0xAAAA00:
+        return "🟡"
+    elif value < 0x00AAAA:
+        return "🟦"
+    elif value < 0xAA00AA:
+        return "🟣"
+    return "🟠"
+
+
+class RoleEntry:
+    """A role as the picker shows it, computed once per index build."""
+    __slots__ = ('id', 'name', 'key', 'label')
+
+    def __init__(self, role):
+        self.id = role.id
+        self.name = role.name
+        self.key = role.name.casefold()
+        self.label = f"{colour_emoji(role.color.value)} {role.name}"[:100]
+
+
+class RoleIndex:
+    """Per-guild cache of pickable roles plus the open picker sessions.
+
+    Entries are built from `guild.roles` the first time a guild is picked
+    from and kept until a role in that guild is created, updated or
+    deleted, so opening the picker, paging and filtering never re-walk the
+    guild's roles.
+    """
+
+    def __init__(self):
+        self._guilds = {}
+        self.sessions = {}
+        self.stats = {'builds': 0, 'hits': 0, 'invalidations': 0}
+
+    def entries(self, guild):
+        entries = self._guilds.get(guild.id)
+        if entries is None:
+            entries = tuple(RoleEntry(role) for role in guild.roles if not role.is_default())
+            self._guilds[guild.id] = entries
+            self.stats['builds'] += 1
+        else:
+            self.stats['hits'] += 1
+        return entries
+
+    def search(self, guild, text):
+        """Roles whose name contains `text`, case-insensitively, in guild order."""
+        entries = self.entries(guild)
+        text = (text or '').strip().casefold()
+        if not text:
+            return entries
+        return tuple(entry for entry in entries if text in entry.key)
+
+    def find(self, guild, name):
+        """The role named `name` (case-insensitive), or None."""
+        key = name.strip().casefold()
+        for entry in self.entries(guild):
+            if entry.key == key:
+                return entry
+        return None
+
+    def invalidate(self, guild_id):
+        if self._guilds.pop(guild_id, None) is not None:
+            self.stats['invalidations'] += 1
+
+    def open_session(self, interaction, title, link):
+        self._expire_sessions()
+        session = RolePickerSession(self, interaction.guild, title, link)
+        self.sessions[interaction.id] = session
+        return interaction.id, session
+
+    def close_session(self, session_id):
+        self.sessions.pop(session_id, None)
+
+    def _expire_sessions(self):
+        cutoff = time.monotonic() - SESSION_TIMEOUT
+        for session_id in [k for k, s in self.sessions.items() if s.touched < cutoff]:
+            del self.sessions[session_id]
+
+
+class RolePickerSession:
+    """Selection state for one open role picker, kept on the bot side."""
+
+    def __init__(self, index, guild, title, link):
+        self.index = index
+        self.guild = guild
+        self.title = title
+        self.link = link
+        self.selected = {}
+        self.query = ''
+        self.page = 0
+        self.matches = index.entries(guild)
+        self.touched = time.monotonic()
+
+    @property
+    def page_count(self):
+        return max(1, (len(self.matches) + PAGE_SIZE - 1) // PAGE_SIZE)
+
+    def page_entries(self):
+        start = self.page * PAGE_SIZE
+        return self.matches[start:start + PAGE_SIZE]
+
+    def set_query(self, text):
+        self.query = (text or '').strip()
+        self.matches = self.index.search(self.guild, self.query)
+        self.page = 0
+        self.touched = time.monotonic()
+
+    def turn(self, delta):
+        self.page = min(max(0, self.page + delta), self.page_count - 1)
+        self.touched = time.monotonic()
+
+    def select_on_page(self, role_ids):
+        """Replace the selection for the roles shown on the current page."""
+        chosen = {int(role_id) for role_id in role_ids}
+        for entry in self.page_entries():
+            if entry.id in chosen:
+                self.selected[entry.id] = entry.name
+            else:
+                self.selected.pop(entry.id, None)
+        self.touched = time.monotonic()
+
+    def summary(self):
+        text = f"Roles selected: {len(self.selected)}"
+        if self.selected:
+            names = ", ".join(list(self.selected.values())[:10])
+            if len(self.selected) > 10:
+                names += ", …"
+            text += f" ({names})"
+        text += f". Page {self.page + 1}/{self.page_count}"
+        if self.query:
+            text += f", filter `{self.query}` ({len(self.matches)} matching)"
+        return text + "."
+
+
+async def setup(bot):
+    pass
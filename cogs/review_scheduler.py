@@ -0,0 +1,123 @@
+import asyncio
+import random
+import time
+
+
+class Job:
+    """A scheduled coroutine function: runs once after `delay`, or every `interval` seconds if one is given."""
+
+    def __init__(self, name, func, interval=None, delay=0.0, jitter=0.0):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.delay = delay
+        self.jitter = jitter
+        self.runs = 0
+        self.failures = 0
+        # Ticks dropped because the previous run was still going.
+        self.skipped = 0
+        self.running = False
+        self.last_run = None
+        self.last_duration = 0.0
+        self.next_run = None
+        self._task = None
+
+    @property
+    def active(self):
+        return self._task is not None and not self._task.done()
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+class Scheduler:
+    """Runs periodic and delayed background jobs on the event loop.
+
+    Jobs are registered by name; registering a name again replaces the old
+    job. A periodic job never overlaps itself: ticks that pass while it is
+    still running are skipped, not queued. Jobs added before `start()` wait
+    for it, and `start()` only has an effect the first time, so it is safe to
+    reach from handlers that fire repeatedly, like on_ready.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self._started = False
+
+    def every(self, name, interval, func, jitter=0.0, delay=None):
+        """Run `func()` every `interval` seconds (first after `delay`, default one interval), plus up to `jitter`."""
+        return self._add(Job(name, func, interval=interval, delay=interval if delay is None else delay, jitter=jitter))
+
+    def after(self, name, delay, func, jitter=0.0):
+        """Run `func()` once, `delay` seconds from now (or from `start()`), plus up to `jitter`."""
+        return self._add(Job(name, func, delay=delay, jitter=jitter))
+
+    def cancel(self, name):
+        job = self.jobs.pop(name, None)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        for job in self.jobs.values():
+            self._launch(job)
+
+    async def close(self):
+        jobs = list(self.jobs.values())
+        self.jobs.clear()
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*(job._task for job in jobs if job._task is not None), return_exceptions=True)
+        self._started = False
+
+    def _add(self, job):
+        self.cancel(job.name)
+        self.jobs[job.name] = job
+        if self._started:
+            self._launch(job)
+        return job
+
+    def _launch(self, job):
+        job._task = asyncio.get_running_loop().create_task(self._run(job), name=f"scheduler:{job.name}")
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        due = loop.time() + job.delay
+        try:
+            while True:
+                wake = due + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+                job.next_run = time.time() + max(0.0, wake - loop.time())
+                await asyncio.sleep(max(0.0, wake - loop.time()))
+                started = loop.time()
+                job.running = True
+                try:
+                    await job.func()
+                except Exception as e:
+                    job.failures += 1
+                    print(f"Scheduled job {job.name} failed: {e!r}")
+                finally:
+                    job.running = False
+                    job.runs += 1
+                    job.last_run = time.time()
+                    job.last_duration = loop.time() - started
+                if job.interval is None:
+                    break
+                due += job.interval
+                now = loop.time()
+                if due < now:
+                    missed = int((now - due) // job.interval) + 1
+                    job.skipped += missed
+                    due += missed * job.interval
+        finally:
+            job.next_run = None
+            if self.jobs.get(job.name) is job and job.interval is None:
+                del self.jobs[job.name]
+
+
+async def setup(bot):
+    pass
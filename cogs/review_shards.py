@@ -0,0 +1,110 @@
+import json
+import os
+import time
+
+# Each shard-group process writes its health here; `status` reads them all.
+SHARD_STATUS_DIR = 'shard_status'
+STATUS_INTERVAL = 30
+# A group whose file is older than this is shown as unresponsive.
+STATUS_STALE_AFTER = 3 * STATUS_INTERVAL
+
+
+def shard_for_guild(guild_id, shard_count):
+    """The shard Discord routes a guild's events to."""
+    return (int(guild_id) >> 22) % shard_count
+
+
+def partition_path(group):
+    """Database file holding the reviews of one shard group's guilds."""
+    return f"reviews.g{group}.db"
+
+
+def split_shards(shard_count, group_count):
+    """Contiguous shard ID ranges, one per group, as evenly sized as possible."""
+    base, extra = divmod(shard_count, group_count)
+    groups, start = [], 0
+    for group in range(group_count):
+        size = base + (1 if group < extra else 0)
+        groups.append(list(range(start, start + size)))
+        start += size
+    return groups
+
+
+class ShardConfig:
+    """Which shards this process runs, read from the environment set by launcher.py."""
+
+    def __init__(self, group, shard_count, shard_ids):
+        self.group = group
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+        self._shard_id_set = frozenset(shard_ids)
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """None unless REVIEWER_SHARD_COUNT is set, i.e. outside the launcher."""
+        shard_count = environ.get('REVIEWER_SHARD_COUNT')
+        if not shard_count:
+            return None
+        shard_count = int(shard_count)
+        shard_ids = [int(s) for s in environ.get('REVIEWER_SHARD_IDS', '').split(',') if s.strip()]
+        return cls(int(environ.get('REVIEWER_SHARD_GROUP', 0)), shard_count, shard_ids or list(range(shard_count)))
+
+    def layout(self):
+        """The shard assignment this group's partition is split by (stored in the partition)."""
+        return {'shard_count': self.shard_count, 'shard_ids': list(self.shard_ids)}
+
+    def owns_guild(self, guild_id):
+        return shard_for_guild(guild_id, self.shard_count) in self._shard_id_set
+
+
+def status_snapshot(bot, config):
+    latencies = getattr(bot, 'latencies', None) or [(config.shard_ids[0] if config.shard_ids else 0, bot.latency)]
+    return {
+        'group': config.group,
+        'pid': os.getpid(),
+        'shard_count': config.shard_count,
+        'shard_ids': config.shard_ids,
+        'started_at': bot.start_time.isoformat() if bot.start_time else None,
+        'latency_ms': {str(shard_id): round(latency * 1000, 1) for shard_id, latency in latencies},
+        'guilds': len(bot.guilds),
+        'reviews_queue_depth': bot.store.queue_depth if bot.store else 0,
+        'updated_at': time.time(),
+    }
+
+
+def write_status(bot, config, directory=SHARD_STATUS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"group-{config.group}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(status_snapshot(bot, config), f)
+    os.replace(tmp_path, path)
+
+
+async def publish_status(bot, config):
+    """Refresh this group's status file for the other processes' `status` command; run every STATUS_INTERVAL."""
+    try:
+        write_status(bot, config)
+    except OSError as e:
+        print(f"Error: Could not write shard status: {e}")
+
+
+def read_statuses(directory=SHARD_STATUS_DIR):
+    statuses = []
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return statuses
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'r') as f:
+                statuses.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return statuses
+
+
+async def setup(bot):
+    pass
@@ -0,0 +1,934 @@
+import asyncio
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import traceback
+from datetime import datetime, UTC
+from concurrent.futures import ThreadPoolExecutor
+from .review_index import GuildReviewIndex, review_epoch
+from .review_record import Review
+from .review_migrate import iter_normalized
+
+DB_FILE = 'reviews.db'
+LEGACY_DATA_FILE = 'reviews.json'
+
+# How long the writer waits after the first dirty mark so that a burst of
+# mutations (e.g. several clicks in a row) is appended with a single fsync.
+COALESCE_WINDOW = 0.25
+# Once the journal grows past this many bytes it is folded into the SQLite
+# snapshot and truncated.
+COMPACT_THRESHOLD = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    guild_id INTEGER PRIMARY KEY,
+    active_channel_id INTEGER,
+    reviewed_channel_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    guild_id INTEGER NOT NULL REFERENCES guilds (guild_id) ON DELETE CASCADE,
+    message_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT,
+    author_id INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reviewed_by INTEGER,
+    dm_message_id INTEGER,
+    dm_channel_id INTEGER,
+    reminded INTEGER,
+    PRIMARY KEY (guild_id, message_id)
+);
+CREATE TABLE IF NOT EXISTS review_roles (
+    guild_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    role_id INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, message_id, role_id),
+    FOREIGN KEY (guild_id, message_id) REFERENCES reviews (guild_id, message_id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS review_events (
+    seq INTEGER PRIMARY KEY,
+    at TEXT NOT NULL,
+    event TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    message_id INTEGER,
+    new_message_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_status ON reviews (guild_id, status);
+CREATE INDEX IF NOT EXISTS idx_reviews_author ON reviews (guild_id, author_id);
+CREATE INDEX IF NOT EXISTS idx_review_roles_role ON review_roles (guild_id, role_id);
+"""
+
+# Bumped whenever SCHEMA changes; `migrate()` upgrades older files in place.
+SCHEMA_VERSION = 3
+
+# Meta key holding the shard layout a partition's guilds were selected by.
+LAYOUT_KEY = 'partition_layout'
+
+REVIEW_COLUMNS = ('title', 'link', 'author_id', 'timestamp', 'status', 'reviewed_by', 'dm_message_id', 'dm_channel_id',
+                  'reminded')
+
+
+class TransactionConflict(Exception):
+    """Raised when rows read by a transaction were changed by someone else before it committed."""
+
+
+class PartitionLayoutError(Exception):
+    """Raised when a shard group's partition was split for a different shard layout."""
+
+
+class KeyedLocks:
+    """asyncio locks created on demand per key and dropped once nobody holds or waits on them."""
+
+    def __init__(self):
+        self._locks = {}
+
+    @contextlib.asynccontextmanager
+    async def hold(self, key):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    @contextlib.asynccontextmanager
+    async def hold_idle(self, keys):
+        """Hold the lock of every key nobody holds or waits on, without waiting on the others; yields the keys held."""
+        held = []
+        try:
+            for key in keys:
+                if key in self._locks:
+                    continue
+                entry = self._locks[key] = [asyncio.Lock(), 1]
+                held.append(key)
+                # A fresh lock is acquired without suspending.
+                await entry[0].acquire()
+            yield held
+        finally:
+            for key in held:
+                entry = self._locks[key]
+                entry[0].release()
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+class ReviewTransaction:
+    """Staged review changes for one guild, applied atomically when the `store.review()` or `store.reviews()` block exits."""
+
+    def __init__(self, store, guild_id, message_id, epoch, message_ids=()):
+        self.guild_id = guild_id
+        self.message_id = message_id
+        self.guild = store.get_guild(guild_id)
+        self.review = store.get_review(guild_id, message_id) if message_id is not None else None
+        # Existing reviews locked by the transaction; a change to any of them is a conflict.
+        self.message_ids = [message_id] if message_id is not None else list(message_ids)
+        self._store = store
+        self._epoch = epoch
+        self._ops = []
+
+    def check(self):
+        """Raise TransactionConflict if the review or the guild's configuration changed since the transaction began.
+
+        Runs on commit; handlers also call it right before their first
+        irreversible Discord call, so a conflict is caught while it is
+        still free to abort.
+        """
+        store = self._store
+        if store._guild_epochs.get(self.guild_id, 0) != self._epoch or self.guild_id not in store._guilds:
+            raise TransactionConflict(f"Guild {self.guild_id} was reconfigured during the transaction")
+        for message_id in self.message_ids:
+            if store._versions.get((self.guild_id, message_id)):
+                raise TransactionConflict(f"Review {message_id} was modified during the transaction")
+
+    def put(self, message_id, review):
+        self._ops.append(('put', message_id, review))
+
+    def delete(self, message_id=None):
+        self._ops.append(('delete', self.message_id if message_id is None else message_id, None))
+
+    def move(self, new_message_id, review):
+        self.delete()
+        self.put(new_message_id, review)
+
+
+class GuildTransaction:
+    """Staged guild configuration change, applied when the `store.guild()` block exits."""
+
+    def __init__(self, store, guild_id):
+        self.guild_id = guild_id
+        self.config = store.get_guild(guild_id)
+        self._op = None
+
+    def set(self, active_channel_id, reviewed_channel_id):
+        self._op = ('set', active_channel_id, reviewed_channel_id)
+
+    def delete(self):
+        self._op = ('delete',)
+
+
+def connect(path, synchronous='NORMAL'):
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def migrate(conn):
+    """Upgrade a database created by an older version of the bot to SCHEMA_VERSION."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(reviews)")}
+    if version < 2 and 'dm_channel_id' not in columns:
+        # 2: the DM channel is stored next to the DM message so it can be
+        # deleted without looking the channel up first.
+        conn.execute("ALTER TABLE reviews ADD COLUMN dm_channel_id INTEGER")
+    if version < 3 and 'reminded' not in columns:
+        # 3: which stale-review reminders were already sent (bit flags).
+        conn.execute("ALTER TABLE reviews ADD COLUMN reminded INTEGER")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+class ReviewStore:
+    """Review storage: an SQLite (WAL) snapshot plus an append-only journal.
+
+    Every state change (review created, reviewed, moved back, deleted, guild
+    configured or deleted) is recorded as one NDJSON line in the journal and
+    applied to an in-memory overlay, so a write costs O(1) regardless of how
+    much data is stored. Reads check the overlay, then fall back to a
+    single-row lookup in the snapshot. A background writer coalesces appends
+    into one fsync, and folds the journal into the snapshot once it passes
+    COMPACT_THRESHOLD. On startup the journal is replayed onto the snapshot.
+    """
+
+    def __init__(self, path=DB_FILE, journal_path=None):
+        self.path = path
+        self.journal_path = journal_path or f"{os.path.splitext(path)[0]}.journal"
+        self.conn = connect(path)
+        self.conn.executescript(SCHEMA)
+        migrate(self.conn)
+        self._guilds = {}
+        self.watched_channel_ids = frozenset()
+        # Changes not yet folded into the snapshot: key -> (seq, review or None for a delete).
+        self._pending = {}
+        self._cleared_guilds = {}
+        # Entries waiting to be appended, and entries journaled but not yet compacted.
+        self._ops = []
+        self._journaled = []
+        self._journal_bytes = 0
+        self._seq = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='review-store')
+        self._writer_conn = None
+        self._writer_task = None
+        self._dirty = None
+        # Per-review and per-guild locks; `_versions` counts writes to a review
+        # while a transaction holds it, `_guild_epochs` counts config changes.
+        self._review_locks = KeyedLocks()
+        self._guild_locks = KeyedLocks()
+        self._versions = {}
+        self._guild_epochs = {}
+        # Per-guild secondary indexes for queries, built on first use.
+        self._indexes = {}
+        self.stats = {
+            'flushes': 0,
+            'flushed_ops': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+            'compactions': 0,
+            'last_compaction_ms': 0.0,
+            'write_errors': 0,
+        }
+        # Optional callable(operation, seconds), called on the writer thread
+        # after each journal flush and compaction (used for metrics).
+        self.on_timing = None
+        # Optional callable(guild_id, message_id, review or None), called on
+        # the event loop for every review written or deleted (used for reminders).
+        self.on_review_change = None
+        # Optional callable(guild_id), called on the event loop when a guild's
+        # configuration and reviews are deleted (used for reminders).
+        self.on_guild_delete = None
+        self.reload_guilds()
+        self._replay_journal()
+
+    @property
+    def queue_depth(self):
+        return len(self._ops)
+
+    @property
+    def writer_running(self):
+        return self._writer_task is not None and not self._writer_task.done()
+
+    @property
+    def journal_bytes(self):
+        return self._journal_bytes
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Start the background writer. Must be called from the running event loop."""
+        if self._writer_task is None:
+            self._dirty = asyncio.Event()
+            if self._ops:
+                self._dirty.set()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def close(self):
+        """Stop the writer, flush and compact anything outstanding, and close the database."""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        await self.flush()
+        await self.compact()
+        self._executor.submit(self._close_writer).result()
+        self._executor.shutdown()
+        self.conn.close()
+
+    def close_sync(self):
+        """Flush, compact and close without an event loop (scripts and tools)."""
+        self.flush_sync()
+        entries, self._journaled = self._journaled, []
+        if entries:
+            self._executor.submit(self._compact, entries).result()
+            self._settle(entries)
+        self._executor.submit(self._close_writer).result()
+        self._executor.shutdown()
+        self.conn.close()
+
+    async def flush(self):
+        entries, self._ops = self._ops, []
+        if entries:
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._executor, self._append, entries)
+            except BaseException:
+                # Keep the batch so the next flush retries it ahead of newer entries.
+                self._ops = entries + self._ops
+                raise
+            self._journaled.extend(entries)
+
+    async def compact(self):
+        entries, self._journaled = self._journaled, []
+        if entries:
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._executor, self._compact, entries)
+            except BaseException:
+                self._journaled = entries + self._journaled
+                raise
+            self._settle(entries)
+
+    def flush_sync(self):
+        entries, self._ops = self._ops, []
+        if entries:
+            self._executor.submit(self._append, entries).result()
+            self._journaled.extend(entries)
+        if self._journal_bytes >= COMPACT_THRESHOLD:
+            entries, self._journaled = self._journaled, []
+            self._executor.submit(self._compact, entries).result()
+            self._settle(entries)
+
+    async def _writer(self):
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(COALESCE_WINDOW)
+            self._dirty.clear()
+            try:
+                await self.flush()
+                if self._journal_bytes >= COMPACT_THRESHOLD:
+                    await self.compact()
+            except (OSError, sqlite3.Error) as e:
+                self.stats['write_errors'] += 1
+                print(f"Error: Could not save review data to {self.journal_path}: {e}")
+                await asyncio.sleep(COALESCE_WINDOW)
+                self._dirty.set()
+            except Exception:
+                # A bug must not end the writer, or every later write would
+                # only pile up in memory until shutdown.
+                self.stats['write_errors'] += 1
+                print(f"Error: Unexpected failure saving review data to {self.journal_path}:")
+                traceback.print_exc()
+                await asyncio.sleep(COALESCE_WINDOW)
+                self._dirty.set()
+
+    def _record(self, event, ops):
+        """Apply a state change to memory and queue its journal entry."""
+        self._seq += 1
+        entry = {'seq': self._seq, 'at': datetime.now(UTC).isoformat(), 'event': event, 'ops': ops}
+        self._apply(entry)
+        self._ops.append(entry)
+        if self._writer_task is not None:
+            self._dirty.set()
+        else:
+            # No event loop yet (scripts, startup): write through synchronously.
+            self.flush_sync()
+
+    def _apply(self, entry):
+        seq = entry['seq']
+        guilds_changed = False
+        for op in entry['ops']:
+            kind = op[0]
+            if kind in ('put_review', 'delete_review'):
+                key = (op[1], op[2])
+                # Held as a compact Review record; the journal keeps the dict form.
+                record = Review.from_dict(op[3]) if kind == 'put_review' else None
+                self._pending[key] = (seq, record)
+                if key in self._versions:
+                    self._versions[key] += 1
+                index = self._indexes.get(op[1])
+                if index is not None:
+                    if kind == 'put_review':
+                        index.put(op[2], record)
+                    else:
+                        index.remove(op[2])
+                if self.on_review_change is not None:
+                    self.on_review_change(op[1], op[2], op[3] if kind == 'put_review' else None)
+            elif kind == 'set_guild':
+                self._guilds[op[1]] = {'active_channel_id': op[2], 'reviewed_channel_id': op[3]}
+                guilds_changed = True
+            elif kind == 'delete_guild':
+                self._guilds.pop(op[1], None)
+                self._indexes.pop(op[1], None)
+                for key in [key for key in self._pending if key[0] == op[1]]:
+                    del self._pending[key]
+                self._cleared_guilds[op[1]] = seq
+                guilds_changed = True
+                if self.on_guild_delete is not None:
+                    self.on_guild_delete(op[1])
+            if kind in ('set_guild', 'delete_guild'):
+                self._guild_epochs[op[1]] = self._guild_epochs.get(op[1], 0) + 1
+        if guilds_changed:
+            self._rebuild_watched_channels()
+
+    def _replay_journal(self):
+        """Re-apply journal entries newer than the snapshot, dropping a torn trailing line."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'journal_seq'").fetchall()
+        snapshot_seq = row[0][0] if row else 0
+        self._seq = snapshot_seq
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+        valid_length = data.rfind(b'\n') + 1
+        if valid_length != len(data):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_length)
+        self._journal_bytes = valid_length
+        for line in data[:valid_length].splitlines():
+            entry = json.loads(line)
+            if entry['seq'] <= snapshot_seq:
+                continue
+            entry['ops'] = [tuple(op) for op in entry['ops']]
+            self._apply(entry)
+            self._journaled.append(entry)
+            self._seq = entry['seq']
+
+    def _append(self, entries):
+        """Runs on the writer thread: append a batch of entries to the journal with one fsync."""
+        start = time.perf_counter()
+        payload = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries).encode()
+        with open(self.journal_path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_bytes += len(payload)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stats['flushes'] += 1
+        self.stats['flushed_ops'] += len(entries)
+        self.stats['last_flush_ms'] = elapsed
+        self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed)
+        self.stats['total_flush_ms'] += elapsed
+        if self.on_timing is not None:
+            self.on_timing('flush', elapsed / 1000)
+
+    def _compact(self, entries):
+        """Runs on the writer thread: fold journaled entries into the snapshot, then truncate the journal.
+
+        The snapshot records the last folded seq, so a crash between the
+        commit and the truncate only means those entries are skipped on replay.
+        """
+        if self._writer_conn is None:
+            self._writer_conn = connect(self.path, synchronous='FULL')
+        conn = self._writer_conn
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for entry in entries:
+                apply_ops(conn, entry['ops'])
+                message_ids = [op[2] for op in entry['ops'] if op[0] in ('put_review', 'delete_review')]
+                guild_id = entry['ops'][0][1]
+                conn.execute(
+                    "INSERT OR REPLACE INTO review_events (seq, at, event, guild_id, message_id, new_message_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry['seq'], entry['at'], entry['event'], guild_id,
+                     message_ids[0] if message_ids else None,
+                     message_ids[-1] if len(message_ids) > 1 else None)
+                )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('journal_seq', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (entries[-1]['seq'],)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        # Everything in the file has now been folded in: the writer thread is
+        # the only appender, so no entry can have landed since `entries` was taken.
+        with open(self.journal_path, 'r+b') as f:
+            f.truncate(0)
+            os.fsync(f.fileno())
+        self._journal_bytes = 0
+        self.stats['compactions'] += 1
+        elapsed = time.perf_counter() - start
+        self.stats['last_compaction_ms'] = elapsed * 1000
+        if self.on_timing is not None:
+            self.on_timing('compaction', elapsed)
+
+    def _close_writer(self):
+        if self._writer_conn is not None:
+            self._writer_conn.close()
+            self._writer_conn = None
+
+    def _settle(self, entries):
+        """Drop overlay entries that compaction has folded into the snapshot."""
+        last_seq = entries[-1]['seq']
+        for entry in entries:
+            for op in entry['ops']:
+                if op[0] in ('put_review', 'delete_review'):
+                    key = (op[1], op[2])
+                    pending = self._pending.get(key)
+                    if pending and pending[0] <= last_seq:
+                        del self._pending[key]
+                elif op[0] == 'delete_guild':
+                    seq = self._cleared_guilds.get(op[1])
+                    if seq is not None and seq <= last_seq:
+                        del self._cleared_guilds[op[1]]
+
+    # --- Transactions ---
+    # Handlers hold a transaction across their Discord calls instead of
+    # reading, awaiting and writing back. Clicks on different reviews, or in
+    # different guilds, never wait on each other; two clicks on the same
+    # review are serialized by its lock.
+
+    @contextlib.asynccontextmanager
+    async def review(self, guild_id, message_id=None):
+        """Transaction over one review (or, with no message_id, over new reviews only) in a guild.
+
+        Usage: `async with store.review(guild_id, message_id) as tx:` then
+        `tx.move(...)`, `tx.put(...)` or `tx.delete()`. Raises
+        TransactionConflict on commit if the review or the guild's channel
+        configuration changed underneath it.
+        """
+        guild_id = int(guild_id)
+        key = (guild_id, int(message_id)) if message_id is not None else None
+        async with self._review_locks.hold(key) if key else contextlib.nullcontext():
+            epoch = self._guild_epochs.get(guild_id, 0)
+            if key:
+                self._versions[key] = 0
+            try:
+                tx = ReviewTransaction(self, guild_id, key and key[1], epoch)
+                yield tx
+                if not tx._ops:
+                    return
+                tx.check()
+                ops = review_ops(tx)
+                if tx.review is not None and [op[:3] for op in ops] == [('put_review', guild_id, key[1])]:
+                    event = 'updated'
+                else:
+                    event = transition_event(ops)
+                self._record(event, ops)
+            finally:
+                if key:
+                    self._versions.pop(key, None)
+
+    @contextlib.asynccontextmanager
+    async def reviews(self, guild_id, message_ids):
+        """Transaction over many existing reviews in a guild, for bulk changes.
+
+        Takes the lock of each review no handler is working on, without
+        waiting; `tx.message_ids` lists the reviews held and `tx.busy` the
+        ones skipped. Only the held reviews may be changed, with
+        `tx.put(message_id, ...)` or `tx.delete(message_id)`.
+        """
+        guild_id = int(guild_id)
+        keys = list(dict.fromkeys((guild_id, int(message_id)) for message_id in message_ids))
+        async with self._review_locks.hold_idle(keys) as held:
+            epoch = self._guild_epochs.get(guild_id, 0)
+            for key in held:
+                self._versions[key] = 0
+            try:
+                tx = ReviewTransaction(self, guild_id, None, epoch, [key[1] for key in held])
+                held_ids = set(tx.message_ids)
+                tx.busy = [key[1] for key in keys if key[1] not in held_ids]
+                yield tx
+                if not tx._ops:
+                    return
+                if any(target_id not in held_ids for _, target_id, _ in tx._ops):
+                    raise ValueError("store.reviews() can only change the reviews it holds")
+                tx.check()
+                ops = review_ops(tx)
+                self._record(transition_event(ops), ops)
+            finally:
+                for key in held:
+                    self._versions.pop(key, None)
+
+    @contextlib.asynccontextmanager
+    async def guild(self, guild_id):
+        """Transaction over a guild's channel configuration, serialized per guild."""
+        guild_id = int(guild_id)
+        async with self._guild_locks.hold(guild_id):
+            tx = GuildTransaction(self, guild_id)
+            yield tx
+            if tx._op and tx._op[0] == 'set':
+                self.set_guild(guild_id, *tx._op[1:])
+            elif tx._op:
+                self.delete_guild(guild_id)
+
+    # --- Guild configuration ---
+    # Guild rows are tiny and read on every message, so they are kept resident
+    # and written through. `watched_channel_ids` lets on_message drop anything
+    # outside the review channels with a single set lookup.
+
+    def reload_guilds(self):
+        self._guilds = {
+            row['guild_id']: {
+                'active_channel_id': row['active_channel_id'],
+                'reviewed_channel_id': row['reviewed_channel_id']
+            }
+            for row in self.conn.execute("SELECT guild_id, active_channel_id, reviewed_channel_id FROM guilds")
+        }
+        self._rebuild_watched_channels()
+
+    def guild_ids(self):
+        return list(self._guilds)
+
+    def get_guild(self, guild_id):
+        guild = self._guilds.get(int(guild_id))
+        return dict(guild) if guild else None
+
+    def set_guild(self, guild_id, active_channel_id, reviewed_channel_id):
+        self._record('guild_configured', [('set_guild', int(guild_id), active_channel_id, reviewed_channel_id)])
+
+    def delete_guild(self, guild_id):
+        self._record('guild_deleted', [('delete_guild', int(guild_id))])
+
+    def _rebuild_watched_channels(self):
+        self.watched_channel_ids = frozenset(
+            channel_id
+            for guild in self._guilds.values()
+            for channel_id in (guild['active_channel_id'], guild['reviewed_channel_id'])
+            if channel_id is not None
+        )
+
+    # --- Reviews ---
+
+    def get_review(self, guild_id, message_id):
+        key = (int(guild_id), int(message_id))
+        if key in self._pending:
+            review = self._pending[key][1]
+            return review.to_dict() if review else None
+        if key[0] in self._cleared_guilds:
+            return None
+        rows = self.conn.execute(
+            f"SELECT {', '.join(REVIEW_COLUMNS)} FROM reviews WHERE guild_id = ? AND message_id = ?",
+            key
+        ).fetchall()
+        if not rows:
+            return None
+        review = dict(rows[0])
+        review['role_ids'] = [
+            r[0] for r in self.conn.execute(
+                "SELECT role_id FROM review_roles WHERE guild_id = ? AND message_id = ? ORDER BY rowid",
+                key
+            )
+        ]
+        return review
+
+    def query_reviews(self, guild_id, status=None, author_id=None, role_id=None, before=None, after=None):
+        """Message IDs of a guild's reviews matching the filters, oldest first. See GuildReviewIndex.query."""
+        return self._guild_index(int(guild_id)).query(status, author_id, role_id, before, after)
+
+    def _guild_index(self, guild_id):
+        index = self._indexes.get(guild_id)
+        if index is not None:
+            return index
+        # Build from the snapshot once, then layer on changes not yet
+        # compacted; `_apply` keeps it current from here on.
+        index = GuildReviewIndex()
+        if guild_id not in self._cleared_guilds:
+            # Plain tuples: sqlite3.Row costs more than the indexing itself here.
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            role_ids = {}
+            for message_id, role_id in cursor.execute(
+                "SELECT message_id, role_id FROM review_roles WHERE guild_id = ? ORDER BY rowid", (guild_id,)
+            ):
+                role_ids.setdefault(message_id, []).append(role_id)
+            for message_id, author_id, status, timestamp in cursor.execute(
+                "SELECT message_id, author_id, status, timestamp FROM reviews WHERE guild_id = ?", (guild_id,)
+            ):
+                index.add(message_id, status, author_id, tuple(role_ids.get(message_id, ())),
+                          review_epoch({'timestamp': timestamp}))
+        for (pending_guild_id, message_id), (_, review) in self._pending.items():
+            if pending_guild_id == guild_id:
+                if review is None:
+                    index.remove(message_id)
+                else:
+                    index.put(message_id, review)
+        self._indexes[guild_id] = index
+        return index
+
+    def add_review(self, guild_id, message_id, review):
+        self._record('created', [('put_review', int(guild_id), int(message_id), dict(review))])
+
+    def move_review(self, guild_id, old_message_id, new_message_id, review):
+        """Re-key a review to the message it was re-posted as, as a single journal entry."""
+        ops = [
+            ('delete_review', int(guild_id), int(old_message_id)),
+            ('put_review', int(guild_id), int(new_message_id), dict(review))
+        ]
+        self._record(transition_event(ops), ops)
+
+    def delete_review(self, guild_id, message_id):
+        self._record('deleted', [('delete_review', int(guild_id), int(message_id))])
+
+    # --- Metadata ---
+    # Small bookkeeping values (e.g. reconciliation progress) kept in the
+    # `meta` table, written on the writer thread like everything else.
+
+    def get_meta(self, key, default=None):
+        rows = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchall()
+        if not rows:
+            return default
+        value = rows[0][0]
+        return json.loads(value) if isinstance(value, str) else value
+
+    async def set_meta(self, key, value):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._set_meta, key, json.dumps(value))
+
+    def set_meta_sync(self, key, value):
+        """set_meta() without an event loop (startup, scripts and tools)."""
+        self._executor.submit(self._set_meta, key, json.dumps(value)).result()
+
+    def _set_meta(self, key, value):
+        if self._writer_conn is None:
+            self._writer_conn = connect(self.path, synchronous='FULL')
+        self._writer_conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+
+def review_ops(tx):
+    """Journal ops for the changes staged on a ReviewTransaction."""
+    return [
+        ('put_review', tx.guild_id, target_id, dict(review)) if kind == 'put'
+        else ('delete_review', tx.guild_id, target_id)
+        for kind, target_id, review in tx._ops
+    ]
+
+
+def transition_event(ops):
+    """Name the review transition a list of ops represents, for the journal and audit trail."""
+    kinds = [op[0] for op in ops]
+    if set(kinds) == {'put_review'}:
+        return 'archived' if all(op[3]['status'] == 'archived' for op in ops) else 'created'
+    if set(kinds) == {'delete_review'}:
+        return 'deleted'
+    if kinds == ['delete_review', 'put_review']:
+        return 'reviewed' if ops[1][3]['status'] == 'reviewed' else 'moved_back'
+    return 'updated'
+
+
+def apply_ops(conn, ops):
+    for op in ops:
+        kind, args = op[0], op[1:]
+        if kind == 'set_guild':
+            upsert_guild(conn, *args)
+        elif kind == 'delete_guild':
+            conn.execute("DELETE FROM guilds WHERE guild_id = ?", args)
+        elif kind == 'put_review':
+            insert_review(conn, *args)
+        elif kind == 'delete_review':
+            conn.execute("DELETE FROM reviews WHERE guild_id = ? AND message_id = ?", args)
+
+
+def upsert_guild(conn, guild_id, active_channel_id, reviewed_channel_id):
+    conn.execute(
+        "INSERT INTO guilds (guild_id, active_channel_id, reviewed_channel_id) VALUES (?, ?, ?) "
+        "ON CONFLICT (guild_id) DO UPDATE SET "
+        "active_channel_id = excluded.active_channel_id, reviewed_channel_id = excluded.reviewed_channel_id",
+        (guild_id, active_channel_id, reviewed_channel_id)
+    )
+
+
+def insert_review(conn, guild_id, message_id, review):
+    # Delete first so the role rows of a replaced review are cascaded away.
+    conn.execute(
+        "DELETE FROM reviews WHERE guild_id = ? AND message_id = ?",
+        (guild_id, message_id)
+    )
+    # A review whose guild has since been deleted is dropped rather than
+    # failing the whole batch on the foreign key.
+    inserted = conn.execute(
+        f"INSERT INTO reviews (guild_id, message_id, {', '.join(REVIEW_COLUMNS)}) "
+        f"SELECT ?, ?, {', '.join('?' for _ in REVIEW_COLUMNS)} "
+        f"WHERE EXISTS (SELECT 1 FROM guilds WHERE guild_id = ?)",
+        (guild_id, message_id, *(review.get(column) for column in REVIEW_COLUMNS), guild_id)
+    ).rowcount
+    if inserted:
+        conn.executemany(
+            "INSERT OR IGNORE INTO review_roles (guild_id, message_id, role_id) VALUES (?, ?, ?)",
+            [(guild_id, message_id, role_id) for role_id in review.get('role_ids') or ()]
+        )
+
+
+def import_json(store, path=LEGACY_DATA_FILE, guild_filter=None):
+    """One-shot import of a reviews.json file (any schema version) into the store. Returns (guilds, reviews) counts.
+
+    The file is streamed a guild at a time and every review normalized to
+    the current schema on the way in (see review_migrate), so stored reviews
+    always have `role_ids` and every optional key. With `guild_filter`, only
+    guilds for which it returns True are imported.
+    """
+    guild_count = review_count = 0
+    conn = store.conn
+    conn.execute("BEGIN")
+    try:
+        for guild_id, guild_data, invalid in iter_normalized(path):
+            if guild_filter is not None and not guild_filter(int(guild_id)):
+                continue
+            upsert_guild(conn, int(guild_id), guild_data['active_channel_id'], guild_data['reviewed_channel_id'])
+            guild_count += 1
+            for message_id, review in guild_data['reviews'].items():
+                insert_review(conn, int(guild_id), int(message_id), review)
+                review_count += 1
+            for message_id in invalid:
+                print(f"Skipped unreadable review {message_id} in guild {guild_id} of {path}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    store.reload_guilds()
+    return guild_count, review_count
+
+
+def copy_guilds(store, source_path, guild_filter):
+    """Copy the guilds accepted by `guild_filter`, with their reviews, from another review database.
+
+    Used to split the single-process database into per-shard-group
+    partitions, and to re-split partitions for a new layout, so `store`
+    must be freshly created; several sources may be copied into it. The
+    source's journal is folded in first so nothing still pending there is
+    lost. Audit events are renumbered after the store's own, and the
+    store's sequence moved past them. Returns (guilds, reviews) counts.
+    """
+    ReviewStore(source_path).close_sync()
+    conn = store.conn
+    conn.create_function('owns_guild', 1, lambda guild_id: bool(guild_filter(guild_id)), deterministic=True)
+    conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+    try:
+        conn.execute("BEGIN")
+        try:
+            guild_count = conn.execute(
+                "INSERT INTO guilds (guild_id, active_channel_id, reviewed_channel_id) "
+                "SELECT guild_id, active_channel_id, reviewed_channel_id FROM source.guilds WHERE owns_guild(guild_id)"
+            ).rowcount
+            review_count = conn.execute(
+                f"INSERT INTO reviews (guild_id, message_id, {', '.join(REVIEW_COLUMNS)}) "
+                f"SELECT guild_id, message_id, {', '.join(REVIEW_COLUMNS)} FROM source.reviews WHERE owns_guild(guild_id)"
+            ).rowcount
+            conn.execute(
+                "INSERT INTO review_roles (guild_id, message_id, role_id) "
+                "SELECT guild_id, message_id, role_id FROM source.review_roles WHERE owns_guild(guild_id) ORDER BY rowid"
+            )
+            conn.execute(
+                "INSERT INTO review_events (at, event, guild_id, message_id, new_message_id) "
+                "SELECT at, event, guild_id, message_id, new_message_id FROM source.review_events "
+                "WHERE owns_guild(guild_id) ORDER BY seq"
+            )
+            # Journal entries are written to review_events under their own
+            # seq, so new ones must start after the copied events.
+            last_seq = conn.execute("SELECT MAX(seq) FROM review_events").fetchone()[0] or 0
+            if last_seq > store._seq:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('journal_seq', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    (last_seq,)
+                )
+                store._seq = last_seq
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.execute("DETACH DATABASE source")
+    store.reload_guilds()
+    return guild_count, review_count
+
+
+def open_store(path=DB_FILE, legacy_path=LEGACY_DATA_FILE, guild_filter=None, source_path=None, layout=None):
+    """Open the store, seeding it the first time the database is created.
+
+    A shard group's partition (`guild_filter` set) is seeded with its guilds
+    from the single-process database at `source_path` if there is one;
+    otherwise, and for the unsharded database, from the legacy JSON file.
+    A partition records the shard `layout` it was seeded for, and raises
+    PartitionLayoutError when opened for another one: its guilds would no
+    longer match the shards routed to it (launcher.py re-splits first).
+    """
+    is_new = not os.path.exists(path)
+    store = ReviewStore(path)
+    if not is_new:
+        stored_layout = store.get_meta(LAYOUT_KEY)
+        if layout is not None and stored_layout != layout:
+            store.close_sync()
+            raise PartitionLayoutError(
+                f"{path} was split for shard layout {stored_layout}, not {layout}; "
+                f"start through launcher.py so the partitions are re-split"
+            )
+        return store
+    if layout is not None:
+        store.set_meta_sync(LAYOUT_KEY, layout)
+    if guild_filter is not None and source_path and os.path.exists(source_path):
+        guilds, reviews = copy_guilds(store, source_path, guild_filter)
+        print(f"Copied {reviews} reviews across {guilds} guilds from {source_path} into {path}")
+    elif os.path.exists(legacy_path):
+        guilds, reviews = import_json(store, legacy_path, guild_filter)
+        print(f"Imported {reviews} reviews across {guilds} guilds from {legacy_path} into {path}")
+    return store
+
+
+async def setup(bot):
+    pass
+
+
+if __name__ == '__main__':
+    # Usage: python -m cogs.review_store [reviews.json] [reviews.db]
+    source = sys.argv[1] if len(sys.argv) > 1 else LEGACY_DATA_FILE
+    target = sys.argv[2] if len(sys.argv) > 2 else DB_FILE
+    store = ReviewStore(target)
+    try:
+        guilds, reviews = import_json(store, source)
+        print(f"Imported {reviews} reviews across {guilds} guilds from {source} into {target}")
+    finally:
+        store.close_sync()
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+
+SYNC_STATE_FILE = 'command_sync_state.json'
+
+
+def command_payload(command, tree):
+    # discord.py 2.4+ needs the tree to render a command; older versions take no argument.
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        return command.to_dict()
+
+
+def command_tree_hash(tree):
+    """Stable hash of the global command tree, as Discord would receive it on sync."""
+    payload = sorted(
+        (command_payload(command, tree) for command in tree.get_commands()),
+        key=lambda command: (command.get('type', 1), command['name'])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def load_sync_state(path=SYNC_STATE_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sync_state(state, path=SYNC_STATE_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+async def sync_commands(bot, force=False, path=SYNC_STATE_FILE):
+    """Sync the global command tree only if it changed since the last sync.
+
+    Returns (synced, digest). The hash of the last synced tree is kept in
+    SYNC_STATE_FILE, so restarts that don't touch any command skip the
+    rate-limited global sync entirely.
+    """
+    digest = command_tree_hash(bot.tree)
+    state = load_sync_state(path)
+    if not force and state.get('hash') == digest:
+        return False, digest
+    commands = await bot.tree.sync()
+    try:
+        save_sync_state({'hash': digest, 'commands': len(commands)}, path)
+    except OSError as e:
+        print(f"Error: Could not save {path}: {e}")
+    return True, digest
+
+
+async def setup(bot):
+    pass
@@ -1,8 +1,4 @@
 import re
-import json
-import os
-
-DATA_FILE = 'reviews.json'
 
 def is_valid_url(url):
     url_regex = re.compile(
@@ -17,19 +13,12 @@ def is_valid_url(url):
         return False
     return True
 
-def load_data():
-    try:
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
-
-def save_data(data):
-    try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except IOError:
-        print("Error: Could not save data to reviews.json")
+async def send_conflict_notice(interaction):
+    message = ":warning: **This task was changed by someone else at the same time. Please try again.**"
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True, delete_after=5)
 
 async def setup(bot):
     pass
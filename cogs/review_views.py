@@ -1,309 +1,506 @@
+import asyncio
 import discord
 from discord.ui import View, Select, Button
-from .review_utils import load_data, save_data, is_valid_url
+from .review_utils import is_valid_url, send_conflict_notice
+from .review_store import TransactionConflict
+from .review_roles import SESSION_TIMEOUT
+from .review_index import review_epoch
+from .review_dispatch import ROUTE_CREATE_DM, ROUTE_DELETE_MESSAGE, ROUTE_SEND_DM, ROUTE_SEND_MESSAGE
+from .review_metrics import timed
 from datetime import datetime, UTC
 
 class RoleSelectView(View):
-    def __init__(self, title, link, roles, selected_role_ids=None, page=0):
-        super().__init__(timeout=60)
-        self.title = title
-        self.link = link
-        self.roles = roles
-        self.selected_role_ids = selected_role_ids or []
-        self.page = page
-        self.total_pages = (len(roles) + 24) // 25
-        start = page * 25
-        end = start + 25
-        roles_page = roles[start:end]
-        self.add_item(RoleSelect(self.title, self.link, roles, roles_page, self.selected_role_ids, self.page))
-        if self.total_pages > 1:
-            if self.page > 0:
-                self.add_item(PrevPageButton(self.title, self.link, self.roles, self.selected_role_ids, self.page))
-            if end < len(roles):
-                self.add_item(NextPageButton(self.title, self.link, self.roles, self.selected_role_ids, self.page))
-        self.add_item(DoneSelectingRolesButton(self.title, self.link, self.roles, self.selected_role_ids))
+    """Role picker for a new review.
 
-class RoleSelect(Select):
-    def __init__(self, title, link, all_roles, roles_page, selected_role_ids, page):
-        self.title = title
-        self.link = link
-        self.all_roles = all_roles
-        self.roles_page = roles_page
-        self.selected_role_ids = selected_role_ids
-        self.page = page
-
-        def role_option(role):
-            if role.color.value == 0:
-                emoji = "⚪"
-            elif role.color.value < 0x555555:
-                emoji = "⚫"
-            elif role.color.value < 0xAA0000:
-                emoji = "🔴"
-            elif role.color.value < 0x00AA00:
-                emoji = "🟢"
-            elif role.color.value < 0x0000AA:
-                emoji = "🔵"
-            elif role.color.value < 0xAAAA00:
-                emoji = "🟡"
-            elif role.color.value < 0x00AAAA:
-                emoji = "🟦"
-            elif role.color.value < 0xAA00AA:
-                emoji = "🟣"
-            else:
-                emoji = "🟠"
-            return discord.SelectOption(
-                label=f"{emoji} {role.name}",
-                value=str(role.id),
-                default=(str(role.id) in selected_role_ids)
-            )
+    One view per picker, mutated in place: paging, filtering and selecting
+    only swap the select's options and re-send the same view. The selection
+    itself lives in a RolePickerSession on the bot, keyed by the interaction
+    that opened the picker.
+    """
+
+    def __init__(self, session_id, session):
+        super().__init__(timeout=SESSION_TIMEOUT)
+        self.session_id = session_id
+        self.session = session
+        self.role_select = RoleSelect()
+        self.prev_button = PrevPageButton()
+        self.next_button = NextPageButton()
+        self.add_item(self.role_select)
+        self.add_item(self.prev_button)
+        self.add_item(self.next_button)
+        self.add_item(FilterRolesButton())
+        self.add_item(DoneSelectingRolesButton())
+        self.refresh()
+
+    @classmethod
+    def start(cls, interaction: discord.Interaction, title, link):
+        session_id, session = interaction.client.role_index.open_session(interaction, title, link)
+        return cls(session_id, session)
+
+    def refresh(self):
+        session = self.session
+        entries = session.page_entries()
+        if entries:
+            self.role_select.options = [
+                discord.SelectOption(label=entry.label, value=str(entry.id), default=entry.id in session.selected)
+                for entry in entries
+            ]
+            self.role_select.max_values = len(entries)
+            self.role_select.disabled = False
+        else:
+            self.role_select.options = [discord.SelectOption(label="No roles match the filter", value="none")]
+            self.role_select.max_values = 1
+            self.role_select.disabled = True
+        self.role_select.placeholder = f"Select roles (page {session.page + 1}/{session.page_count})"
+        self.prev_button.disabled = session.page == 0
+        self.next_button.disabled = session.page >= session.page_count - 1
+
+    async def show(self, interaction: discord.Interaction):
+        self.refresh()
+        await interaction.response.edit_message(content=self.session.summary(), view=self)
+
+    async def on_timeout(self):
+        self.session.index.close_session(self.session_id)
 
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item):
+        if isinstance(error, TransactionConflict):
+            await send_conflict_notice(interaction)
+        else:
+            await super().on_error(interaction, error, item)
+
+class RoleSelect(Select):
+    def __init__(self):
         super().__init__(
-            placeholder=f"Select roles (page {page+1})",
+            placeholder="Select roles",
             min_values=0,
-            max_values=len(roles_page),
-            options=[role_option(role) for role in roles_page]
+            max_values=1,
+            options=[discord.SelectOption(label="Loading", value="none")]
         )
 
     async def callback(self, interaction: discord.Interaction):
-        if not self.values:
-            await interaction.response.defer()
-            return
-        new_selected = self.selected_role_ids + [role_id for role_id in self.values if role_id not in self.selected_role_ids]
-        await interaction.response.edit_message(
-            content=f"Roles selected: {len(new_selected)}. You can change page or finish selection.",
-            view=RoleSelectView(self.title, self.link, self.all_roles, new_selected, self.page)
-        )
+        self.view.session.select_on_page(self.values)
+        await self.view.show(interaction)
 
 class NextPageButton(Button):
-    def __init__(self, title, link, all_roles, selected_role_ids, page):
+    def __init__(self):
         super().__init__(
             label="Next Page",
             style=discord.ButtonStyle.primary,
             row=1
         )
-        self.title = title
-        self.link = link
-        self.all_roles = all_roles
-        self.selected_role_ids = selected_role_ids
-        self.page = page
 
     async def callback(self, interaction: discord.Interaction):
-        await interaction.response.edit_message(
-            content=f"Select more roles for this review (page {self.page+2}):",
-            view=RoleSelectView(self.title, self.link, self.all_roles, self.selected_role_ids, self.page + 1)
-        )
+        self.view.session.turn(1)
+        await self.view.show(interaction)
 
 class PrevPageButton(Button):
-    def __init__(self, title, link, all_roles, selected_role_ids, page):
+    def __init__(self):
         super().__init__(
             label="Previous Page",
             style=discord.ButtonStyle.secondary,
             row=1
         )
-        self.title = title
-        self.link = link
-        self.all_roles = all_roles
-        self.selected_role_ids = selected_role_ids
-        self.page = page
 
     async def callback(self, interaction: discord.Interaction):
-        await interaction.response.edit_message(
-            content=f"Select more roles for this review (page {self.page}):",
-            view=RoleSelectView(self.title, self.link, self.all_roles, self.selected_role_ids, self.page - 1)
+        self.view.session.turn(-1)
+        await self.view.show(interaction)
+
+class FilterRolesButton(Button):
+    def __init__(self):
+        super().__init__(
+            label="Filter",
+            emoji="🔎",
+            style=discord.ButtonStyle.secondary,
+            row=1
         )
 
+    async def callback(self, interaction: discord.Interaction):
+        from .review_modals import RoleFilterModal
+        await interaction.response.send_modal(RoleFilterModal(self.view))
+
 class DoneSelectingRolesButton(Button):
-    def __init__(self, title, link, all_roles, selected_role_ids):
+    def __init__(self):
         super().__init__(
             label="Done selecting roles",
-            style=discord.ButtonStyle.secondary,
+            style=discord.ButtonStyle.success,
             row=1
         )
-        self.title = title
-        self.link = link
-        self.all_roles = all_roles
-        self.selected_role_ids = selected_role_ids
 
+    @timed('role_picker_done')
     async def callback(self, interaction: discord.Interaction):
-        selected_roles = [interaction.guild.get_role(int(role_id)) for role_id in self.selected_role_ids]
+        session = self.view.session
+        selected_roles = [interaction.guild.get_role(role_id) for role_id in session.selected]
+        selected_roles = [role for role in selected_roles if role is not None]
+        session.index.close_session(self.view.session_id)
+        self.view.stop()
         from .review_commands import create_review_from_modal
+        # Acknowledged before the paced send, which can take longer than
+        # Discord's 3 second window during a burst.
+        await interaction.response.edit_message(content=":hourglass: **Submitting task...**", view=None)
         await create_review_from_modal(
-            interaction, self.title, selected_roles, self.link
-        )
-        await interaction.response.edit_message(
-            content=":white_check_mark: **Task submitted for review.**",
-            view=None, delete_after=0
+            interaction, session.title, selected_roles, session.link
         )
+        try:
+            await interaction.delete_original_response()
+        except discord.HTTPException:
+            pass
 
 class ActiveReviewView(View):
     def __init__(self):
         super().__init__(timeout=None)
 
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item):
+        if isinstance(error, TransactionConflict):
+            await send_conflict_notice(interaction)
+        else:
+            await super().on_error(interaction, error, item)
+
     @discord.ui.button(label="Mark as Reviewed", style=discord.ButtonStyle.green, custom_id="mark_reviewed")
+    @timed('mark_reviewed')
     async def mark_reviewed(self, interaction: discord.Interaction, button: discord.ui.Button):
         message_id = interaction.message.id
-        data = load_data()
+        store = interaction.client.store
+        rest = interaction.client.rest_scheduler
         guild_id = str(interaction.guild_id)
-        guild_data = data.get(guild_id, {})
-        review = guild_data.get('reviews', {}).get(str(message_id))
-        allowed_role_ids = set()
-        if review:
-            if 'role_ids' in review:
-                allowed_role_ids = set(review['role_ids'])
-            elif 'role_id' in review and review['role_id']:
-                allowed_role_ids = {review['role_id']}
-        else:
-            await interaction.message.delete()
-            await interaction.response.send_message(
-                ":warning: **Task not found.**", ephemeral=True, delete_after=5
-            )
-            return
-        is_author = review and review['author_id'] == interaction.user.id
-        has_role = any(role.id in allowed_role_ids for role in interaction.user.roles) if allowed_role_ids else False
-        if not (is_author or has_role):
-            await interaction.response.send_message(
-                ":no_entry: **Only the author or a user with the selected role(s) can mark this as reviewed.**",
-                ephemeral=True, delete_after=5
-            )
-            return
-        if review and review['status'] == 'active':
-            await interaction.message.delete()
-            embed = interaction.message.embeds[0]
-            embed.color = discord.Color.green()
-            embed.add_field(name="Reviewed by", value=f'<@{interaction.user.id}>', inline=False)
-            reviewed_channel_id = guild_data.get('reviewed_channel_id')
-            reviewed_channel = interaction.client.get_channel(reviewed_channel_id)
-            if reviewed_channel:
-                new_msg = await reviewed_channel.send(embed=embed, view=ReviewedTaskView())
-                del guild_data['reviews'][str(message_id)]
-                guild_data['reviews'][str(new_msg.id)] = {
-                    'title': review['title'],
-                    'role_ids': review.get('role_ids', []),
-                    'link': review.get('link'),
-                    'author_id': review['author_id'],
-                    'timestamp': review['timestamp'],
-                    'status': 'reviewed',
-                    'reviewed_by': interaction.user.id,
-                    'dm_message_id': None
-                }
-                author = interaction.client.get_user(review['author_id'])
-                if author:
-                    reviewer_mention = f"<@{interaction.user.id}>"
-                    dm_message = f"Your task '{review['title']}' has been reviewed by {reviewer_mention}. You can view it here: {new_msg.jump_url}"
-                    try:
-                        dm_msg = await author.send(dm_message)
-                        guild_data['reviews'][str(new_msg.id)]['dm_message_id'] = dm_msg.id
-                    except discord.Forbidden:
-                        pass
-                data[guild_id] = guild_data
-                save_data(data)
-            else:
-                print(f"Reviewed channel not found in guild {guild_id}")
-        await interaction.response.defer()
+        new_msg = None
+        try:
+            async with store.review(guild_id, message_id) as tx:
+                review = tx.review
+                if review:
+                    allowed_role_ids = set(review['role_ids'])
+                else:
+                    await interaction.message.delete()
+                    await interaction.response.send_message(
+                        ":warning: **Task not found.**", ephemeral=True, delete_after=5
+                    )
+                    return
+                is_author = review and review['author_id'] == interaction.user.id
+                has_role = any(role.id in allowed_role_ids for role in interaction.user.roles) if allowed_role_ids else False
+                if not (is_author or has_role):
+                    await interaction.response.send_message(
+                        ":no_entry: **Only the author or a user with the selected role(s) can mark this as reviewed.**",
+                        ephemeral=True, delete_after=5
+                    )
+                    return
+                if review and review['status'] == 'active':
+                    embed = interaction.message.embeds[0]
+                    embed.color = discord.Color.green()
+                    embed.add_field(name="Reviewed by", value=f'<@{interaction.user.id}>', inline=False)
+                    guild_data = tx.guild or {}
+                    reviewed_channel_id = guild_data.get('reviewed_channel_id')
+                    reviewed_channel = interaction.client.get_channel(reviewed_channel_id)
+                    if reviewed_channel:
+                        tx.check()
+                        # Acknowledging, removing the old message and posting the
+                        # new one are independent, so they share one round trip.
+                        _, _, new_msg = await asyncio.gather(
+                            interaction.response.defer(),
+                            rest.run(ROUTE_DELETE_MESSAGE, interaction.channel_id, interaction.message.delete),
+                            rest.run(ROUTE_SEND_MESSAGE, reviewed_channel.id,
+                                     lambda: reviewed_channel.send(embed=embed, view=ReviewedTaskView()))
+                        )
+                        tx.move(new_msg.id, {
+                            'title': review['title'],
+                            'role_ids': review['role_ids'],
+                            'link': review.get('link'),
+                            'author_id': review['author_id'],
+                            'timestamp': review['timestamp'],
+                            'status': 'reviewed',
+                            'reviewed_by': interaction.user.id,
+                            'dm_message_id': None,
+                            'dm_channel_id': None
+                        })
+                    else:
+                        # Leave the message and its record as they are until the channel is fixed.
+                        await interaction.response.send_message(
+                            ":warning: **Could not access the reviewed tasks channel.**\nPlease check bot permissions or run `/create`.",
+                            ephemeral=True, delete_after=5
+                        )
+                        return
+        except TransactionConflict:
+            # The old message is already gone (the prune its deletion
+            # triggers cleans up the record); drop the new one too.
+            if new_msg is not None:
+                rest.spawn(discard_message(rest, new_msg))
+            raise
+        if new_msg is not None:
+            rest.spawn(notify_author(interaction.client, guild_id, new_msg, review, interaction.user.id))
+        if not interaction.response.is_done():
+            await interaction.response.defer()
 
     @discord.ui.button(label="Delete", style=discord.ButtonStyle.red, custom_id="delete_active_task")
+    @timed('delete_active_task')
     async def delete_active_task(self, interaction: discord.Interaction, button: discord.ui.Button):
         message_id = interaction.message.id
-        data = load_data()
+        store = interaction.client.store
+        rest = interaction.client.rest_scheduler
         guild_id = str(interaction.guild_id)
-        guild_data = data.get(guild_id, {})
-        review = guild_data.get('reviews', {}).get(str(message_id))
-        if not review:
-            await interaction.message.delete()
-            await interaction.response.send_message(
-                ":warning: **Task not found.**", ephemeral=True, delete_after=5
-            )
-            return
-        if review['author_id'] != interaction.user.id:
-            await interaction.response.send_message(
-                ":no_entry: **Only the user who created this task can delete it.**",
-                ephemeral=True, delete_after=5
+        async with store.review(guild_id, message_id) as tx:
+            review = tx.review
+            if not review:
+                await interaction.message.delete()
+                await interaction.response.send_message(
+                    ":warning: **Task not found.**", ephemeral=True, delete_after=5
+                )
+                return
+            if review['author_id'] != interaction.user.id:
+                await interaction.response.send_message(
+                    ":no_entry: **Only the user who created this task can delete it.**",
+                    ephemeral=True, delete_after=5
+                )
+                return
+            tx.check()
+            await asyncio.gather(
+                rest.run(ROUTE_DELETE_MESSAGE, interaction.channel_id, interaction.message.delete),
+                interaction.response.send_message(
+                    ":wastebasket: **Your task has been deleted.**", ephemeral=True, delete_after=5
+                )
             )
-            return
-        await interaction.message.delete()
-        del guild_data['reviews'][str(message_id)]
-        data[guild_id] = guild_data
-        save_data(data)
-        await interaction.response.send_message(
-            ":wastebasket: **Your task has been deleted.**", ephemeral=True, delete_after=5
-        )
+            tx.delete()
 
 class ReviewedTaskView(View):
     def __init__(self):
         super().__init__(timeout=None)
 
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item):
+        if isinstance(error, TransactionConflict):
+            await send_conflict_notice(interaction)
+        else:
+            await super().on_error(interaction, error, item)
+
     @discord.ui.button(label="Move Back", style=discord.ButtonStyle.blurple, custom_id="move_back")
+    @timed('move_back')
     async def move_back(self, interaction: discord.Interaction, button: discord.ui.Button):
         message_id = interaction.message.id
-        data = load_data()
+        store = interaction.client.store
+        rest = interaction.client.rest_scheduler
         guild_id = str(interaction.guild_id)
-        guild_data = data.get(guild_id, {})
-        review = guild_data.get('reviews', {}).get(str(message_id))
-        if review and review['status'] == 'reviewed':
-            author = interaction.client.get_user(review['author_id'])
-            dm_message_id = review.get('dm_message_id')
-            if author and dm_message_id:
-                try:
-                    dm_channel = await author.create_dm()
-                    dm_message = await dm_channel.fetch_message(dm_message_id)
-                    await dm_message.delete()
-                except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                    pass
-            await interaction.message.delete()
-            embed = interaction.message.embeds[0]
-            for i, field in enumerate(embed.fields):
-                if field.name == "Reviewed by":
-                    embed.remove_field(i)
-                    break
-            embed.color = discord.Color.red()
-            if review.get('role_ids'):
-                roles = [interaction.guild.get_role(rid) for rid in review['role_ids']]
-                for i, field in enumerate(embed.fields):
-                    if field.name == "**Roles**":
-                        embed.remove_field(i)
-                        break
-                embed.add_field(name="**Roles**", value=" ".join(role.mention for role in roles if role), inline=False)
-            active_channel_id = guild_data.get('active_channel_id')
-            active_channel = interaction.client.get_channel(active_channel_id)
-            if active_channel:
-                new_msg = await active_channel.send(embed=embed, view=ActiveReviewView())
-                del guild_data['reviews'][str(message_id)]
-                guild_data['reviews'][str(new_msg.id)] = {
-                    'title': review['title'],
-                    'role_ids': review.get('role_ids', []),
-                    'link': review.get('link'),
-                    'author_id': review['author_id'],
-                    'timestamp': review['timestamp'],
-                    'status': 'active'
-                }
-                data[guild_id] = guild_data
-                save_data(data)
-            else:
-                print(f"Active channel not found in guild {guild_id}")
-        await interaction.response.defer()
+        new_msg = None
+        try:
+            async with store.review(guild_id, message_id) as tx:
+                review = tx.review
+                if review and review['status'] == 'reviewed':
+                    embed = interaction.message.embeds[0]
+                    for i, field in enumerate(embed.fields):
+                        if field.name == "Reviewed by":
+                            embed.remove_field(i)
+                            break
+                    embed.color = discord.Color.red()
+                    if review['role_ids']:
+                        roles = [interaction.guild.get_role(rid) for rid in review['role_ids']]
+                        for i, field in enumerate(embed.fields):
+                            if field.name == "**Roles**":
+                                embed.remove_field(i)
+                                break
+                        embed.add_field(name="**Roles**", value=" ".join(role.mention for role in roles if role), inline=False)
+                    guild_data = tx.guild or {}
+                    active_channel_id = guild_data.get('active_channel_id')
+                    active_channel = interaction.client.get_channel(active_channel_id)
+                    if active_channel:
+                        tx.check()
+                        _, _, new_msg = await asyncio.gather(
+                            interaction.response.defer(),
+                            rest.run(ROUTE_DELETE_MESSAGE, interaction.channel_id, interaction.message.delete),
+                            rest.run(ROUTE_SEND_MESSAGE, active_channel.id,
+                                     lambda: active_channel.send(embed=embed, view=ActiveReviewView()))
+                        )
+                        tx.move(new_msg.id, {
+                            'title': review['title'],
+                            'role_ids': review['role_ids'],
+                            'link': review.get('link'),
+                            'author_id': review['author_id'],
+                            'timestamp': review['timestamp'],
+                            'status': 'active'
+                        })
+                    else:
+                        # Leave the message and its record as they are until the channel is fixed.
+                        await interaction.response.send_message(
+                            ":warning: **Could not access the active review channel.**\nPlease check bot permissions or run `/create`.",
+                            ephemeral=True, delete_after=5
+                        )
+                        return
+        except TransactionConflict:
+            # The old message is already gone (the prune its deletion
+            # triggers cleans up the record); drop the new one too.
+            if new_msg is not None:
+                rest.spawn(discard_message(rest, new_msg))
+            raise
+        if new_msg is not None:
+            # Only once the move has committed; nothing waits on the DM.
+            rest.spawn(delete_dm_notification(interaction.client, review))
+        if not interaction.response.is_done():
+            await interaction.response.defer()
 
     @discord.ui.button(label="Delete", style=discord.ButtonStyle.red, custom_id="delete_task")
+    @timed('delete_task')
     async def delete_task(self, interaction: discord.Interaction, button: discord.ui.Button):
         message_id = interaction.message.id
-        data = load_data()
+        store = interaction.client.store
+        rest = interaction.client.rest_scheduler
         guild_id = str(interaction.guild_id)
-        guild_data = data.get(guild_id, {})
-        review = guild_data.get('reviews', {}).get(str(message_id))
+        async with store.review(guild_id, message_id) as tx:
+            review = tx.review
+            if review and review['status'] == 'reviewed':
+                tx.check()
+                await asyncio.gather(
+                    interaction.response.defer(),
+                    rest.run(ROUTE_DELETE_MESSAGE, interaction.channel_id, interaction.message.delete)
+                )
+                tx.delete()
         if review and review['status'] == 'reviewed':
-            author = interaction.client.get_user(review['author_id'])
-            dm_message_id = review.get('dm_message_id')
-            if author and dm_message_id:
-                try:
-                    dm_channel = await author.create_dm()
-                    dm_message = await dm_channel.fetch_message(dm_message_id)
-                    await dm_message.delete()
-                except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                    pass
-            await interaction.message.delete()
-            del guild_data['reviews'][str(message_id)]
-            data[guild_id] = guild_data
-            save_data(data)
+            rest.spawn(delete_dm_notification(interaction.client, review))
+        if not interaction.response.is_done():
+            await interaction.response.defer()
+
+async def notify_author(client, guild_id, message, review, reviewer_id):
+    """DM the author that their task was reviewed, then record the DM on the review."""
+    author_id = review['author_id']
+    reviewer_mention = f"<@{reviewer_id}>"
+    dm_message = f"Your task '{review['title']}' has been reviewed by {reviewer_mention}. You can view it here: {message.jump_url}"
+    dm_channel_id = client.dm_channels.get(author_id)
+    if dm_channel_id:
+        dm_channel = client.get_partial_messageable(dm_channel_id, type=discord.ChannelType.private)
+        send = lambda: dm_channel.send(dm_message)
+    else:
+        author = client.get_user(author_id)
+        if not author:
+            return
+        send = lambda: author.send(dm_message)
+    try:
+        dm_msg = await client.rest_scheduler.run(ROUTE_SEND_DM, author_id, send)
+    except discord.Forbidden:
+        return
+    client.dm_channels.put(author_id, dm_msg.channel.id)
+    try:
+        async with client.store.review(guild_id, message.id) as tx:
+            if tx.review and tx.review['status'] == 'reviewed':
+                tx.put(message.id, dict(tx.review, dm_message_id=dm_msg.id, dm_channel_id=dm_msg.channel.id))
+                return
+    except TransactionConflict:
+        pass
+    # The task was moved back or deleted while the DM was in flight.
+    try:
+        await dm_msg.delete()
+    except discord.HTTPException:
+        pass
+
+async def discard_message(rest, message):
+    """Delete a message posted by a handler whose transaction then failed, so no message is left without a record."""
+    try:
+        await rest.run(ROUTE_DELETE_MESSAGE, message.channel.id, message.delete)
+    except discord.HTTPException:
+        pass
+
+async def delete_dm_notification(client, review):
+    """Remove the "your task has been reviewed" DM sent when the review was marked as reviewed.
+
+    With the DM channel known (stored on the review, or cached for the
+    author) this is a single DELETE on a partial message, with no fetch.
+    """
+    dm_message_id = review.get('dm_message_id')
+    if not dm_message_id:
+        return
+    rest = client.rest_scheduler
+    author_id = review['author_id']
+    dm_channel_id = review.get('dm_channel_id') or client.dm_channels.get(author_id)
+    try:
+        if not dm_channel_id:
+            # Reviews marked before the channel was stored alongside the message.
+            author = client.get_user(author_id)
+            if not author:
+                return
+            dm_channel = await rest.run(ROUTE_CREATE_DM, author_id, author.create_dm)
+            dm_channel_id = dm_channel.id
+            client.dm_channels.put(author_id, dm_channel_id)
+        dm_message = client.get_partial_messageable(
+            dm_channel_id, type=discord.ChannelType.private
+        ).get_partial_message(dm_message_id)
+        await rest.run(ROUTE_DELETE_MESSAGE, dm_channel_id, dm_message.delete)
+    except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+        pass
+
+class ReviewListView(View):
+    """Pages through the message IDs matched by `/reviews`, loading only the rows on screen."""
+    PAGE_SIZE = 10
+
+    def __init__(self, guild_id, message_ids, heading):
+        super().__init__(timeout=300)
+        self.guild_id = int(guild_id)
+        self.message_ids = message_ids
+        self.heading = heading
+        self.page = 0
+        self.page_count = max(1, (len(message_ids) + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+    def build_embed(self, client):
+        store = client.store
+        guild_data = store.get_guild(self.guild_id) or {}
+        start = self.page * self.PAGE_SIZE
+        lines = []
+        for position, message_id in enumerate(self.message_ids[start:start + self.PAGE_SIZE], start + 1):
+            review = store.get_review(self.guild_id, message_id)
+            if not review:
+                lines.append(f"**{position}.** *Removed since this list was made.*")
+                continue
+            if review['status'] == 'archived':
+                line = f"**{position}.** {review['title']} *(archived)*"
+            else:
+                channel_id = guild_data.get('active_channel_id' if review['status'] == 'active' else 'reviewed_channel_id')
+                line = f"**{position}.** [{review['title']}](https://discord.com/channels/{self.guild_id}/{channel_id}/{message_id})"
+            line += f" — <@{review['author_id']}>"
+            if review['role_ids']:
+                line += " · " + " ".join(f"<@&{role_id}>" for role_id in review['role_ids'])
+            line += f" · <t:{int(review_epoch(review))}:R>"
+            lines.append(line)
+        embed = discord.Embed(
+            title=f"📋 **{self.heading}**",
+            description="\n".join(lines) or "No reviews match these filters.",
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text=f"{len(self.message_ids)} reviews · page {self.page + 1}/{self.page_count}")
+        return embed
+
+    async def show(self, interaction: discord.Interaction):
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(interaction.client), view=self)
+
+    @discord.ui.button(label="Previous Page", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await self.show(interaction)
+
+    @discord.ui.button(label="Next Page", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(self.page_count - 1, self.page + 1)
+        await self.show(interaction)
+
+class ConfirmView(View):
+    """Confirm and Cancel buttons for one user; `confirmed` is True, False, or None if it timed out."""
+
+    def __init__(self, user_id, label, timeout=60):
+        super().__init__(timeout=timeout)
+        self.user_id = user_id
+        self.confirmed = None
+        self.confirm.label = label
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.user_id
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = True
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = False
         await interaction.response.defer()
+        self.stop()
 
 class CreateReviewButtonView(View):
     def __init__(self):
@@ -314,5 +511,11 @@ class CreateReviewButtonView(View):
         from .review_modals import CreateReviewModal
         await interaction.response.send_modal(CreateReviewModal())
 
+def register_persistent_views(bot):
+    """Route button clicks on existing review messages to this module's views (again, after a reload)."""
+    bot.add_view(ActiveReviewView())
+    bot.add_view(ReviewedTaskView())
+    bot.add_view(CreateReviewButtonView())
+
 async def setup(bot):
     pass
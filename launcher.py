@@ -0,0 +1,186 @@
+"""Runs the bot as several shard-group processes.
+
+Each group is a separate `reviewer.py` process running an AutoShardedBot
+over a contiguous range of shards, with its own review database
+(`reviews.g<group>.db`) holding only the guilds routed to those shards.
+Relaunching with a different shard or group count re-splits the existing
+partitions for the new layout before any group starts.
+
+Usage:
+    python launcher.py --shards 8 --groups 4
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+from cogs.review_shards import ShardConfig, partition_path, split_shards
+from cogs.review_store import DB_FILE, LAYOUT_KEY, ReviewStore, copy_guilds, open_store
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Discord allows one IDENTIFY per 5 seconds (per max_concurrency bucket), so
+# each group waits for the shards of the groups started before it.
+IDENTIFY_INTERVAL = 5.0
+# A group that exits on its own is started again after this many seconds.
+RESTART_DELAY = 10.0
+
+
+def group_env(group, shard_count, shard_ids):
+    env = dict(os.environ)
+    env['REVIEWER_SHARD_GROUP'] = str(group)
+    env['REVIEWER_SHARD_COUNT'] = str(shard_count)
+    env['REVIEWER_SHARD_IDS'] = ','.join(str(shard_id) for shard_id in shard_ids)
+    return env
+
+
+PARTITION_PATTERN = re.compile(r'reviews\.g(\d+)\.db')
+
+
+def existing_partitions():
+    """{group: path} of the partition files in the working directory."""
+    partitions = {}
+    for name in os.listdir('.'):
+        match = PARTITION_PATTERN.fullmatch(name)
+        if match:
+            partitions[int(match.group(1))] = name
+    return partitions
+
+
+def partition_layout(path):
+    """The shard layout stored in a partition, or None (partitions made before layouts were recorded)."""
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (LAYOUT_KEY,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row else None
+
+
+def remove_database(path):
+    journal = f"{os.path.splitext(path)[0]}.journal"
+    for name in (path, f"{path}-wal", f"{path}-shm", journal):
+        if os.path.exists(name):
+            os.unlink(name)
+
+
+def resplit_partitions(partitions, configs):
+    """Redistribute the guilds of every existing partition over the groups in `configs`.
+
+    The new partitions are built beside the old ones and swapped in only
+    once all of them are complete; each old file is kept as `<name>.bak`.
+    """
+    print(f"Shard layout changed; re-splitting {len(partitions)} partitions into {len(configs)}")
+    sources = [partitions[group] for group in sorted(partitions)]
+    staged = []
+    for config in configs:
+        staging = f"reviews.g{config.group}.resplit.db"
+        remove_database(staging)
+        store = ReviewStore(staging)
+        guilds = reviews = 0
+        for source in sources:
+            copied = copy_guilds(store, source, config.owns_guild)
+            guilds += copied[0]
+            reviews += copied[1]
+        store.set_meta_sync(LAYOUT_KEY, config.layout())
+        store.close_sync()
+        store.conn.close()
+        staged.append((staging, partition_path(config.group)))
+        print(f"Group {config.group}: {reviews} reviews across {guilds} guilds")
+    for source in sources:
+        # A backup through SQLite, so changes still in the WAL are included.
+        src, backup = sqlite3.connect(source), sqlite3.connect(f"{source}.bak")
+        try:
+            src.backup(backup)
+        finally:
+            src.close()
+            backup.close()
+        remove_database(source)
+    for staging, path in staged:
+        os.replace(staging, path)
+        remove_database(staging)
+
+
+def prepare_partitions(shard_count, groups):
+    """Create every group's database up front, so the groups never touch the shared file concurrently.
+
+    Partitions split for another layout (a different --shards or --groups)
+    are re-split first, so every guild's data lands in the group its
+    events are routed to.
+    """
+    configs = [ShardConfig(group, shard_count, shard_ids) for group, shard_ids in enumerate(groups)]
+    partitions = existing_partitions()
+    if partitions and (set(partitions) - {config.group for config in configs} or any(
+            partition_layout(partitions[config.group]) != config.layout()
+            for config in configs if config.group in partitions)):
+        resplit_partitions(partitions, configs)
+    for config in configs:
+        if not os.path.exists(partition_path(config.group)):
+            open_store(partition_path(config.group), guild_filter=config.owns_guild, source_path=DB_FILE,
+                       layout=config.layout()).close_sync()
+
+
+def start_group(group, shard_count, shard_ids):
+    print(f"Starting shard group {group} (shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count})")
+    return subprocess.Popen([sys.executable, os.path.join(APP_DIR, 'reviewer.py')],
+                            cwd=APP_DIR, env=group_env(group, shard_count, shard_ids))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the review bot as multiple shard-group processes.")
+    parser.add_argument('--shards', type=int, required=True, help="total shard count")
+    parser.add_argument('--groups', type=int, default=None, help="number of processes (default: one per shard)")
+    args = parser.parse_args(argv)
+    group_count = min(args.groups or args.shards, args.shards)
+    groups = split_shards(args.shards, group_count)
+
+    os.chdir(APP_DIR)
+    prepare_partitions(args.shards, groups)
+
+    processes = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for group, shard_ids in enumerate(groups):
+        if stopping:
+            break
+        processes[group] = start_group(group, args.shards, shard_ids)
+        time.sleep(IDENTIFY_INTERVAL * len(shard_ids))
+
+    restart_at = {}
+    while not stopping:
+        for group, process in list(processes.items()):
+            if process.poll() is None:
+                continue
+            if group not in restart_at:
+                print(f"Shard group {group} exited with code {process.returncode}; restarting in {RESTART_DELAY:.0f}s")
+                restart_at[group] = time.monotonic() + RESTART_DELAY
+            elif time.monotonic() >= restart_at[group]:
+                del restart_at[group]
+                processes[group] = start_group(group, args.shards, groups[group])
+        time.sleep(1)
+
+    for process in processes.values():
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+if __name__ == '__main__':
+    main()
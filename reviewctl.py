@@ -0,0 +1,327 @@
+"""Bulk export and import of review data, streamed.
+
+Copies guilds and reviews between a review database (`reviews.db`), a
+legacy or migrated `reviews.json`, and NDJSON files. An NDJSON file has one
+record per line: a `{"type": "guild", ...}` line with each guild's channel
+configuration, followed by that guild's `{"type": "review", "guild_id": ...,
+"message_id": ..., ...}` lines. Memory stays flat whatever the input size.
+Stop the bot before importing into its database.
+
+Progress is checkpointed to `<output>.checkpoint` after every batch; an
+interrupted run continues where it stopped with `--resume`.
+
+Usage:
+    python reviewctl.py export reviews.db reviews.ndjson --status active --since 2024-01-01
+    python reviewctl.py export reviews.json backup.db --guild 123456789012345678
+    python reviewctl.py import reviews.ndjson reviews.db --resume
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, UTC
+
+from cogs.review_migrate import iter_normalized
+from cogs.review_record import Review, timestamp_to_micros
+from cogs.review_store import DB_FILE, REVIEW_COLUMNS, ReviewStore, connect, insert_review, upsert_guild
+
+BATCH_SIZE = 5000
+PROGRESS_INTERVAL = 5.0
+
+
+def file_format(path, override=None):
+    if override:
+        return override
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return 'sqlite'
+    if extension == '.json':
+        return 'json'
+    raise SystemExit(f"Can't tell the format of {path} from its extension; pass --format or --source-format")
+
+
+def parse_date(text):
+    """YYYY-MM-DD or a full ISO timestamp (UTC if no offset) -> epoch microseconds."""
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return timestamp_to_micros(moment.isoformat())
+
+
+class ReviewFilter:
+    def __init__(self, guild_ids=None, status=None, since=None, until=None):
+        self.guild_ids = {int(guild_id) for guild_id in guild_ids} if guild_ids else None
+        self.status = status
+        self.since = since
+        self.until = until
+
+    def guild(self, guild_id):
+        return self.guild_ids is None or int(guild_id) in self.guild_ids
+
+    def review(self, review):
+        if self.status and review['status'] != self.status:
+            return False
+        if self.since is not None or self.until is not None:
+            created = timestamp_to_micros(review.get('timestamp'))
+            if self.since is not None and created < self.since:
+                return False
+            if self.until is not None and created >= self.until:
+                return False
+        return True
+
+
+# --- Sources ---
+# Each yields (position, record): `position` is what a checkpoint stores to
+# resume right after `record`, and is passed back as `resume`.
+
+def guild_record(guild_id, active_channel_id, reviewed_channel_id):
+    return {'type': 'guild', 'guild_id': int(guild_id),
+            'active_channel_id': active_channel_id, 'reviewed_channel_id': reviewed_channel_id}
+
+
+def review_record(guild_id, message_id, review):
+    return dict(review, type='review', guild_id=int(guild_id), message_id=int(message_id))
+
+
+def iter_sqlite(path, review_filter, resume=None):
+    """Reviews in (guild_id, message_id) order straight from the snapshot, read-only."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    journal = f"{os.path.splitext(path)[0]}.journal"
+    if os.path.exists(journal) and os.path.getsize(journal):
+        print(f"Warning: {journal} holds changes not yet compacted into {path}; they are not included "
+              f"(stop the bot so it compacts on exit).", file=sys.stderr)
+    after_guild, after_message = resume or (None, None)
+    try:
+        guilds = conn.execute(
+            "SELECT guild_id, active_channel_id, reviewed_channel_id FROM guilds "
+            "WHERE guild_id >= ? ORDER BY guild_id", (after_guild or 0,)
+        ).fetchall()
+        for guild_id, active_channel_id, reviewed_channel_id in guilds:
+            if not review_filter.guild(guild_id):
+                continue
+            resuming = guild_id == after_guild
+            if not resuming:
+                yield (guild_id, 0), guild_record(guild_id, active_channel_id, reviewed_channel_id)
+            cursor = conn.execute(
+                f"SELECT message_id, {', '.join(REVIEW_COLUMNS)}, "
+                f"(SELECT group_concat(role_id) FROM (SELECT role_id FROM review_roles rr "
+                f" WHERE rr.guild_id = r.guild_id AND rr.message_id = r.message_id ORDER BY rr.rowid)) "
+                f"FROM reviews r WHERE guild_id = ? AND message_id > ? ORDER BY message_id",
+                (guild_id, after_message if resuming else 0)
+            )
+            for row in cursor:
+                review = dict(zip(REVIEW_COLUMNS, row[1:-1]))
+                review['role_ids'] = [int(role_id) for role_id in row[-1].split(',')] if row[-1] else []
+                if review_filter.review(review):
+                    yield (guild_id, row[0]), review_record(guild_id, row[0], review)
+    finally:
+        conn.close()
+
+
+def iter_json(path, review_filter, resume=None):
+    """Reviews of a reviews.json (any schema version) in file order; positions count records."""
+    skip = resume or 0
+    position = 0
+    for guild_id, guild_data, invalid in iter_normalized(path):
+        if not review_filter.guild(guild_id):
+            continue
+        for message_id in invalid:
+            print(f"Skipped unreadable review {message_id} in guild {guild_id} of {path}", file=sys.stderr)
+        records = [guild_record(guild_id, guild_data['active_channel_id'], guild_data['reviewed_channel_id'])]
+        records += [review_record(guild_id, message_id, review)
+                    for message_id, review in guild_data['reviews'].items() if review_filter.review(review)]
+        for record in records:
+            position += 1
+            if position > skip:
+                yield position, record
+
+
+def iter_ndjson(path, review_filter, resume=None):
+    """Records of an NDJSON file; positions are byte offsets."""
+    with open(path, 'rb') as f:
+        f.seek(resume or 0)
+        position = resume or 0
+        for line in f:
+            position += len(line)
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not review_filter.guild(record['guild_id']):
+                continue
+            if record.get('type') == 'review' and not review_filter.review(record):
+                continue
+            yield position, record
+
+
+SOURCES = {'sqlite': iter_sqlite, 'json': iter_json, 'ndjson': iter_ndjson}
+
+
+# --- Sinks ---
+
+class NdjsonSink:
+    def __init__(self, path, resume_bytes=None):
+        self.f = open(path, 'ab' if resume_bytes is not None else 'wb')
+        if resume_bytes is not None:
+            # Drop anything written after the last checkpoint.
+            self.f.truncate(resume_bytes)
+            self.f.seek(resume_bytes)
+
+    def write(self, record):
+        self.f.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+        return True
+
+    def commit(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+
+
+class SqliteSink:
+    """Writes into a review database, one transaction per batch. Re-running a batch is harmless."""
+
+    def __init__(self, path, resume_bytes=None):
+        # Creates the schema, and folds in any journal so its entries can't
+        # later be replayed over the imported rows.
+        ReviewStore(path).close_sync()
+        self.conn = connect(path, synchronous='FULL')
+        self.conn.execute("BEGIN")
+
+    def write(self, record):
+        if record['type'] == 'guild':
+            upsert_guild(self.conn, record['guild_id'], record['active_channel_id'], record['reviewed_channel_id'])
+            return True
+        try:
+            review = Review.from_dict(record).to_dict()
+        except (KeyError, TypeError, ValueError):
+            print(f"Skipped unreadable review {record.get('message_id')} in guild {record['guild_id']}",
+                  file=sys.stderr)
+            return False
+        # A review whose guild line was filtered out or missing still needs its guild row.
+        self.conn.execute("INSERT OR IGNORE INTO guilds (guild_id) VALUES (?)", (record['guild_id'],))
+        insert_review(self.conn, record['guild_id'], record['message_id'], review)
+        return True
+
+    def commit(self):
+        self.conn.execute("COMMIT")
+        self.conn.execute("BEGIN")
+        return None
+
+    def close(self):
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self.conn.close()
+
+
+SINKS = {'sqlite': SqliteSink, 'ndjson': NdjsonSink}
+
+
+# --- Checkpoints ---
+
+def checkpoint_path(output):
+    return f"{output}.checkpoint"
+
+
+def load_checkpoint(output, source):
+    try:
+        with open(checkpoint_path(output), 'r') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    if checkpoint.get('source') != os.path.abspath(source):
+        raise SystemExit(f"{checkpoint_path(output)} belongs to a copy from {checkpoint.get('source')}")
+    return checkpoint
+
+
+def save_checkpoint(output, checkpoint):
+    tmp_path = f"{checkpoint_path(output)}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path(output))
+
+
+# --- Copy ---
+
+def copy(source, output, review_filter, source_format=None, output_format=None, resume=False,
+         batch_size=BATCH_SIZE, out=sys.stderr):
+    """Stream records from `source` into `output`. Returns (total rows, rows this run, seconds)."""
+    source_format = file_format(source, source_format)
+    output_format = file_format(output, output_format)
+    if output_format not in SINKS:
+        raise SystemExit(f"Can't write {output_format} output; use .ndjson or .db")
+    checkpoint = load_checkpoint(output, source) if resume else None
+    if not resume and os.path.exists(checkpoint_path(output)):
+        os.unlink(checkpoint_path(output))
+    position = checkpoint['position'] if checkpoint else None
+    rows = checkpoint['rows'] if checkpoint else 0
+    if checkpoint:
+        print(f"Resuming after {rows} rows", file=out)
+
+    sink = SINKS[output_format](output, checkpoint['output_bytes'] if checkpoint else None)
+    start = last_report = time.perf_counter()
+    copied = pending = 0
+    try:
+        for position, record in SOURCES[source_format](source, review_filter, position):
+            written = sink.write(record)
+            pending += 1
+            if written and record['type'] == 'review':
+                copied += 1
+            if pending >= batch_size:
+                output_bytes = sink.commit()
+                save_checkpoint(output, {'source': os.path.abspath(source), 'position': position,
+                                         'rows': rows + copied, 'output_bytes': output_bytes})
+                pending = 0
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    print(f"{rows + copied} rows, {copied / (now - start):.0f} rows/s", file=out)
+                    last_report = now
+        sink.commit()
+    finally:
+        sink.close()
+    if os.path.exists(checkpoint_path(output)):
+        os.unlink(checkpoint_path(output))
+    return rows + copied, copied, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and import review data as NDJSON or SQLite.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help_text, default_source, default_output in (
+        ('export', "copy reviews out of the bot's database (or a reviews.json)", DB_FILE, None),
+        ('import', "copy reviews from an export into the bot's database", None, DB_FILE),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        if default_source:
+            command.add_argument('source', nargs='?', default=default_source)
+            command.add_argument('output')
+        else:
+            command.add_argument('source')
+            command.add_argument('output', nargs='?', default=default_output)
+        command.add_argument('--format', choices=sorted(SINKS), help="output format (default: from the extension)")
+        command.add_argument('--source-format', choices=sorted(SOURCES), help="input format (default: from the extension)")
+        command.add_argument('--guild', action='append', type=int, help="only this guild (repeatable)")
+        command.add_argument('--status', choices=['active', 'reviewed', 'archived'])
+        command.add_argument('--since', type=parse_date, help="only reviews created at or after this date")
+        command.add_argument('--until', type=parse_date, help="only reviews created before this date")
+        command.add_argument('--resume', action='store_true', help="continue an interrupted run from its checkpoint")
+        command.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    review_filter = ReviewFilter(args.guild, args.status, args.since, args.until)
+    rows, copied, seconds = copy(args.source, args.output, review_filter, args.source_format, args.format,
+                                 args.resume, args.batch_size)
+    rate = copied / seconds if seconds else 0.0
+    print(f"{args.command.capitalize()}ed {rows} reviews from {args.source} to {args.output} "
+          f"in {seconds:.1f}s ({rate:.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
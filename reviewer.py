@@ -1,16 +1,20 @@
 import discord
 from discord.ext import commands
-import os
-import json
 import asyncio
+import itertools
+import signal
 from datetime import datetime, UTC
-
-DATA_FILE = 'reviews.json'
-
-def ensure_data_file():
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'w') as f:
-            json.dump({}, f, indent=4)
+from cogs.review_store import DB_FILE, PartitionLayoutError, open_store
+from cogs.review_dispatch import DMChannelCache, RateLimitScheduler
+from cogs.review_roles import RoleIndex
+from cogs.review_reconcile import RECONCILE_INTERVAL, Reconciler
+from cogs.review_sync import sync_commands
+from cogs.review_shards import STATUS_INTERVAL, ShardConfig, partition_path, publish_status
+from cogs.review_ipc import ControlServer, socket_path
+from cogs.review_metrics import Metrics, metrics_port
+from cogs.review_profiler import Profiler
+from cogs.review_scheduler import Scheduler
+from cogs.review_reminders import Reminders
 
 # --- Read secrets.txt for owner id ---
 OWNER_ID = None
@@ -31,35 +35,64 @@ intents.message_content = True
 intents.members = True
 intents.reactions = True
 
-bot = commands.Bot(command_prefix='/', intents=intents, help_command=None, owner_id=OWNER_ID)
+# Set by launcher.py when running as one of several shard-group processes.
+SHARD_CONFIG = ShardConfig.from_env()
+
+if SHARD_CONFIG:
+    bot = commands.AutoShardedBot(
+        command_prefix='/', intents=intents, help_command=None, owner_id=OWNER_ID,
+        shard_count=SHARD_CONFIG.shard_count, shard_ids=SHARD_CONFIG.shard_ids
+    )
+else:
+    bot = commands.Bot(command_prefix='/', intents=intents, help_command=None, owner_id=OWNER_ID)
+bot.shard_config = SHARD_CONFIG
 bot.start_time = None
+bot.store = None
+bot.rest_scheduler = RateLimitScheduler()
+bot.role_index = RoleIndex()
+bot.dm_channels = DMChannelCache()
+bot.reconciler = Reconciler(bot)
+bot.control = None
+bot.metrics = Metrics()
+bot.profiler = Profiler()
+bot.scheduler = Scheduler()
+bot.reminders = Reminders(bot)
+
+STATUSES = [
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Tracking active reviews 📋"),
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Organizing tasks 🗂️"),
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Ready for your reviews! 🚀"),
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Helping you manage reviews! 🤖"),
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Making reviews easier! 🎉"),
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Your review assistant! 🤝"),
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Keeping track of tasks! 📊"),
+    discord.CustomActivity(type=discord.ActivityType.custom, name="Reviewing with you! 🔍"),
+]
+PRESENCE_INTERVAL = 300
+_presence_cycle = itertools.cycle(STATUSES)
+
+async def rotate_presence():
+    await bot.wait_until_ready()
+    await bot.change_presence(activity=next(_presence_cycle))
 
 @bot.event
 async def on_ready():
     bot.start_time = datetime.now(UTC)
     print(f'Logged in as {bot.user}')
-    await bot.tree.sync()
-    print("Slash commands synced.")
+    # Commands are global, so only the first shard group syncs them.
+    if not SHARD_CONFIG or SHARD_CONFIG.group == 0:
+        synced, digest = await sync_commands(bot)
+        if synced:
+            print(f"Slash commands synced ({digest[:12]}).")
+        else:
+            print(f"Slash commands unchanged ({digest[:12]}), skipping sync.")
 
-    from cogs.review_views import ActiveReviewView, ReviewedTaskView, CreateReviewButtonView
-    bot.add_view(ActiveReviewView())
-    bot.add_view(ReviewedTaskView())
-    bot.add_view(CreateReviewButtonView())
-
-    statuses = [
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Tracking active reviews 📋"),
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Organizing tasks 🗂️"),
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Ready for your reviews! 🚀"),
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Helping you manage reviews! 🤖"),
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Making reviews easier! 🎉"),
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Your review assistant! 🤝"),
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Keeping track of tasks! 📊"),
-        discord.CustomActivity(type=discord.ActivityType.custom, name="Reviewing with you! 🔍"),
-    ]
-    while True:
-        for status in statuses:
-            await bot.change_presence(activity=status)
-            await asyncio.sleep(300)
+    # Looked up at call time so a hot-reloaded review_views is used.
+    from cogs.review_views import register_persistent_views
+    register_persistent_views(bot)
+    # on_ready fires again after every reconnect, so anything periodic lives
+    # on the scheduler (started once in main) rather than in a loop here.
+    bot.reconciler.start()
 
 async def setup_cogs():
     await bot.load_extension("cogs.review_modals")
@@ -67,7 +100,59 @@ async def setup_cogs():
     await bot.load_extension("cogs.review_commands")
     await bot.load_extension("cogs.review_events")
 
+async def main():
+    discord.utils.setup_logging()
+    if SHARD_CONFIG:
+        # Each shard group owns the guilds routed to its shards, in its own file.
+        try:
+            bot.store = open_store(partition_path(SHARD_CONFIG.group), guild_filter=SHARD_CONFIG.owns_guild,
+                                   source_path=DB_FILE, layout=SHARD_CONFIG.layout())
+        except PartitionLayoutError as e:
+            # Serving from the wrong partition would hide guilds' reviews.
+            print(f"Error: {e}")
+            return
+    else:
+        bot.store = open_store()
+    bot.metrics.instrument(bot)
+    bot.store.on_review_change = bot.reminders.schedule
+    bot.store.on_guild_delete = bot.reminders.forget_guild
+    bot.reminders.rebuild()
+    async with bot:
+        await setup_cogs()
+        bot.store.start()
+        bot.scheduler.every('presence', PRESENCE_INTERVAL, rotate_presence, delay=0)
+        # The pass run from on_ready covers reconnects; this one catches drift
+        # during long uninterrupted sessions.
+        bot.scheduler.every('reconcile', RECONCILE_INTERVAL, bot.reconciler.reconcile, jitter=RECONCILE_INTERVAL / 10)
+        if SHARD_CONFIG:
+            bot.scheduler.every('shard_status', STATUS_INTERVAL, lambda: publish_status(bot, SHARD_CONFIG), delay=0)
+        # Sleeps until the earliest reminder is due; runs until shutdown.
+        bot.scheduler.after('reminders', 0, bot.reminders.run)
+        bot.scheduler.start()
+        # Lets webhook_listener.py hot reload changed cogs instead of restarting.
+        bot.control = ControlServer(bot, socket_path(SHARD_CONFIG))
+        await bot.control.start()
+        # Prometheus scrape endpoint, only reachable from this machine.
+        try:
+            metrics_server = await bot.metrics.serve(port=metrics_port(SHARD_CONFIG))
+        except OSError as e:
+            # A taken port shouldn't keep the bot offline; run without metrics.
+            print(f"Error: Could not start the metrics endpoint, running without it: {e}")
+            metrics_server = None
+        # systemctl restart (on every deploy) and the launcher stop the bot with
+        # SIGTERM/SIGINT; closing the bot lets the finally below flush the store.
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, lambda: asyncio.ensure_future(bot.close()))
+        try:
+            await bot.start(BOT_TOKEN)
+        finally:
+            if metrics_server is not None:
+                metrics_server.close()
+            await bot.scheduler.close()
+            await bot.control.close()
+            # Flush any coalesced writes still queued before exiting.
+            await bot.store.close()
+
 if __name__ == '__main__':
-    ensure_data_file()
-    asyncio.run(setup_cogs())
-    bot.run(BOT_TOKEN)
\ No newline at end of file
+    asyncio.run(main())
@@ -1,8 +1,13 @@
+import fcntl
 import hmac
 import hashlib
+import glob
+import socket
 import subprocess
 import os
 import logging
+import threading
+import time
 from flask import Flask, request, abort
 from datetime import datetime, timezone
 import json
@@ -19,6 +24,18 @@ SECRETS_FILE = os.path.join(APP_DIR, 'secrets.txt')
 GIT_BRANCH = 'refs/heads/main' # Or 'refs/heads/master' depending on your default branch
 # Name of the main bot service to restart
 BOT_SERVICE_NAME = 'reviewer.service' # Ensure this matches your actual service name
+# Where the last deploy is recorded for the bot's status command
+UPDATE_FILE = os.path.join(APP_DIR, "last_github_update.json")
+# Seconds the deploy worker waits after a push before deploying, so bursts coalesce
+DEPLOY_SETTLE_SECONDS = 5
+# Pushes touching these files restart the bot; other changes under cogs/ are hot reloaded
+RESTART_FILES = {'reviewer.py', 'launcher.py', 'requirements.txt'}
+# Control sockets of the running bot process(es), one per shard group when sharded
+BOT_SOCKET_GLOB = 'reviewer*.sock'
+# Seconds to wait for the bot to finish a hot reload
+RELOAD_TIMEOUT = 60
+# Held while deploying, so Gunicorn workers (each with its own queue) deploy one at a time
+DEPLOY_LOCK_FILE = os.path.join(APP_DIR, 'deploy.lock')
 # --- End Configuration ---
 
 app = Flask(__name__)
@@ -58,6 +75,161 @@ def verify_signature(payload_body, secret_token, signature_header):
         return False
     return True
 
+def write_update_info(job, stages, coalesced):
+    """Record the deployed commit and how long each deploy stage took, for the bot's `status` command."""
+    head_commit = job.get('head_commit') or {}
+    update_info = {
+        "pulled_at": datetime.now(timezone.utc).isoformat(),
+        "commit_hash": job.get('after', '')[:7],
+        "commit_message": head_commit.get('message', 'Unknown'),
+        "commit_author": head_commit.get('author', {}).get('name', 'Unknown'),
+        "coalesced_pushes": coalesced,
+        "stages": {name: round(seconds, 3) for name, seconds in stages.items()}
+    }
+    try:
+        tmp_file = UPDATE_FILE + '.tmp'
+        with open(tmp_file, "w") as f:
+            json.dump(update_info, f, indent=2)
+        os.replace(tmp_file, UPDATE_FILE)
+        logging.info("Wrote last_github_update.json")
+    except Exception as e:
+        logging.error(f"Failed to write last_github_update.json: {e}")
+
+def git_output(*args):
+    result = subprocess.run(['/usr/bin/git', *args], cwd=APP_DIR, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+def plan_deploy(changed_files):
+    """Decide how to apply a pull: ('restart', []), ('reload', [cog modules]) or ('none', [])."""
+    if any(path in RESTART_FILES for path in changed_files):
+        return 'restart', []
+    if 'webhook_listener.py' in changed_files:
+        logging.warning("webhook_listener.py changed; restart the webhook service to pick it up.")
+    modules = [
+        path[:-3].replace('/', '.') for path in changed_files
+        if path.startswith('cogs/') and path.endswith('.py')
+    ]
+    if modules:
+        return 'reload', modules
+    return 'none', []
+
+def request_reload(modules):
+    """Ask every running bot process to hot reload `modules`. Returns True if all of them did."""
+    sockets = sorted(glob.glob(os.path.join(APP_DIR, BOT_SOCKET_GLOB)))
+    if not sockets:
+        logging.warning("No bot control socket found; falling back to a restart.")
+        return False
+    request_line = json.dumps({'op': 'reload', 'modules': modules}).encode() + b'\n'
+    for path in sockets:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(RELOAD_TIMEOUT)
+                client.connect(path)
+                client.sendall(request_line)
+                reply = json.loads(client.makefile('rb').readline())
+        except (OSError, ValueError) as e:
+            logging.error(f"Hot reload request to {path} failed: {e}")
+            return False
+        if not reply.get('ok'):
+            logging.warning(f"Bot at {path} could not hot reload: {reply.get('error')}")
+            return False
+        logging.info(f"Bot at {path} reloaded {', '.join(reply.get('modules', {}))} in {reply.get('total_ms')} ms")
+    return True
+
+def deploy(job, coalesced):
+    """Pull the pushed code, then hot reload or restart the bot. Runs on the deploy worker thread."""
+    stages = {'queued': time.monotonic() - job['received_at']}
+    logging.info(f"Deploying {job.get('after', '')[:7]} ({coalesced} earlier pushes coalesced into this one).")
+    try:
+        # 1. Pull latest changes
+        logging.info("Running git pull...")
+        started = time.monotonic()
+        old_head = git_output('rev-parse', 'HEAD')
+        git_pull_cmd = ['/usr/bin/git', 'pull']
+        pull_result = subprocess.run(git_pull_cmd, cwd=APP_DIR, capture_output=True, text=True, check=True)
+        changed_files = git_output('diff', '--name-only', old_head, 'HEAD').splitlines()
+        stages['pull'] = time.monotonic() - started
+        logging.info(f"Git pull successful:\n{pull_result.stdout}")
+        write_update_info(job, stages, coalesced)
+
+        # 2. Hot reload changed cogs when that is enough
+        action, modules = plan_deploy(changed_files)
+        logging.info(f"Changed files: {', '.join(changed_files) or 'none'}; action: {action}")
+        if action == 'reload':
+            started = time.monotonic()
+            if not request_reload(modules):
+                action = 'restart'
+            stages['reload'] = time.monotonic() - started
+
+        # 3. Otherwise restart the bot service using systemctl
+        # IMPORTANT: Requires passwordless sudo for this specific command!
+        if action == 'restart':
+            logging.info(f"Restarting service: {BOT_SERVICE_NAME}...")
+            started = time.monotonic()
+            restart_cmd = ['/usr/bin/sudo', '/usr/bin/systemctl', 'restart', BOT_SERVICE_NAME]
+            restart_result = subprocess.run(restart_cmd, capture_output=True, text=True, check=True)
+            stages['restart'] = time.monotonic() - started
+            if restart_result.stderr:
+                logging.warning(f"Service restart command stderr:\n{restart_result.stderr}")
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Command failed: {' '.join(e.cmd)}\nStderr:\n{e.stderr}\nStdout:\n{e.stdout}")
+    except FileNotFoundError as e:
+        logging.error(f"Command not found: {e}. Ensure git and systemctl paths are correct and user has permissions.")
+    except Exception as e:
+        logging.error(f"An error occurred during update/restart: {e}")
+    stages['total'] = time.monotonic() - job['received_at']
+    write_update_info(job, stages, coalesced)
+    logging.info("Deploy finished: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in stages.items()))
+
+class DeployQueue:
+    """Hands verified pushes to a single background deploy worker.
+
+    Only the newest push is kept: pushes that arrive while one is waiting or
+    being deployed replace each other, so a burst of pushes ends in one pull
+    and one restart of the latest commit. The worker thread is started on the
+    first push, after Gunicorn has forked.
+
+    Each Gunicorn worker has its own queue, so deploys also take an exclusive
+    lock on DEPLOY_LOCK_FILE; a worker that waited for it finds the code
+    already pulled and has nothing left to do.
+    """
+
+    def __init__(self, deploy):
+        self._deploy = deploy
+        self._condition = threading.Condition()
+        self._pending = None
+        self._coalesced = 0
+        self._thread = None
+
+    def submit(self, job):
+        with self._condition:
+            if self._pending is not None:
+                self._coalesced += 1
+            self._pending = job
+            self._condition.notify()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='deploy-worker', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+            # Let a burst of pushes settle so it is deployed once.
+            time.sleep(DEPLOY_SETTLE_SECONDS)
+            with self._condition:
+                job, self._pending = self._pending, None
+                coalesced, self._coalesced = self._coalesced, 0
+            try:
+                with open(DEPLOY_LOCK_FILE, 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    self._deploy(job, coalesced)
+            except Exception as e:
+                logging.error(f"Deploy worker error: {e}")
+
+deploy_queue = DeployQueue(deploy)
+
 @app.route('/', methods=['POST'])
 def webhook():
     """Handles incoming GitHub webhook requests."""
@@ -79,49 +251,14 @@ def webhook():
         payload = request.get_json()
         # Check if the push was to the configured branch
         if payload.get('ref') == GIT_BRANCH:
-            logging.info(f"Push event received for branch {GIT_BRANCH}. Triggering update and restart.")
-            try:
-                # 1. Pull latest changes
-                logging.info("Running git pull...")
-                git_pull_cmd = ['/usr/bin/git', 'pull']
-                pull_result = subprocess.run(git_pull_cmd, cwd=APP_DIR, capture_output=True, text=True, check=True)
-                logging.info(f"Git pull successful:\n{pull_result.stdout}")
-
-                # --- Write last GitHub update info ---
-                try:
-                    commit_hash = payload.get('after', '')[:7]
-                    head_commit = payload.get('head_commit', {})
-                    commit_msg = head_commit.get('message', 'Unknown')
-                    commit_author = head_commit.get('author', {}).get('name', 'Unknown')
-                    pulled_at = datetime.now(timezone.utc).isoformat()
-                    update_info = {
-                        "pulled_at": pulled_at,
-                        "commit_hash": commit_hash,
-                        "commit_message": commit_msg,
-                        "commit_author": commit_author
-                    }
-                    update_file = os.path.join(APP_DIR, "last_github_update.json")
-                    with open(update_file, "w") as f:
-                        json.dump(update_info, f, indent=2)
-                    logging.info("Wrote last_github_update.json")
-                except Exception as e:
-                    logging.error(f"Failed to write last_github_update.json: {e}")
-                # --- End write ---
-
-                # 2. Restart the bot service using systemctl
-                # IMPORTANT: Requires passwordless sudo for this specific command!
-                logging.info(f"Restarting service: {BOT_SERVICE_NAME}...")
-                restart_cmd = ['/usr/bin/sudo', '/usr/bin/systemctl', 'restart', BOT_SERVICE_NAME]
-                restart_result = subprocess.run(restart_cmd, capture_output=True, text=True, check=True)
-                if restart_result.stderr:
-                     logging.warning(f"Service restart command stderr:\n{restart_result.stderr}")
-
-            except subprocess.CalledProcessError as e:
-                logging.error(f"Command failed: {' '.join(e.cmd)}\nStderr:\n{e.stderr}\nStdout:\n{e.stdout}")
-            except FileNotFoundError as e:
-                 logging.error(f"Command not found: {e}. Ensure git and systemctl paths are correct and user has permissions.")
-            except Exception as e:
-                logging.error(f"An error occurred during update/restart: {e}")
+            logging.info(f"Push event received for branch {GIT_BRANCH}. Queueing update and restart.")
+            # The deploy runs on the worker thread; GitHub gets its answer now.
+            deploy_queue.submit({
+                'after': payload.get('after', ''),
+                'head_commit': payload.get('head_commit') or {},
+                'received_at': time.monotonic()
+            })
+            return 'Accepted', 202
         else:
             logging.info(f"Push event received for branch {payload.get('ref')}, ignoring.")
 